@@ -11,12 +11,17 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from pathlib import Path
 from datetime import datetime, date
 import warnings
+import base64
+import hashlib
 import json
-from chatbot import display_chatbot
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import MappingProxyType
 from utils_export import render_export_button
 warnings.filterwarnings('ignore')
 
@@ -30,7 +35,7 @@ except ImportError:
     INDIA_STATE_COORDINATES = {}
 
 try:
-    from india_geojson_helper import load_india_geojson, get_state_name_field, create_state_name_mapping
+    from india_geojson_helper import load_simplified_india_geojson, get_state_name_field, create_state_name_mapping
     GEOJSON_HELPER_AVAILABLE = True
 except ImportError:
     GEOJSON_HELPER_AVAILABLE = False
@@ -42,6 +47,27 @@ try:
 except ImportError:
     FORENSIC_AVAILABLE = False
 
+# Import Plotly-Resampler for downsampling long time series
+try:
+    from plotly_resampler import FigureResampler
+    PLOTLY_RESAMPLER_AVAILABLE = True
+except ImportError:
+    PLOTLY_RESAMPLER_AVAILABLE = False
+
+# Import pyarrow for the Parquet read cache of result CSVs
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Import orjson for faster JSON summary parsing
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Page configuration
 st.set_page_config(
     page_title="UIDAI Analytics Dashboard | Government of India",
@@ -51,7 +77,7 @@ st.set_page_config(
 )
 
 # Custom CSS for Indian Government styling
-st.markdown("""
+DASHBOARD_CSS = """
     <style>
     /* Import professional font */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -366,12 +392,20 @@ st.markdown("""
     ::-webkit-scrollbar-track { background: transparent; }
     ::-webkit-scrollbar-thumb { background: var(--bg-secondary); border-radius: 3px; }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def get_minified_css():
+    """Strip comments and collapse whitespace in the dashboard CSS once per process"""
+    css = re.sub(r'/\*.*?\*/', '', DASHBOARD_CSS, flags=re.DOTALL)
+    return re.sub(r'\s+', ' ', css).strip()
+
+st.markdown(get_minified_css(), unsafe_allow_html=True)
 
 
 
 # State name normalization mapping to fix duplicates and spelling errors
-STATE_NAME_MAPPING = {
+STATE_NAME_MAPPING = MappingProxyType({
     # West Bengal variants
     'West Bangal': 'West Bengal',
     'Westbengal': 'West Bengal',
@@ -398,10 +432,10 @@ STATE_NAME_MAPPING = {
     
     # Long name variants
     'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-}
+})
 
 # Invalid entries that are not states (cities, numbers, etc.)
-INVALID_STATE_ENTRIES = {
+INVALID_STATE_ENTRIES = frozenset({
     '100000',
     'Balanagar',
     'Jaipur',
@@ -410,113 +444,158 @@ INVALID_STATE_ENTRIES = {
     'Nagpur',
     'Puttenahalli',
     'Raja Annamalai Puram',
-}
+})
+
+# Weekday names indexed by Monday=0; 1970-01-01 (day 0 of datetime64) was a Thursday
+WEEKDAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], dtype=object)
+EPOCH_WEEKDAY = 3
+
+# Numeric columns of the pattern-learning tables, shown with two decimals
+PATTERN_NUMBER_COLUMNS = ['Trend Slope', 'Trend Mean', 'Seasonal Amplitude', 'Residual Std']
 
-def normalize_state_name(state_name):
+# Month names indexed by month number (index 0 unused) for vectorized lookups
+MONTH_NAMES = np.array(['', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+                        'August', 'September', 'October', 'November', 'December'], dtype=object)
+MONTH_ABBRS = np.array(['', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                        'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], dtype=object)
+
+def normalize_state_name(state_name, _mapping=STATE_NAME_MAPPING, _invalid=INVALID_STATE_ENTRIES):
     """Normalize state name to canonical form"""
+    # Lookup tables are bound as defaults so they resolve as fast locals
     if pd.isna(state_name):
         return state_name
     state_str = str(state_name).strip()
     # Check if it's an invalid entry
-    if state_str in INVALID_STATE_ENTRIES:
+    if state_str in _invalid:
         return None
     # Return mapped name or original if no mapping exists
-    return STATE_NAME_MAPPING.get(state_str, state_str)
+    return _mapping.get(state_str, state_str)
 
 def normalize_state_column(df, column='state'):
     """Apply state normalization to a DataFrame column"""
     if column not in df.columns:
         return df
-    df = df.copy()
-    df[column] = df[column].apply(normalize_state_name)
-    # Remove rows with invalid state entries (None values)
-    df = df[df[column].notna()]
+    # Normalize each distinct raw name once, then remap the category codes row-wise
+    states = df[column].astype('category')
+    normalized = pd.Series([normalize_state_name(name) for name in states.cat.categories], dtype=object)
+    categories = pd.Index(sorted(normalized.dropna().unique()))
+    # Trailing -1 sends missing codes (-1) to -1; invalid names also map to -1
+    code_map = np.append(categories.get_indexer(normalized), -1)
+    codes = code_map[states.cat.codes.to_numpy()]
+    # Remove rows with invalid state entries
+    valid = codes >= 0
+    df = df[valid]
+    df[column] = categories.to_numpy()[codes[valid]]
     return df
 
 def get_unique_states(data):
     """Get sorted list of unique normalized state names from all data sources"""
-    all_states = set()
+    # load_data stores the result once; later callers skip the column scans
+    if 'state_categories' in data:
+        return data['state_categories'].tolist()
+    
+    state_columns = [
+        data[key]['state'] for key in ('state', 'biometric', 'demographic', 'enrolment')
+        if key in data and 'state' in data[key].columns
+    ]
+    if not state_columns:
+        return []
     
-    if 'state' in data and 'state' in data['state'].columns:
-        all_states.update(data['state']['state'].dropna().unique())
-    if 'biometric' in data and 'state' in data['biometric'].columns:
-        all_states.update(data['biometric']['state'].dropna().unique())
-    if 'demographic' in data and 'state' in data['demographic'].columns:
-        all_states.update(data['demographic']['state'].dropna().unique())
-    if 'enrolment' in data and 'state' in data['enrolment'].columns:
-        all_states.update(data['enrolment']['state'].dropna().unique())
+    # Dedupe each column and merge the small unique arrays
+    unique_arrays = [np.asarray(col.dropna().unique()) for col in state_columns]
+    all_states = pd.unique(np.concatenate(unique_arrays))
     
     # Remove any remaining invalid entries
-    all_states = all_states - INVALID_STATE_ENTRIES
+    return sorted(set(all_states) - INVALID_STATE_ENTRIES)
+
+def slice_date_range(df, start_ts, end_ts):
+    """Slice a date-sorted frame to [start_ts, end_ts] with a binary search instead of a boolean mask"""
+    dates = df['date'].to_numpy()
+    lo = dates.searchsorted(start_ts.to_datetime64(), side='left')
+    hi = dates.searchsorted(end_ts.to_datetime64(), side='right')
+    return df.iloc[lo:hi]
+
+def build_daily_by_state(biometric_df, demographic_df, enrolment_df):
+    """Aggregate raw data to one row per (state, date) so state filters become lookups"""
+    keys = ['state', 'date']
+    # Sorting happens once at the end; observed=True skips empty category combinations
+    group_opts = dict(sort=False, observed=True)
+    
+    # Aggregate biometric data by state and date
+    bio_daily = biometric_df.groupby(keys, **group_opts).agg({
+        'bio_age_5_17': 'sum',
+        'bio_age_17_': 'sum'
+    })
+    bio_daily.eval('bio_total = bio_age_5_17 + bio_age_17_', inplace=True)
+    
+    # Aggregate demographic data by state and date
+    demo_daily = demographic_df.groupby(keys, **group_opts).agg({
+        'demo_age_5_17': 'sum',
+        'demo_age_17_': 'sum'
+    })
+    demo_daily.eval('demo_total = demo_age_5_17 + demo_age_17_', inplace=True)
+    
+    # Aggregate enrolment data by state and date
+    enrol_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
+    available_enrol_cols = [c for c in enrol_cols if c in enrolment_df.columns]
+    if available_enrol_cols:
+        enrol_daily = enrolment_df.groupby(keys, **group_opts).agg({
+            col: 'sum' for col in available_enrol_cols
+        })
+        # Single fused expression (numexpr when installed) instead of a row-wise sum
+        enrol_daily.eval('enrol_total = ' + ' + '.join(available_enrol_cols), inplace=True)
+    else:
+        enrol_daily = enrolment_df.groupby(keys, **group_opts).size().to_frame('enrol_total')
     
-    return sorted(list(all_states))
+    # Align all three on the shared (state, date) index into daily aggregates per state
+    daily_by_state = pd.concat([bio_daily, demo_daily, enrol_daily], axis=1)
+    # Counts are whole numbers well inside int32 range, which halves memory traffic downstream
+    count_cols = daily_by_state.columns
+    daily_by_state = daily_by_state.fillna(0).astype({col: 'int32' for col in count_cols}).reset_index()
+    
+    # Add time-based columns from integer day numbers (day_num counts from each state's first date)
+    day_index = daily_by_state['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    daily_by_state['weekday'] = WEEKDAY_NAMES[(day_index + EPOCH_WEEKDAY) % 7]
+    daily_by_state['week'] = daily_by_state['date'].dt.isocalendar().week
+    daily_by_state['month'] = daily_by_state['date'].dt.month
+    first_day = pd.Series(day_index, index=daily_by_state.index).groupby(daily_by_state['state'], **group_opts).transform('min')
+    daily_by_state['day_num'] = (day_index - first_day.to_numpy()).astype(np.int32)
+    
+    return daily_by_state.set_index(keys).sort_index()
 
 def filter_data_by_state(data, selected_state):
-    """Filter all datasets by selected state and recalculate aggregates"""
+    """Filter all datasets by selected state and look up its daily aggregates"""
     if selected_state == 'All':
         return data
     
     filtered_data = {}
+    state_row_indices = data.get('state_row_indices', {})
+    no_rows = np.empty(0, dtype=np.intp)
     
     for key, df in data.items():
         if isinstance(df, pd.DataFrame):
             if 'state' in df.columns:
-                filtered_data[key] = df[df['state'] == selected_state].copy()
+                if key in state_row_indices:
+                    # Gather the precomputed row positions for this state
+                    filtered_data[key] = df.take(state_row_indices[key].get(selected_state, no_rows))
+                else:
+                    # Boolean indexing already returns a new frame, no copy needed
+                    filtered_data[key] = df.loc[df['state'].values == selected_state]
             else:
-                # Keep data that doesn't have state column (will be recalculated below)
-                filtered_data[key] = df.copy()
+                # Keep data that doesn't have state column (daily is replaced below)
+                filtered_data[key] = df
         else:
             # Keep non-DataFrame items (like dictionaries/JSON)
             filtered_data[key] = df
     
-    # Recalculate daily aggregates from filtered raw data
-    if 'biometric' in filtered_data and 'demographic' in filtered_data and 'enrolment' in filtered_data:
+    # Look up the pre-aggregated daily totals for the selected state
+    if 'daily_by_state' in data:
+        daily_by_state = data['daily_by_state']
         try:
-            # Aggregate biometric data by date
-            bio_daily = filtered_data['biometric'].groupby('date').agg({
-                'bio_age_5_17': 'sum',
-                'bio_age_17_': 'sum'
-            }).reset_index()
-            bio_daily['bio_total'] = bio_daily['bio_age_5_17'] + bio_daily['bio_age_17_']
-            
-            # Aggregate demographic data by date
-            demo_daily = filtered_data['demographic'].groupby('date').agg({
-                'demo_age_5_17': 'sum',
-                'demo_age_17_': 'sum'
-            }).reset_index()
-            demo_daily['demo_total'] = demo_daily['demo_age_5_17'] + demo_daily['demo_age_17_']
-            
-            # Aggregate enrolment data by date
-            enrol_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
-            available_enrol_cols = [c for c in enrol_cols if c in filtered_data['enrolment'].columns]
-            if available_enrol_cols:
-                enrol_daily = filtered_data['enrolment'].groupby('date').agg({
-                    col: 'sum' for col in available_enrol_cols
-                }).reset_index()
-                enrol_daily['enrol_total'] = enrol_daily[available_enrol_cols].sum(axis=1)
-            else:
-                enrol_daily = filtered_data['enrolment'].groupby('date').size().reset_index(name='enrol_total')
-            
-            # Merge all into daily aggregates
-            daily_agg = bio_daily.merge(demo_daily, on='date', how='outer')
-            daily_agg = daily_agg.merge(enrol_daily, on='date', how='outer')
-            daily_agg = daily_agg.fillna(0)
-            
-            # Add time-based columns
-            daily_agg['date'] = pd.to_datetime(daily_agg['date'])
-            daily_agg['weekday'] = daily_agg['date'].dt.day_name()
-            daily_agg['week'] = daily_agg['date'].dt.isocalendar().week
-            daily_agg['month'] = daily_agg['date'].dt.month
-            daily_agg['day_num'] = (daily_agg['date'] - daily_agg['date'].min()).dt.days
-            
-            # Sort by date
-            daily_agg = daily_agg.sort_values('date').reset_index(drop=True)
-            
-            filtered_data['daily'] = daily_agg
-            
-        except Exception as e:
-            # If aggregation fails, keep existing daily data
-            pass
+            filtered_data['daily'] = daily_by_state.xs(selected_state, level='state').reset_index()
+        except KeyError:
+            # No raw activity recorded for this state
+            filtered_data['daily'] = daily_by_state.iloc[:0].droplevel('state').reset_index()
     
     # Recalculate state-level summary for filtered state
     if 'state' in filtered_data and len(filtered_data['state']) > 0:
@@ -526,134 +605,1063 @@ def filter_data_by_state(data, selected_state):
     return filtered_data
 
 
-@st.cache_data
-def load_data():
-    """Load all analysis results and raw data"""
-    data_path = Path('analysis_results')
-    processed_path = Path('processed_data')
+@st.cache_resource
+def get_india_geojson():
+    """Load the simplified state boundaries once per process instead of parsing the full GeoJSON per rerun"""
+    return load_simplified_india_geojson()
+
+# Upper bound on points sent to the browser per time-series trace
+TIMESERIES_MAX_POINTS = 1000
+
+# Above this many points a WebGL trace renders faster than an SVG one
+SCATTERGL_MIN_POINTS = 1000
+
+def scatter_trace_class(n_points):
+    """go.Scattergl for long series, go.Scatter for short ones where SVG is cheaper"""
+    return go.Scattergl if n_points > SCATTERGL_MIN_POINTS else go.Scatter
+
+# Cached helpers take their frames as _-prefixed arguments, which Streamlit does not hash;
+# a view_key (the sidebar filter selection) or cache_key (view_key plus the section's widget
+# filters) argument identifies the frame instead. Cached figures and cache_resource results
+# are shared across reruns and sessions, so callers treat them as read-only.
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_state_choropleth(_state_map_data, _geojson, state_name_field, map_metric_col, map_metric_choice, view_key):
+    """State choropleth for one metric and filter selection"""
+    fig_map = px.choropleth(
+        _state_map_data,
+        geojson=_geojson,
+        locations='state',
+        featureidkey=f'properties.{state_name_field}',
+        color=map_metric_col,
+        color_continuous_scale='YlOrRd',
+        title=f'🗺️ Indian States Choropleth Map: {map_metric_choice}',
+        labels={map_metric_col: map_metric_choice}
+    )
+    # Hover text is formatted in the browser from the location and value already on the trace
+    fig_map.update_traces(
+        hovertemplate=f"<b>%{{location}}</b><br>{map_metric_choice}: %{{z:,.0f}}<extra></extra>"
+    )
     
-    data = {}
+    # Update layout for India
+    fig_map.update_geos(
+        fitbounds="locations",
+        visible=False,
+        projection_type="mercator",
+        center=dict(lon=78.9629, lat=20.5937),
+        projection_scale=4.5
+    )
     
-    try:
-        # Load analysis results
-        data['daily'] = pd.read_csv(data_path / 'daily_aggregated_data.csv', parse_dates=['date'])
-        data['state'] = pd.read_csv(data_path / 'state_level_analysis.csv')
-        data['district_coverage'] = pd.read_csv(data_path / 'district_coverage_analysis.csv')
-        data['insights'] = pd.read_csv(data_path / 'key_insights.csv')
-        
-        # Load anomaly detection results
-        anomaly_path = Path('anomaly_results')
-        try:
-            if (anomaly_path / 'anomalies_detected.csv').exists():
-                anomalies_df = pd.read_csv(anomaly_path / 'anomalies_detected.csv')
-                if 'date' in anomalies_df.columns:
-                    anomalies_df['date'] = pd.to_datetime(anomalies_df['date'], errors='coerce')
-                data['anomalies'] = anomalies_df
-            if (anomaly_path / 'anomalies_geographic.csv').exists():
-                data['anomalies_geo'] = pd.read_csv(anomaly_path / 'anomalies_geographic.csv')
-        except Exception as e:
-            # Anomaly results not available yet
-            pass
-        
-        # Load pattern learning results (Feature 1)
-        pattern_path = Path('pattern_results')
+    fig_map.update_layout(
+        height=750,
+        margin=dict(l=0, r=0, t=50, b=0),
+        coloraxis_colorbar=dict(
+            title=dict(text=map_metric_choice, font=dict(size=14)),
+            len=0.7,
+            thickness=20
+        )
+    )
+    return fig_map
+
+def lttb_indices(x, y, n_out):
+    """Row positions kept by Largest-Triangle-Three-Buckets downsampling to n_out points"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the following bucket (just the last point for the final bucket)
+        next_end = edges[i + 2] if i + 2 < n_out - 1 else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Keep the point forming the largest triangle with the previous kept point and that average
+        area = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) -
+                      (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(area.argmax())
+        kept[i + 1] = prev
+    return kept
+
+def create_timeseries_figure():
+    """Create a figure that downsamples long series (LTTB) when Plotly-Resampler is installed"""
+    if PLOTLY_RESAMPLER_AVAILABLE:
+        return FigureResampler(go.Figure(), default_n_shown_samples=TIMESERIES_MAX_POINTS)
+    return go.Figure()
+
+def add_timeseries_trace(fig, x, y, **trace_kwargs):
+    """Add a line trace, capped at TIMESERIES_MAX_POINTS via Plotly-Resampler or LTTB.
+    The trace type follows the number of points actually sent (WebGL past SCATTERGL_MIN_POINTS)."""
+    trace_class = scatter_trace_class(min(len(y), TIMESERIES_MAX_POINTS))
+    if PLOTLY_RESAMPLER_AVAILABLE and isinstance(fig, FigureResampler):
+        fig.add_trace(trace_class(**trace_kwargs), hf_x=x, hf_y=y)
+    else:
+        # Without Plotly-Resampler, thin long series to the point budget ourselves
+        if len(y) > TIMESERIES_MAX_POINTS:
+            kept = lttb_indices(x, y, TIMESERIES_MAX_POINTS)
+            x, y = np.asarray(x)[kept], np.asarray(y)[kept]
+        fig.add_trace(trace_class(x=x, y=y, **trace_kwargs))
+
+
+def group_means(codes, values, n_groups):
+    """Per-group column means via bincount, like groupby(codes).mean() (NaNs skipped).
+    Returns the codes of non-empty groups in ascending order and their means."""
+    valid = codes >= 0
+    codes, values = codes[valid], values[valid]
+    observed = ~np.isnan(values)
+    filled = np.where(observed, values, 0.0)
+    
+    rows = np.bincount(codes, minlength=n_groups)
+    sums = np.column_stack([np.bincount(codes, weights=filled[:, j], minlength=n_groups)
+                            for j in range(values.shape[1])])
+    counts = np.column_stack([np.bincount(codes, weights=observed[:, j], minlength=n_groups)
+                              for j in range(values.shape[1])])
+    present = np.flatnonzero(rows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums[present] / counts[present]
+    return present, means
+
+def top_group_sums(keys, values, n):
+    """Top-n per-key sums via factorize + bincount, ordered like groupby().sum().nlargest(n)"""
+    # sort=True gives codes in groupby's key order, so ties break the same way
+    codes, uniques = pd.factorize(keys, sort=True)
+    valid = codes >= 0
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=len(uniques))
+    if values.dtype.kind in 'iu':
+        sums = sums.astype(np.int64)
+    
+    # Partial selection of the n largest, then order just those
+    top = np.argpartition(-sums, n)[:n] if len(sums) > n else np.arange(len(sums))
+    top = top[np.lexsort((top, -sums[top]))]
+    return uniques.take(top), sums[top]
+
+def top_n_rows(df, column, n):
+    """Rows with the n largest values of column, ordered like df.nlargest(n, column)"""
+    if n <= 0:
+        return df.iloc[:0]
+    values = df[column].to_numpy(dtype=float)
+    missing = np.isnan(values)
+    positions = np.flatnonzero(~missing)
+    if len(positions) > n:
+        # Partial selection: everything above the n-th largest value, then the earliest ties
+        candidates = values[positions]
+        kth = np.partition(candidates, len(candidates) - n)[len(candidates) - n]
+        above = positions[candidates > kth]
+        ties = positions[candidates == kth][:n - len(above)]
+        positions = np.concatenate([above, ties])
+    # Stable sort keeps earlier rows first among equal values
+    positions = positions[np.argsort(-values[positions], kind='stable')]
+    # Like nlargest, missing values only fill in when there are too few others
+    if len(positions) < n:
+        positions = np.concatenate([positions, np.flatnonzero(missing)[:n - len(positions)]])
+    return df.iloc[positions]
+
+# Daily total columns and their line colours, shared by the Overview and Trends charts
+DAILY_TOTAL_COLUMNS = ['bio_total', 'demo_total', 'enrol_total']
+DAILY_TOTAL_SERIES = tuple(zip(DAILY_TOTAL_COLUMNS, ('#1f77b4', '#ff7f0e', '#2ca02c')))
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_daily_totals_figure(_daily, chart_id, view_key, trace_names, mode, layout):
+    """Line chart of the three daily totals, one per chart_id"""
+    fig = create_timeseries_figure()
+    for (column, color), name in zip(DAILY_TOTAL_SERIES, trace_names):
+        add_timeseries_trace(
+            fig,
+            _daily['date'],
+            _daily[column],
+            mode=mode,
+            name=name,
+            line=dict(color=color, width=2)
+        )
+    fig.update_layout(**layout)
+    return fig
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_feature_timeline_figure(_features_daily, feature, view_key):
+    """Downsampled timeline of one daily feature"""
+    fig = create_timeseries_figure()
+    add_timeseries_trace(
+        fig,
+        _features_daily['date'].to_numpy(),
+        _features_daily[feature].to_numpy(),
+        mode='lines+markers',
+        name=feature,
+        line=dict(color='#1f77b4', width=2)
+    )
+    fig.update_layout(
+        title=f"{feature} Timeline",
+        xaxis_title="Date",
+        yaxis_title="Feature Value",
+        height=400
+    )
+    return fig
+
+# Age Group tab trend charts: title and (column, trace name, colour) per metric
+AGE_TREND_SERIES = {
+    "Biometric": ("Biometric Updates by Age Group Over Time", (
+        ('bio_age_5_17', '5-17 years', '#1f77b4'),
+        ('bio_age_17_', '17+ years', '#ff7f0e')
+    )),
+    "Demographic": ("Demographic Updates by Age Group Over Time", (
+        ('demo_age_5_17', '5-17 years', '#2ca02c'),
+        ('demo_age_17_', '17+ years', '#d62728')
+    )),
+    "Enrolment": ("Enrolments by Age Group Over Time", (
+        ('age_0_5', '0-5 years', '#9467bd'),
+        ('age_5_17', '5-17 years', '#8c564b'),
+        ('age_18_greater', '18+ years', '#e377c2')
+    ))
+}
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_top_states_figure(_state, column, label, color_scale, title, top_n, view_key):
+    """Horizontal bars of the top_n states by column"""
+    fig = px.bar(
+        top_n_rows(_state, column, top_n)[['state', column]],
+        x=column,
+        y='state',
+        orientation='h',
+        title=title,
+        labels={column: label, 'state': 'State'},
+        color=column,
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_age_trend_figure(_daily, age_metric, view_key):
+    """Downsampled age-group trend chart for one metric"""
+    title, series = AGE_TREND_SERIES[age_metric]
+    fig = create_timeseries_figure()
+    for column, name, color in series:
+        add_timeseries_trace(
+            fig,
+            _daily['date'],
+            _daily[column],
+            mode='lines+markers',
+            name=name,
+            line=dict(color=color, width=2)
+        )
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Count",
+        hovermode='x unified',
+        height=400
+    )
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_forecast_figure(_forecasts, chart_id, view_key, forecast_style, upper_style, lower_style, layout):
+    """Forecast line with its 95% confidence band, one per chart_id"""
+    fig = go.Figure()
+    scatter = scatter_trace_class(len(_forecasts))
+    
+    # Forecast line
+    fig.add_trace(scatter(
+        x=_forecasts['period'],
+        y=_forecasts['forecast_value'],
+        mode='lines+markers',
+        **forecast_style
+    ))
+    
+    # Confidence intervals (the lower bound fills up to the upper one)
+    fig.add_trace(scatter(
+        x=_forecasts['period'],
+        y=_forecasts['conf_upper'],
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        **upper_style
+    ))
+    fig.add_trace(scatter(
+        x=_forecasts['period'],
+        y=_forecasts['conf_lower'],
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        **lower_style
+    ))
+    fig.update_layout(**layout)
+    return fig
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_state_mae_figure(_state_summary, top_n_states, view_key):
+    """Forecast MAE bars for the top_n_states states with the longest horizons"""
+    top_states_forecast = top_n_rows(_state_summary, 'forecast_periods', top_n_states)
+    fig = px.bar(
+        top_states_forecast,
+        x='mae',
+        y='state',
+        orientation='h',
+        title=f"Forecast MAE by State (Top {top_n_states})",
+        labels={'mae': 'Mean Absolute Error', 'state': 'State'},
+        color='mae',
+        color_continuous_scale='Blues'
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+    return fig
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_volume_pie_figure(_df, title, palette, cache_key):
+    """Pie of the volume_classification shares"""
+    volume_counts = _df['volume_classification'].value_counts()
+    # Categorical columns also count categories the filters removed
+    volume_counts = volume_counts[volume_counts > 0].reset_index()
+    volume_counts.columns = ['Volume Classification', 'Count']
+    fig = px.pie(
+        volume_counts,
+        values='Count',
+        names='Volume Classification',
+        title=title,
+        color_discrete_sequence=palette
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_top_districts_figure(_district_forecasts, top_n, cache_key):
+    """Horizontal bars of the top_n district forecasts by forecast mean"""
+    top_districts = top_n_rows(_district_forecasts, 'forecast_mean', top_n)
+    has_volume = 'volume_classification' in top_districts.columns
+    fig = px.bar(
+        top_districts,
+        x='forecast_mean',
+        y='district',
+        orientation='h',
+        color='volume_classification' if has_volume else None,
+        labels={'forecast_mean': 'Forecast Mean', 'district': 'District'},
+        hover_data=['state', 'historical_mean', 'forecast_trend'],
+        color_discrete_map={'high_volume': '#1f77b4', 'low_volume': '#ff7f0e'} if has_volume else None
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
+    return fig
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_district_state_agg_figure(_state_agg, view_key):
+    """State-level total forecast bars coloured by forecast increase"""
+    fig = px.bar(
+        _state_agg,
+        x='state',
+        y='total_forecast_mean',
+        color='forecast_increase',
+        labels={'total_forecast_mean': 'Total Forecast Mean', 'state': 'State', 'forecast_increase': 'Forecast Increase (%)'},
+        color_continuous_scale='RdYlGn'
+    )
+    fig.update_layout(xaxis_tickangle=-45, height=400, margin=dict(l=20, r=20, t=20, b=20))
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_top_pincodes_figure(_pincode_anomalies, top_n, cache_key):
+    """Horizontal bars of the top_n pincode anomalies by severity"""
+    fig = px.bar(
+        top_n_rows(_pincode_anomalies, 'severity', top_n),
+        x='severity',
+        y='pincode',
+        orientation='h',
+        color='severity',
+        title=f"Top {top_n} Pincodes by Anomaly Severity",
+        labels={'severity': 'Severity', 'pincode': 'Pincode'},
+        hover_data=['state', 'district', 'value', 'mad_z_score'],
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+    return fig
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_pincode_state_figure(_state_anomaly_counts, cache_key):
+    """Horizontal bars of pincode anomaly counts per state, coloured by average severity"""
+    fig = px.bar(
+        _state_anomaly_counts,
+        x='anomaly_count',
+        y='state',
+        orientation='h',
+        color='avg_severity',
+        title="Top 20 States by Pincode Anomaly Count",
+        labels={'anomaly_count': 'Number of Anomalies', 'state': 'State', 'avg_severity': 'Avg Severity'},
+        color_continuous_scale='Reds'
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def compute_overview(_data, selected_state, date_range, files_signature):
+    """Overview-tab aggregates for one filter selection; the other arguments identify _data"""
+    overview = {}
+    
+    daily = _data.get('daily')
+    if daily is not None:
+        overview['bio_sum'] = daily['bio_total'].sum()
+        overview['demo_sum'] = daily['demo_total'].sum()
+        overview['enrol_sum'] = daily['enrol_total'].sum()
+        overview['bio_mean'] = daily['bio_total'].mean()
+        overview['totals'] = pd.DataFrame({
+            'type': ['Biometric', 'Demographic', 'Enrolment'],
+            'total': [overview['bio_sum'], overview['demo_sum'], overview['enrol_sum']]
+        })
+        overview['recent30'] = daily.tail(30)
+    
+    if 'state' in _data:
+        overview['top_states'] = top_n_rows(_data['state'], 'bio_total', 5)[['state', 'bio_total']]
+    
+    # District breakdown is only shown for a single state
+    biometric = _data.get('biometric')
+    if selected_state != 'All' and biometric is not None and len(biometric) > 0:
+        bio_totals = biometric['bio_age_5_17'].to_numpy() + biometric['bio_age_17_'].to_numpy()
+        districts, district_totals = top_group_sums(biometric['district'], bio_totals, 10)
+        overview['top_districts'] = pd.DataFrame({'district': districts, 'bio_total': district_totals})
+    
+    return overview
+
+@st.cache_data(show_spinner=False)
+def get_forecast_metric_view(_daily_forecasts, _daily_summary, forecast_type, metric, view_key):
+    """Forecast rows and summary row (or None) for one metric and forecast type"""
+    forecast_mask = (
+        (_daily_forecasts['forecast_type'].to_numpy() == forecast_type)
+        & (_daily_forecasts['metric'].to_numpy() == metric)
+    )
+    metric_forecasts = _daily_forecasts[forecast_mask]
+    # One NumPy mask replaces the filter-twice-then-iloc lookup
+    summary_idx = np.flatnonzero(
+        (_daily_summary['metric'].to_numpy() == metric)
+        & (_daily_summary['forecast_type'].to_numpy() == forecast_type)
+    )
+    metric_summary = _daily_summary.iloc[summary_idx[0]] if summary_idx.size else None
+    return metric_forecasts, metric_summary
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def prepare_state_forecasts(_state_forecasts, _state_summary, view_key):
+    """Lowercased state forecast tables plus per-state row positions for take-based lookups"""
+    state_forecasts_df = _state_forecasts.copy()
+    state_summary_df = _state_summary.copy()
+    for df in (state_forecasts_df, state_summary_df):
+        if 'state' in df.columns:
+            # Clean each distinct name once and map the codes back onto the rows
+            codes, names = pd.factorize(df['state'], use_na_sentinel=False)
+            df['state'] = pd.Index(names).astype(str).str.strip().str.lower().to_numpy()[codes]
+    forecast_rows = state_forecasts_df.groupby('state', sort=False).indices
+    summary_rows = state_summary_df.groupby('state', sort=False).indices
+    return state_forecasts_df, state_summary_df, forecast_rows, summary_rows
+
+@st.cache_data(show_spinner=False)
+def build_state_forecast_table(_state_summary, view_key):
+    """State forecast summary rows ordered by MAPE (missing last) for display"""
+    order = np.argsort(_state_summary['mape'].to_numpy(dtype=np.float64), kind='stable')
+    return _state_summary.iloc[order][['state', 'forecast_type', 'forecast_periods', 'mape']]
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def run_forensic_analysis(_enrolment, _biometric, _demographic, view_key):
+    """Forensic results and 2-month summary for one filter selection"""
+    analyzer = ForensicAnalyzer(_enrolment, _biometric, _demographic)
+    results_df = analyzer.run_analysis()
+    temporal_df = analyzer.get_temporal_summary(interval='2M')
+    return results_df, temporal_df
+
+# Dashboard tab labels, in display order
+TAB_LABELS = (
+    "📈 Overview",
+    "📅 Temporal Analysis",
+    "🔮 Forecasting & Predictions",
+    "🗺️ Geographic Analysis",
+    "👥 Age Group Analysis",
+    "⚠️ Coverage & Anomalies",
+    "💡 Insights & Recommendations",
+    "🚨 Surge Predictions",
+    "⚙️ Feature Engineering",
+    "🏘️ District & Pincode Models",
+    "🎯 Actionable Insights",
+    "🕵️ Forensic Signal Intelligence",
+)
+
+def create_tabs(labels):
+    """st.tabs that reruns on a tab switch and records the open tab in session_state['main_tabs']."""
+    return st.tabs(labels, key='main_tabs', on_change='rerun')
+
+def is_tab_open(tab):
+    """False only when the tab is known to be inactive; untracked tabs count as open."""
+    return getattr(tab, 'open', None) is not False
+
+# Keys of the tab filter widgets whose values should survive tab switches, by tab label
+PERSISTED_WIDGET_KEYS = {
+    "📅 Temporal Analysis": ('temp_chart_type', 'temp_heatmap_metric', 'top_pattern_states'),
+    "🔮 Forecasting & Predictions": (
+        'daily_forecast_type', 'daily_forecast_metric', 'top_forecast_states', 'state_forecast_select'
+    ),
+    "🗺️ Geographic Analysis": ('map_metric',),
+    "👥 Age Group Analysis": ('age_trend_metric', 'top_age_states'),
+    "⚠️ Coverage & Anomalies": ('coverage_threshold', 'top_coverage_states', 'anomaly_level', 'anomaly_metric'),
+    "💡 Insights & Recommendations": ('priority_filter',),
+    "🚨 Surge Predictions": ('surge_type_filter', 'surge_priority_filter', 'surge_time_horizon'),
+    "⚙️ Feature Engineering": (
+        'feature_category', 'selected_feature_daily', 'selected_feature_state', 'top_n_features'
+    ),
+    "🏘️ District & Pincode Models": (
+        'district_state_filter', 'district_volume_filter', 'top_districts_forecast',
+        'pincode_state_filter', 'pincode_severity_filter', 'top_pincodes_anomalies'
+    ),
+    "🎯 Actionable Insights": (
+        'actionable_insight_type_filter', 'actionable_priority_filter', 'actionable_state_filter'
+    ),
+    "🕵️ Forensic Signal Intelligence": ('forensic_state', 'forensic_dist', 'forensic_pin', 'forensic_period'),
+}
+
+def keep_widget_state():
+    """Re-save the filter values of closed tabs so they survive Streamlit's cleanup until reopened."""
+    open_tab = st.session_state.get('main_tabs', TAB_LABELS[0])
+    for label, keys in PERSISTED_WIDGET_KEYS.items():
+        if label == open_tab:
+            continue
+        for key in keys:
+            if key in st.session_state:
+                st.session_state[key] = st.session_state[key]
+
+# Daily age-group columns summed together for the Age Group tab
+AGE_TOTAL_COLUMNS = [
+    'bio_age_5_17', 'bio_age_17_', 'demo_age_5_17', 'demo_age_17_',
+    'age_0_5', 'age_5_17', 'age_18_greater'
+]
+
+@st.cache_data(show_spinner=False)
+def compute_age_totals(_daily, view_key):
+    """Totals of the age-group columns _daily has, in one NumPy reduction"""
+    columns = [column for column in AGE_TOTAL_COLUMNS if column in _daily.columns]
+    return dict(zip(columns, _daily[columns].to_numpy().sum(axis=0)))
+
+# Age Group tab pies: heading, totals label, (column, age label) pairs and palette per dataset
+AGE_PIE_GROUPS = {
+    'bio': ("Biometric Updates by Age Group", "Total Biometric Updates",
+            (('bio_age_5_17', '5-17 years'), ('bio_age_17_', '17+ years')),
+            tuple(px.colors.qualitative.Set2)),
+    'demo': ("Demographic Updates by Age Group", "Total Demographic Updates",
+             (('demo_age_5_17', '5-17 years'), ('demo_age_17_', '17+ years')),
+             tuple(px.colors.qualitative.Set1)),
+    'enrol': ("Enrolments by Age Group", "Total Enrolments",
+              (('age_0_5', '0-5 years'), ('age_5_17', '5-17 years'), ('age_18_greater', '18+ years')),
+              tuple(px.colors.qualitative.Pastel))
+}
+
+@st.cache_data(show_spinner=False)
+def compute_age_summaries(_daily, view_key):
+    """Age totals and pre-formatted breakdown lines for each dataset whose columns _daily has"""
+    age_totals = compute_age_totals(_daily, view_key)
+    summaries = {}
+    for key, (_, _, groups, _) in AGE_PIE_GROUPS.items():
+        if not all(column in age_totals for column, _ in groups):
+            continue
+        counts = {label: age_totals[column] for column, label in groups}
+        total = sum(counts.values())
+        lines = [
+            f"- {label}: {count:,.0f} ({(count / total * 100) if total > 0 else 0:.1f}%)"
+            for label, count in counts.items()
+        ]
+        summaries[key] = {'counts': counts, 'total': total, 'lines': lines}
+    return summaries
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_age_pie_figure(labels, values, palette):
+    """Age-group pie for one set of totals"""
+    fig = px.pie(
+        values=list(values),
+        names=list(labels),
+        color_discrete_sequence=list(palette)
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10))
+    return fig
+
+@st.cache_data(show_spinner=False)
+def compute_coverage_stats(_coverage, view_key):
+    """Average, low (<0.5), good (>=1.0) and total counts of the non-missing coverage indices"""
+    coverage = _coverage['coverage_index'].to_numpy(dtype=np.float64)
+    coverage = coverage[~np.isnan(coverage)]
+    return {
+        'avg': coverage.mean() if len(coverage) else np.nan,
+        'low': int(np.count_nonzero(coverage < 0.5)),
+        'good': int(np.count_nonzero(coverage >= 1.0)),
+        'total': len(coverage)
+    }
+
+@st.cache_data(show_spinner=False)
+def compute_state_coverage(_coverage, view_key):
+    """Per-state coverage summary, best average coverage first"""
+    # The result is re-sorted by coverage below, so skip groupby's key sort
+    state_coverage = _coverage.groupby('state', observed=True, sort=False).agg({
+        'coverage_index': 'mean',
+        'district': 'count',
+        'demo_total': 'sum',
+        'bio_total': 'sum'
+    }).reset_index()
+    state_coverage.columns = ['state', 'avg_coverage_index', 'district_count', 'demo_total', 'bio_total']
+    return state_coverage.sort_values('avg_coverage_index', ascending=False)
+
+@st.cache_data(show_spinner=False)
+def compute_state_anomaly_counts(_anomalies, cache_key, top_n=20):
+    """The top_n states by number of geographic anomalies"""
+    state_anomaly_counts = _anomalies.groupby('state', observed=True, sort=False).size().reset_index(name='anomaly_count')
+    return state_anomaly_counts.sort_values('anomaly_count', ascending=False).head(top_n)
+
+@st.cache_data(show_spinner=False)
+def compute_pincode_state_summary(_pincode_anomalies, cache_key, top_n=20):
+    """The top_n states by pincode anomaly count, with their average severity"""
+    state_anomaly_counts = _pincode_anomalies.groupby('state', observed=True, sort=False).agg({
+        'pincode': 'count',
+        'severity': 'mean'
+    }).reset_index()
+    state_anomaly_counts.columns = ['state', 'anomaly_count', 'avg_severity']
+    return state_anomaly_counts.sort_values('anomaly_count', ascending=False).head(top_n)
+
+@st.cache_data(show_spinner=False)
+def count_values(_df, column, names, cache_key):
+    """value_counts of column as a two-column frame named by names"""
+    counts = _df[column].value_counts()
+    # Categorical columns also count categories the filters removed
+    counts = counts[counts > 0].reset_index()
+    counts.columns = list(names)
+    return counts
+
+# Pincode severity filter options and the [low, high) severity range each keeps
+SEVERITY_BANDS = {
+    'High (≥0.7)': (0.7, np.inf),
+    'Medium (0.4-0.7)': (0.4, 0.7),
+    'Low (<0.4)': (-np.inf, 0.4),
+}
+
+def equality_filter_mask(df, filters):
+    """Boolean row mask for (column, value) selectbox filters, combined in one pass.
+    'All' and columns missing from df match every row."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, value in filters:
+        if value != 'All' and column in df.columns:
+            mask &= (df[column] == value).to_numpy()
+    return mask
+
+@st.cache_data(show_spinner=False)
+def unique_values(_df, column, cache_key, _mask=None, sort=False):
+    """Distinct non-null values of column (rows limited to _mask if given) for selectbox options, sorted if sort is set"""
+    values = _df[column] if _mask is None else _df[column][_mask]
+    distinct = values.dropna().unique().tolist()
+    return sorted(distinct) if sort else distinct
+
+# Surge time horizon options and the days_until_surge cutoff each one keeps
+SURGE_HORIZON_DAYS = {'Next 30 days': 30, 'Next 60 days': 60, 'Next 90 days': 90}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def filter_surge_predictions(_predictions, view_key, surge_type, priority, time_horizon):
+    """Surge predictions matching the tab filters, selected with one combined mask"""
+    mask = np.ones(len(_predictions), dtype=bool)
+    if surge_type != 'All' and 'surge_type' in _predictions.columns:
+        mask &= (_predictions['surge_type'] == surge_type).to_numpy()
+    if priority != 'All' and 'priority' in _predictions.columns:
+        mask &= (_predictions['priority'] == priority).to_numpy()
+    if time_horizon in SURGE_HORIZON_DAYS and 'days_until_surge' in _predictions.columns:
+        mask &= _predictions['days_until_surge'].to_numpy() <= SURGE_HORIZON_DAYS[time_horizon]
+    return _predictions[mask]
+
+@st.cache_data(show_spinner=False)
+def top_surges_by_magnitude(_predictions, cache_key, n=20):
+    """The n surge predictions with the largest expected magnitude"""
+    return top_n_rows(_predictions, 'expected_magnitude', n)
+
+# Pattern that puts a daily feature column into each feature category
+FEATURE_CATEGORY_PATTERNS = {
+    'Lag Features': re.compile('_lag_'),
+    'Rolling Statistics': re.compile('_rolling_'),
+    'Z-Score Features': re.compile('_z_score|_deviation|_pct_change'),
+    'IQR Features': re.compile('_iqr'),
+    'Seasonal Features': re.compile('day_of_week|month|quarter|week_of_year'),
+}
+
+@st.cache_data(show_spinner=False)
+def classify_feature_columns(columns):
+    """Column names per feature category, in column order; columns is a tuple so it hashes cheaply"""
+    names = pd.Index(columns).astype(str)
+    return {
+        category: names[names.str.contains(pattern)].tolist()
+        for category, pattern in FEATURE_CATEGORY_PATTERNS.items()
+    }
+
+# Priority levels in display order; anything else sorts last as missing
+PRIORITY_ORDER = pd.CategoricalDtype(['High', 'Medium', 'Low'], ordered=True)
+ACTION_PRIORITY_ORDER = pd.CategoricalDtype(['Critical', 'High', 'Medium', 'Low'], ordered=True)
+
+@st.cache_data(show_spinner=False)
+def count_priorities(_df, cache_key, with_critical=False):
+    """Priority/Count frame of the priority column in priority order (Critical first if with_critical)"""
+    counts = _df['priority'].value_counts()
+    counts = counts[counts > 0].rename_axis('Priority').reset_index(name='Count')
+    order = ACTION_PRIORITY_ORDER if with_critical else PRIORITY_ORDER
+    return counts.astype({'Priority': order}).sort_values('Priority')
+
+# Chart colour per priority level
+PRIORITY_COLORS = {'High': '#d62728', 'Medium': '#ff7f0e', 'Low': '#2ca02c'}
+
+# Card border and background colours by priority; anything else renders as low priority
+PRIORITY_CARD_COLORS = {'High': ('#d62728', '#ffe6e6'), 'Medium': ('#ff7f0e', '#fff4e6')}
+LOW_PRIORITY_CARD_COLORS = ('#2ca02c', '#e6ffe6')
+
+# Actionable insight cards: (border, background, icon) by priority, low priority otherwise
+ACTION_CARD_STYLES = {
+    'Critical': ('#8B0000', '#ffe6e6', '🔴'),
+    'High': ('#d62728', '#ffe6e6', '🟠'),
+    'Medium': ('#ff7f0e', '#fff4e6', '🟡'),
+}
+LOW_PRIORITY_ACTION_CARD_STYLE = ('#2ca02c', '#e6ffe6', '🟢')
+ACTION_CARD_TEMPLATE = (
+    '<div style="background-color: {bg_color}; padding: 1.5rem; border-left: 5px solid {border_color}; '
+    'border-radius: 0.5rem; margin: 1.5rem 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); color: #333;">'
+    '<div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;">'
+    '<h3 style="color: {border_color}; margin-top: 0; margin-bottom: 0.5rem;">{icon} {title}</h3>'
+    '<span style="background-color: {border_color}; color: white; padding: 0.25rem 0.75rem; '
+    'border-radius: 1rem; font-size: 0.85rem; font-weight: bold;">{priority}</span>'
+    '</div>'
+    '<div style="margin-bottom: 0.75rem; color: #333;">'
+    '<strong style="color: #555;">Type:</strong> <span style="color: #333;">{insight_type}</span> | '
+    '<strong style="color: #555;">Location:</strong> <span style="color: #333;">{location}</span> | '
+    '<strong style="color: #555;">Timeline:</strong> <span style="color: #333;">{timeline}</span>'
+    '</div>'
+    '{sections}</div>'
+)
+ACTION_CARD_SECTION_TEMPLATE = (
+    '<div style="margin-bottom: {margin}; color: #333;"><strong style="color: #555;">{label}:</strong>{content}</div>'
+)
+
+def render_metric_row(metrics, num_columns=None):
+    """Render (label, value, st.metric options) tuples side by side, one per column.
+    num_columns keeps the grid width fixed when optional metrics are left out."""
+    with st.container():
+        for column, (label, value, options) in zip(st.columns(num_columns or len(metrics)), metrics):
+            column.metric(label, value, **options)
+
+# Rows rendered by the detail-table expanders; the full table stays downloadable
+TABLE_ROW_LIMIT = 500
+
+def render_limited_table(display_df, file_name, key, limit=TABLE_ROW_LIMIT):
+    """st.dataframe of the first limit rows, with a caption and a full CSV download when rows were cut"""
+    st.dataframe(display_df.head(limit), use_container_width=True, hide_index=True)
+    if len(display_df) > limit:
+        st.caption(f"Showing {limit} of {len(display_df)} rows")
+        st.download_button(
+            "📥 Download all rows (.csv)",
+            display_df.to_csv(index=False).encode('utf-8'),
+            file_name,
+            "text/csv",
+            key=key
+        )
+
+def with_default_columns(df, defaults):
+    """Add any missing columns with a constant default so itertuples() attribute access never raises"""
+    missing = {col: value for col, value in defaults.items() if col not in df.columns}
+    return df.assign(**missing) if missing else df
+
+def action_card_html(priority, title, insight_type, location, timeline, rationale, expected_impact, action_items_html):
+    """HTML for one actionable insight card; callers join the cards into a single st.markdown"""
+    border_color, bg_color, icon = ACTION_CARD_STYLES.get(priority, LOW_PRIORITY_ACTION_CARD_STYLE)
+    sections = ''
+    if rationale:
+        sections += ACTION_CARD_SECTION_TEMPLATE.format(
+            margin='0.75rem', label='Rationale', content=f' <span style="color: #333;">{rationale}</span>'
+        )
+    if expected_impact:
+        sections += ACTION_CARD_SECTION_TEMPLATE.format(
+            margin='0.75rem', label='Expected Impact', content=f' <span style="color: #333;">{expected_impact}</span>'
+        )
+    if action_items_html:
+        sections += ACTION_CARD_SECTION_TEMPLATE.format(margin='0', label='Action Items', content=action_items_html)
+    return ACTION_CARD_TEMPLATE.format(
+        bg_color=bg_color, border_color=border_color, icon=icon, title=title, priority=priority,
+        insight_type=insight_type, location=location, timeline=timeline, sections=sections
+    )
+
+def priority_card_html(priority, heading, body_html):
+    """HTML for one priority-coloured card; callers join the cards into a single st.markdown"""
+    border_color, bg_color = PRIORITY_CARD_COLORS.get(priority, LOW_PRIORITY_CARD_COLORS)
+    return (
+        f'<div style="background-color: {bg_color}; padding: 1rem; border-left: 4px solid {border_color}; '
+        f'border-radius: 0.25rem; margin: 1rem 0;">'
+        f'<h4 style="color: {border_color}; margin-top: 0;">{heading}</h4>'
+        f'{body_html}</div>'
+    )
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def build_coverage_histogram_figure(_coverage, view_key, bins=50):
+    """Coverage index histogram binned with NumPy, so only the bin counts reach the browser"""
+    coverage = _coverage['coverage_index'].to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(coverage[~np.isnan(coverage)], bins=bins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#1f77b4',
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='Coverage Index: %{customdata[0]:.2f} - %{customdata[1]:.2f}<br>Number of Districts: %{y}<extra></extra>'
+    ))
+    fig.add_vline(x=1.0, line_dash="dash", line_color="green", annotation_text="Ideal (1.0)")
+    fig.add_vline(x=0.5, line_dash="dash", line_color="red", annotation_text="Low (0.5)")
+    fig.update_layout(
+        xaxis_title='Coverage Index',
+        yaxis_title='Number of Districts',
+        bargap=0,
+        height=450,
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def build_feature_histogram_figure(_features_daily, feature, view_key, bins=30):
+    """Distribution of one daily feature binned with NumPy, so only the bin counts reach the browser"""
+    values = _features_daily[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#1f77b4',
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=f'{feature}: %{{customdata[0]:.2f}} - %{{customdata[1]:.2f}}<br>Frequency: %{{y}}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title=feature,
+        yaxis_title='Frequency',
+        bargap=0,
+        height=300,
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+    return fig
+
+# Frames load_data sorts by date so the date filter can binary search them
+DATE_SORTED_KEYS = ('daily', 'biometric', 'demographic', 'enrolment', 'features_daily')
+
+# Low-cardinality label columns of the anomaly, surge, district/pincode and insight results,
+# stored as Categorical so equality filters and counts work on integer codes
+CATEGORICAL_LABEL_KEYS = (
+    'anomalies', 'surge_predictions', 'upcoming_surges', 'insights', 'actionable_insights',
+    'district_forecasts', 'pincode_anomalies'
+)
+CATEGORICAL_LABEL_COLUMNS = (
+    'priority', 'surge_type', 'subtype', 'detection_level', 'metric', 'category',
+    'volume_classification', 'insight_type', 'impact'
+)
+
+def categorize_label_columns(df):
+    """Convert the label columns present in df to Categorical. Categories keep first-appearance
+    order, so value_counts breaks ties the same way it did on the object columns."""
+    columns = {
+        col: pd.CategoricalDtype(pd.unique(df[col].dropna()))
+        for col in CATEGORICAL_LABEL_COLUMNS if col in df.columns
+    }
+    return df.astype(columns) if columns else df
+
+# Directories whose CSV/JSON outputs feed load_data
+DATA_DIRS = (
+    'analysis_results', 'processed_data', 'anomaly_results', 'pattern_results',
+    'forecast_results', 'surge_results', 'feature_results',
+    'district_pincode_results', 'insights_results'
+)
+
+def scan_data_files():
+    """Map each CSV/JSON data file path to its os.DirEntry, with one os.scandir per directory"""
+    entries = {}
+    for directory in DATA_DIRS:
         try:
-            if (pattern_path / 'daily_patterns_summary.csv').exists():
-                data['daily_patterns'] = pd.read_csv(pattern_path / 'daily_patterns_summary.csv')
-            if (pattern_path / 'state_patterns_summary.csv').exists():
-                data['state_patterns'] = pd.read_csv(pattern_path / 'state_patterns_summary.csv')
-        except Exception as e:
-            # Pattern learning results not available yet
-            pass
-        
-        # Load forecasting results (Feature 2)
-        forecast_path = Path('forecast_results')
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.endswith(('.csv', '.json')):
+                        entries[str(Path(directory) / entry.name)] = entry
+        except FileNotFoundError:
+            # Feature output not generated yet
+            continue
+    return entries
+
+def get_data_files_signature():
+    """Digest of the data files' paths and modification times, used to invalidate the caches"""
+    signature = tuple(
+        (path, entry.stat().st_mtime_ns) for path, entry in sorted(scan_data_files().items())
+    )
+    # A short digest keeps every cache key that includes it cheap for Streamlit to hash
+    return hashlib.blake2b(repr(signature).encode(), digest_size=16).hexdigest()
+
+# Columns of the raw datasets the dashboard and forensic analysis use
+RAW_COLUMNS = {
+    'biometric': ['date', 'state', 'district', 'pincode', 'bio_age_5_17', 'bio_age_17_'],
+    'demographic': ['date', 'state', 'district', 'pincode', 'demo_age_5_17', 'demo_age_17_'],
+    'enrolment': ['date', 'state', 'district', 'pincode', 'age_0_5', 'age_5_17', 'age_18_greater'],
+}
+
+def raw_csv_options(dataset_name):
+    """read_csv options for a raw dataset: only the used columns, parsed by pyarrow when installed"""
+    options = {'usecols': RAW_COLUMNS[dataset_name]}
+    if PYARROW_AVAILABLE:
+        # Multithreaded reader; typing the date column replaces a separate parse_dates pass
+        options.update(engine='pyarrow', dtype={'date': 'datetime64[us]'})
+    else:
+        options['parse_dates'] = ['date']
+    return options
+
+def downcast_int_columns(df, whole_floats=False):
+    """Store int64 columns as int32 when their values fit, halving the bytes each scan touches.
+    With whole_floats, float64 columns holding only whole numbers (counts) are included too."""
+    int32_info = np.iinfo(np.int32)
+    candidates = (np.int64, np.float64) if whole_floats else (np.int64,)
+    int32_columns = {}
+    for column in df.columns:
+        if df[column].dtype not in candidates or len(df) == 0:
+            continue
+        values = df[column].to_numpy()
+        # NaN fails both checks, so columns with missing values keep their dtype
+        if values.dtype.kind == 'f' and not (np.isfinite(values).all() and (values == np.round(values)).all()):
+            continue
+        if int32_info.min <= values.min() and values.max() <= int32_info.max:
+            int32_columns[column] = np.int32
+    return df.astype(int32_columns) if int32_columns else df
+
+def read_csv_cached(csv_path, **read_csv_kwargs):
+    """Read a CSV via its sibling Parquet copy, transcoding it when missing or older than the CSV"""
+    csv_path = Path(csv_path)
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+    
+    parquet_path = csv_path.with_suffix('.parquet')
+    try:
+        if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return pd.read_parquet(parquet_path, engine='pyarrow', columns=read_csv_kwargs.get('usecols'))
+    except Exception:
+        # Unreadable or orphaned cache file, rebuild it from the CSV below
+        pass
+    
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    try:
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    except Exception:
+        # Columns pyarrow can't type (e.g. mixed objects) keep using the CSV
+        parquet_path.unlink(missing_ok=True)
+    return df
+
+def read_json_file(path):
+    """Load a JSON summary file, parsed by orjson when installed"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if ORJSON_AVAILABLE:
         try:
-            if (forecast_path / 'daily_forecasts.csv').exists():
-                data['daily_forecasts'] = pd.read_csv(forecast_path / 'daily_forecasts.csv')
-            if (forecast_path / 'daily_forecasts_summary.csv').exists():
-                data['daily_forecasts_summary'] = pd.read_csv(forecast_path / 'daily_forecasts_summary.csv')
-            if (forecast_path / 'state_forecasts.csv').exists():
-                data['state_forecasts'] = pd.read_csv(forecast_path / 'state_forecasts.csv')
-            if (forecast_path / 'state_forecasts_summary.csv').exists():
-                data['state_forecasts_summary'] = pd.read_csv(forecast_path / 'state_forecasts_summary.csv')
-        except Exception as e:
-            # Forecasting results not available yet
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity tokens json.dump writes for missing values
             pass
-        
-        # Load surge prediction results (Feature 4)
-        surge_path = Path('surge_results')
+    return json.loads(raw)
+
+def load_files_concurrently(tasks, optional=True, present_files=None):
+    """Run (key, path, loader) tasks in a thread pool and return {key: result} in task order.
+    Optional files that are missing (not in present_files) or fail to load are skipped;
+    otherwise errors propagate."""
+    if optional:
+        if present_files is None:
+            present_files = scan_data_files()
+        tasks = [task for task in tasks if str(task[1]) in present_files]
+    
+    # File reads and Parquet/pyarrow parsing release the GIL, so the loads overlap
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [(key, executor.submit(loader, path)) for key, path, loader in tasks]
+    
+    results = {}
+    for key, future in futures:
         try:
-            if (surge_path / 'surge_predictions.csv').exists():
-                surge_df = pd.read_csv(surge_path / 'surge_predictions.csv')
-                if 'predicted_date' in surge_df.columns:
-                    surge_df['predicted_date'] = pd.to_datetime(surge_df['predicted_date'], errors='coerce')
-                data['surge_predictions'] = surge_df
-            if (surge_path / 'upcoming_surges.csv').exists():
-                upcoming_df = pd.read_csv(surge_path / 'upcoming_surges.csv')
-                if 'predicted_date' in upcoming_df.columns:
-                    upcoming_df['predicted_date'] = pd.to_datetime(upcoming_df['predicted_date'], errors='coerce')
-                data['upcoming_surges'] = upcoming_df
-        except Exception as e:
-            # Surge prediction results not available yet
-            pass
+            results[key] = future.result()
+        except Exception:
+            if not optional:
+                raise
+    return results
+
+@st.cache_resource(max_entries=1)
+def load_data(files_signature=''):
+    """Load all analysis results and raw data once per process (shared, treat as read-only).
+    files_signature only keys the cache so edited result files trigger a reload."""
+    data_path = Path('analysis_results')
+    processed_path = Path('processed_data')
+    anomaly_path = Path('anomaly_results')
+    pattern_path = Path('pattern_results')
+    forecast_path = Path('forecast_results')
+    surge_path = Path('surge_results')
+    feature_path = Path('feature_results')
+    district_pincode_path = Path('district_pincode_results')
+    insights_path = Path('insights_results')
+    
+    # Analysis results and raw data the dashboard cannot run without
+    required_tasks = [
+        ('daily', data_path / 'daily_aggregated_data.csv', partial(read_csv_cached, parse_dates=['date'])),
+        ('state', data_path / 'state_level_analysis.csv', read_csv_cached),
+        ('district_coverage', data_path / 'district_coverage_analysis.csv', read_csv_cached),
+        ('insights', data_path / 'key_insights.csv', read_csv_cached),
+        ('biometric', processed_path / 'biometric_cleaned.csv', partial(read_csv_cached, **raw_csv_options('biometric'))),
+        ('demographic', processed_path / 'demographic_cleaned.csv', partial(read_csv_cached, **raw_csv_options('demographic'))),
+        ('enrolment', processed_path / 'enrolment_cleaned.csv', partial(read_csv_cached, **raw_csv_options('enrolment'))),
+    ]
+    
+    # Feature outputs that may not have been generated yet
+    optional_tasks = [
+        # Anomaly detection results
+        ('anomalies', anomaly_path / 'anomalies_detected.csv', read_csv_cached),
+        ('anomalies_geo', anomaly_path / 'anomalies_geographic.csv', read_csv_cached),
+        # Pattern learning results (Feature 1)
+        ('daily_patterns', pattern_path / 'daily_patterns_summary.csv', read_csv_cached),
+        ('state_patterns', pattern_path / 'state_patterns_summary.csv', read_csv_cached),
+        # Forecasting results (Feature 2)
+        ('daily_forecasts', forecast_path / 'daily_forecasts.csv', read_csv_cached),
+        ('daily_forecasts_summary', forecast_path / 'daily_forecasts_summary.csv', read_csv_cached),
+        ('state_forecasts', forecast_path / 'state_forecasts.csv', read_csv_cached),
+        ('state_forecasts_summary', forecast_path / 'state_forecasts_summary.csv', read_csv_cached),
+        # Surge prediction results (Feature 4)
+        ('surge_predictions', surge_path / 'surge_predictions.csv', read_csv_cached),
+        ('upcoming_surges', surge_path / 'upcoming_surges.csv', read_csv_cached),
+        # Feature engineering results (Feature 5)
+        ('features_daily', feature_path / 'features_daily.csv', read_csv_cached),
+        ('features_state', feature_path / 'features_state.csv', read_csv_cached),
+        ('features_summary', feature_path / 'feature_engineering_summary.json', read_json_file),
+        # District & pincode model results (Feature 6)
+        ('district_forecasts', district_pincode_path / 'district_forecasts.csv', read_csv_cached),
+        ('pincode_anomalies', district_pincode_path / 'pincode_anomalies.csv', read_csv_cached),
+        ('district_state_aggregations', district_pincode_path / 'state_aggregations.csv', read_csv_cached),
+        ('district_volume_aggregations', district_pincode_path / 'volume_aggregations.csv', read_csv_cached),
+        ('district_pincode_summary', district_pincode_path / 'district_pincode_summary.json', read_json_file),
+        # Actionable insights (Feature 9)
+        ('actionable_insights', insights_path / 'actionable_insights.csv', read_csv_cached),
+        ('insights_summary', insights_path / 'insights_summary.json', read_json_file),
+    ]
+    
+    try:
+        data = load_files_concurrently(required_tasks, optional=False)
+        optional_data = load_files_concurrently(optional_tasks)
         
-        # Load feature engineering results (Feature 5)
-        feature_path = Path('feature_results')
-        try:
-            if (feature_path / 'features_daily.csv').exists():
-                feature_daily_df = pd.read_csv(feature_path / 'features_daily.csv')
-                if 'date' in feature_daily_df.columns:
-                    feature_daily_df['date'] = pd.to_datetime(feature_daily_df['date'], errors='coerce')
-                data['features_daily'] = feature_daily_df
-            if (feature_path / 'features_state.csv').exists():
-                data['features_state'] = pd.read_csv(feature_path / 'features_state.csv')
-            if (feature_path / 'feature_engineering_summary.json').exists():
-                with open(feature_path / 'feature_engineering_summary.json', 'r') as f:
-                    data['features_summary'] = json.load(f)
-        except Exception as e:
-            # Feature engineering results not available yet
-            pass
+        # Parse date columns of the optional results
+        for key, date_col in [('anomalies', 'date'), ('surge_predictions', 'predicted_date'),
+                              ('upcoming_surges', 'predicted_date'), ('features_daily', 'date')]:
+            if key in optional_data and date_col in optional_data[key].columns:
+                optional_data[key][date_col] = pd.to_datetime(optional_data[key][date_col], errors='coerce')
         
-        # Load district & pincode model results (Feature 6)
-        district_pincode_path = Path('district_pincode_results')
-        try:
-            if (district_pincode_path / 'district_forecasts.csv').exists():
-                data['district_forecasts'] = pd.read_csv(district_pincode_path / 'district_forecasts.csv')
-            if (district_pincode_path / 'pincode_anomalies.csv').exists():
-                data['pincode_anomalies'] = pd.read_csv(district_pincode_path / 'pincode_anomalies.csv')
-            if (district_pincode_path / 'state_aggregations.csv').exists():
-                data['district_state_aggregations'] = pd.read_csv(district_pincode_path / 'state_aggregations.csv')
-            if (district_pincode_path / 'volume_aggregations.csv').exists():
-                data['district_volume_aggregations'] = pd.read_csv(district_pincode_path / 'volume_aggregations.csv')
-            if (district_pincode_path / 'district_pincode_summary.json').exists():
-                with open(district_pincode_path / 'district_pincode_summary.json', 'r') as f:
-                    data['district_pincode_summary'] = json.load(f)
-        except Exception as e:
-            # District & pincode results not available yet
-            pass
+        data.update(optional_data)
         
-        # Load actionable insights (Feature 9)
-        insights_path = Path('insights_results')
-        try:
-            if (insights_path / 'actionable_insights.csv').exists():
-                data['actionable_insights'] = pd.read_csv(insights_path / 'actionable_insights.csv')
-            if (insights_path / 'insights_summary.json').exists():
-                with open(insights_path / 'insights_summary.json', 'r') as f:
-                    data['insights_summary'] = json.load(f)
-        except Exception as e:
-            # Actionable insights not available yet
-            pass
+        # Raw counts and pincodes fit in int32 (sums still accumulate in int64)
+        for key in ['biometric', 'demographic', 'enrolment']:
+            data[key] = downcast_int_columns(data[key])
+        # Aggregated counts are saved as floats; whole-number columns are counts too
+        for key in ['daily', 'state']:
+            data[key] = downcast_int_columns(data[key], whole_floats=True)
         
-        # Load raw data for detailed analysis
-        data['biometric'] = pd.read_csv(processed_path / 'biometric_cleaned.csv', parse_dates=['date'])
-        data['demographic'] = pd.read_csv(processed_path / 'demographic_cleaned.csv', parse_dates=['date'])
-        data['enrolment'] = pd.read_csv(processed_path / 'enrolment_cleaned.csv', parse_dates=['date'])
+        for key in CATEGORICAL_LABEL_KEYS:
+            if isinstance(data.get(key), pd.DataFrame):
+                data[key] = categorize_label_columns(data[key])
         
-        # Ensure date columns are datetime
-        for key in ['daily', 'biometric', 'demographic', 'enrolment']:
-            if 'date' in data[key].columns:
-                data[key]['date'] = pd.to_datetime(data[key]['date'])
+        # Sort dated frames once so date filtering is a slice rather than a scan
+        for key in DATE_SORTED_KEYS:
+            if key in data:
+                data[key] = data[key].sort_values('date', kind='stable', ignore_index=True)
         
         # Apply state name normalization to fix duplicates and spelling errors
         datasets_with_state = [
@@ -662,9 +1670,27 @@ def load_data():
             'state_forecasts_summary', 'features_state', 'district_forecasts',
             'pincode_anomalies', 'district_state_aggregations', 'actionable_insights'
         ]
-        for key in datasets_with_state:
-            if key in data and isinstance(data[key], pd.DataFrame):
-                data[key] = normalize_state_column(data[key], 'state')
+        state_keys = [key for key in datasets_with_state if isinstance(data.get(key), pd.DataFrame)]
+        # Frames are independent and the code remapping is numpy work, so normalize them side by side
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            normalized_frames = list(executor.map(normalize_state_column, (data[key] for key in state_keys)))
+        data.update(zip(state_keys, normalized_frames))
+        
+        # Canonical state list shared by the sidebar, computed once instead of per rerun
+        data['state_categories'] = pd.Index(get_unique_states(data))
+        
+        # Precompute row positions per state for every frame with a state column,
+        # so filtering is a gather, not a scan
+        data['state_row_indices'] = {
+            key: df.groupby('state', observed=True, sort=False).indices
+            for key, df in data.items()
+            if isinstance(df, pd.DataFrame) and 'state' in df.columns
+        }
+        
+        # Pre-aggregate raw data per state once so switching states is a lookup
+        data['daily_by_state'] = build_daily_by_state(
+            data['biometric'], data['demographic'], data['enrolment']
+        )
         
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
@@ -674,83 +1700,705 @@ def load_data():
     return data
 
 
-def main():
-    """Main dashboard application"""
-    
-    # Government Header with Emblem
+@st.cache_resource
+def get_emblem_data_uri():
+    """Base64 data URI of the emblem image, read and encoded once per process (None if missing)"""
     # Try multiple possible filenames
-    possible_emblem_files = ["india_emblem.png", "india_emblem.jpg"]
-    emblem_path = None
-    
-    for filename in possible_emblem_files:
-        if Path(filename).exists():
-            emblem_path = filename
-            break
-            
-    # Fallback to absolute path if needed (though local should work)
-    if not emblem_path:
-        # Check if it was the full path from previous version but maybe filename changed
-        pass
-    
-    try:
-        if emblem_path:
-            import base64
-            with open(emblem_path, "rb") as img_file:
-                emblem_b64 = base64.b64encode(img_file.read()).decode()
-            
+    for filename in ("india_emblem.png", "india_emblem.jpg"):
+        emblem_path = Path(filename)
+        if emblem_path.exists():
             # Determine mime type based on extension
-            mime_type = "image/png" if emblem_path.lower().endswith(".png") else "image/jpeg"
-            
-            st.markdown(f"""
-            <div class="gov-header">
-                <div class="gov-header-content">
-                    <div class="emblem-container">
-                        <img src="data:{mime_type};base64,{emblem_b64}" class="emblem-img" alt="State Emblem of India">
-                    </div>
-                    <div class="header-text">
-                        <p class="gov-title">भारत सरकार | Government of India</p>
-                        <h1 class="main-header">UIDAI Analytics Dashboard</h1>
-                        <p class="sub-header">AI-Driven Early Warning System for Aadhaar Update Surges and Anomalies</p>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            raise FileNotFoundError("Emblem image not found")
-            
-    except Exception as e:
-        # Fallback header if emblem image not found
-        st.markdown("""
-        <div class="gov-header">
-            <div class="gov-header-content">
-                <div class="header-text">
-                    <p class="gov-title">🇮🇳 भारत सरकार | Government of India</p>
-                    <h1 class="main-header">UIDAI Analytics Dashboard</h1>
-                    <p class="sub-header">AI-Driven Early Warning System for Aadhaar Update Surges and Anomalies</p>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Load data
-    data = load_data()
-    if data is None:
+            mime_type = "image/png" if filename.endswith(".png") else "image/jpeg"
+            emblem_b64 = base64.b64encode(emblem_path.read_bytes()).decode()
+            return f"data:{mime_type};base64,{emblem_b64}"
+    return None
+
+
+# Fragment reruns re-execute only the decorated function; Streamlit < 1.33 falls back to full reruns
+st_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@st_fragment
+def render_low_coverage_districts(coverage_df):
+    """Coverage-threshold slider and the low-coverage district chart it drives"""
+    st.markdown("##### Districts Needing Attention (Low Coverage)")
+    st.session_state.setdefault("coverage_threshold", 0.5)
+    threshold = st.slider("Coverage Threshold", 0.0, 1.0, step=0.1, key="coverage_threshold")
+    low_coverage_districts = coverage_df[coverage_df['coverage_index'] < threshold].sort_values('coverage_index')
+
+    if len(low_coverage_districts) > 0:
+        top_low = low_coverage_districts.head(20)[['state', 'district', 'coverage_index', 'demo_total', 'bio_total']]
+        fig = px.bar(
+            top_low,
+            x='coverage_index',
+            y='district',
+            orientation='h',
+            color='coverage_index',
+            color_continuous_scale='Reds',
+            title=f"Top 20 Districts with Coverage < {threshold}",
+            labels={'coverage_index': 'Coverage Index', 'district': 'District'},
+            hover_data=['state', 'demo_total', 'bio_total']
+        )
+        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+        st.plotly_chart(fig, use_container_width=True, key="low_cov_bar")
+    else:
+        st.info(f"No districts found with coverage below {threshold}")
+
+@st_fragment
+def render_state_coverage_chart(state_coverage):
+    """Number-of-states slider and the state coverage bar chart it drives"""
+    st.session_state.setdefault("top_coverage_states", 15)
+    top_n_coverage = st.slider("Number of States", 5, 30, key="top_coverage_states")
+    top_states_coverage = state_coverage.head(top_n_coverage)
+
+    fig = px.bar(
+        top_states_coverage,
+        x='avg_coverage_index',
+        y='state',
+        orientation='h',
+        color='avg_coverage_index',
+        color_continuous_scale='RdYlGn',
+        labels={'avg_coverage_index': 'Avg Coverage', 'state': 'State'},
+        hover_data=['district_count', 'demo_total', 'bio_total']
+    )
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
+    st.plotly_chart(fig, use_container_width=True, key="state_cov_bar")
+
+@st_fragment
+def render_surge_explorer(predictions_df, upcoming_surges, view_key):
+    """Surge Predictions filters and everything they drive: charts, detail table and upcoming-surge cards"""
+    # Filters
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        surge_type_filter = st.selectbox(
+            "Filter by Surge Type",
+            ['All'] + unique_values(predictions_df, 'surge_type', (view_key, 'surge_predictions')) if 'surge_type' in predictions_df.columns else ['All'],
+            key="surge_type_filter"
+        )
+
+    with col2:
+        priority_filter = st.selectbox(
+            "Filter by Priority",
+            ['All', 'High', 'Medium', 'Low'],
+            key="surge_priority_filter"
+        )
+
+    with col3:
+        time_horizon = st.selectbox(
+            "Time Horizon",
+            ['All'] + list(SURGE_HORIZON_DAYS),
+            key="surge_time_horizon"
+        )
+
+    # Apply filters
+    filtered_df = filter_surge_predictions(
+        predictions_df, view_key, surge_type_filter, priority_filter, time_horizon
+    )
+
+    st.markdown("---")
+
+    # Surge predictions visualization
+    if len(filtered_df) > 0:
+        # Identifies filtered_df for the cached counts below
+        surge_filters = (view_key, surge_type_filter, priority_filter, time_horizon)
+        # Surge type distribution
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("##### Surges by Type")
+            if 'surge_type' in filtered_df.columns:
+                type_counts = count_values(filtered_df, 'surge_type', ('Surge Type', 'Count'), surge_filters)
+
+                fig = px.pie(
+                    type_counts,
+                    values='Count',
+                    names='Surge Type',
+                    title="Distribution of Surge Predictions by Type",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                st.plotly_chart(fig, use_container_width=True, key="surge_type_pie")
+
+        with col2:
+            st.markdown("##### Surges by Priority")
+            if 'priority' in filtered_df.columns:
+                priority_counts = count_priorities(filtered_df, surge_filters)
+
+                color_map = PRIORITY_COLORS
+
+                fig = px.bar(
+                    priority_counts,
+                    x='Priority',
+                    y='Count',
+                    title="Distribution of Surge Predictions by Priority",
+                    labels={'Count': 'Number of Surges', 'Priority': 'Priority Level'},
+                    color='Priority',
+                    color_discrete_map=color_map
+                )
+                st.plotly_chart(fig, use_container_width=True, key="surge_priority_bar")
+
+        st.markdown("---")
+
+        # Timeline visualization
+        st.markdown("##### Surge Timeline")
+        if 'predicted_date' in filtered_df.columns and 'days_until_surge' in filtered_df.columns:
+            # sort_values already returns a new frame
+            timeline_df = filtered_df.sort_values('predicted_date')
+
+            fig = go.Figure()
+
+            # Color by priority; one groupby pass splits the rows instead of a mask per priority
+            if 'priority' in timeline_df.columns:
+                priority_groups = timeline_df.groupby('priority', observed=True, sort=False)
+            else:
+                priority_groups = [('High', timeline_df)]
+            for priority, priority_data in priority_groups:
+                color = PRIORITY_COLORS.get(priority, '#1f77b4')
+
+                fig.add_trace(scatter_trace_class(len(priority_data))(
+                    x=priority_data['predicted_date'],
+                    y=priority_data['expected_magnitude'] if 'expected_magnitude' in priority_data.columns else range(len(priority_data)),
+                    mode='markers+lines',
+                    name=f'{priority} Priority',
+                    marker=dict(size=10, color=color),
+                    line=dict(color=color, width=2),
+                    hovertemplate='<b>%{text}</b><br>Date: %{x}<br>Magnitude: %{y:.2f}<extra></extra>',
+                    text=priority_data['state'] if 'state' in priority_data.columns else None
+                ))
+
+            fig.update_layout(
+                title="Surge Predictions Timeline",
+                xaxis_title="Predicted Date",
+                yaxis_title="Expected Surge Magnitude",
+                hovermode='closest',
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True, key="surge_timeline")
+
+        st.markdown("---")
+
+        # Top surges by magnitude
+        st.markdown("##### Top Surges by Expected Magnitude")
+        if 'expected_magnitude' in filtered_df.columns:
+            top_surges = top_surges_by_magnitude(filtered_df, surge_filters)
+
+            fig = px.bar(
+                top_surges,
+                x='expected_magnitude',
+                y='state' if 'state' in top_surges.columns else top_surges.index,
+                orientation='h',
+                color='confidence' if 'confidence' in top_surges.columns else None,
+                title="Top 20 Surge Predictions by Magnitude",
+                labels={'expected_magnitude': 'Expected Surge Magnitude', 'state': 'State'},
+                color_continuous_scale='Reds',
+                hover_data=['days_until_surge', 'confidence', 'priority'] if all(col in top_surges.columns for col in ['days_until_surge', 'confidence', 'priority']) else None
+            )
+            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+            st.plotly_chart(fig, use_container_width=True, key="surge_top_mag")
+
+        st.markdown("---")
+
+        # Detailed surge predictions table
+        st.markdown("##### Detailed Surge Predictions")
+        display_cols = ['surge_type', 'subtype', 'state', 'predicted_date', 'days_until_surge', 
+                       'expected_magnitude', 'estimated_volume', 'confidence', 'priority']
+        available_cols = [col for col in display_cols if col in filtered_df.columns]
+        display_df = filtered_df[available_cols].sort_values('days_until_surge', ascending=True)
+
+        # All formatting happens in the browser, so no column is rewritten as strings
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'predicted_date': st.column_config.DateColumn(format="YYYY-MM-DD"),
+                'expected_magnitude': st.column_config.NumberColumn(format="%.2f"),
+                'estimated_volume': st.column_config.NumberColumn(format="%,.0f"),
+                'confidence': st.column_config.NumberColumn(format="%.2f")
+            }
+        )
+
+        # Upcoming surges alert
+        if upcoming_surges is not None and len(upcoming_surges) > 0:
+            st.markdown("---")
+            st.markdown("##### 🚨 Upcoming Surges (Next 30 Days)")
+            upcoming_df = upcoming_surges
+
+            surge_cards = []
+            upcoming_df = with_default_columns(upcoming_df, {
+                'priority': 'High', 'state': 'Unknown', 'days_until_surge': 0,
+                'expected_magnitude': 0, 'confidence': 0
+            })
+            for row in upcoming_df.itertuples(index=False):
+                priority = row.priority
+                state = row.state
+                days_until = row.days_until_surge
+                magnitude = row.expected_magnitude
+                confidence = row.confidence
+                surge_cards.append(priority_card_html(
+                    priority,
+                    f"{state} - {priority} Priority Surge",
+                    f'<p style="margin-bottom: 0.5rem;"><strong>Days Until Surge:</strong> {days_until} days</p>'
+                    f'<p style="margin-bottom: 0.5rem;"><strong>Expected Magnitude:</strong> {magnitude:.2f}x baseline</p>'
+                    f'<p style="margin-bottom: 0;"><strong>Confidence:</strong> {confidence:.2f}</p>'
+                ))
+            # One markdown element for every card
+            st.markdown(''.join(surge_cards), unsafe_allow_html=True)
+
+    else:
+        st.info("No surge predictions found with the selected filters.")
+
+@st_fragment
+def render_daily_feature_panel(features_daily_df, view_key):
+    """Daily feature category/feature selectors and the timeline, statistics and histogram they drive"""
+    # Feature category selector
+    feature_category = st.selectbox(
+        "Select Feature Category",
+        list(FEATURE_CATEGORY_PATTERNS),
+        key="feature_category"
+    )
+
+    # Get relevant columns
+    feature_cols = classify_feature_columns(tuple(features_daily_df.columns)).get(feature_category, [])
+
+    if len(feature_cols) > 0 and 'date' in features_daily_df.columns:
+        # Select a feature to visualize
+        selected_feature = st.selectbox("Select Feature", feature_cols[:10], key="selected_feature_daily")
+
+        if selected_feature in features_daily_df.columns:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown(f"##### {selected_feature} Over Time")
+                fig = build_feature_timeline_figure(features_daily_df, selected_feature, view_key)
+                st.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                st.markdown(f"##### {selected_feature} Statistics")
+                # Only the four statistics shown; describe() would also compute count and quantiles
+                values = features_daily_df[selected_feature].to_numpy(dtype=np.float64, na_value=np.nan)
+                values = values[~np.isnan(values)]
+                feature_stats = {
+                    'mean': values.mean(), 'std': values.std(ddof=1), 'min': values.min(), 'max': values.max()
+                } if values.size else {}
+
+                col_stat1, col_stat2 = st.columns(2)
+                with col_stat1:
+                    st.metric("Mean", f"{feature_stats.get('mean', 0):.2f}")
+                    st.metric("Std", f"{feature_stats.get('std', 0):.2f}")
+                with col_stat2:
+                    st.metric("Min", f"{feature_stats.get('min', 0):.2f}")
+                    st.metric("Max", f"{feature_stats.get('max', 0):.2f}")
+
+                # Distribution histogram
+                fig = build_feature_histogram_figure(features_daily_df, selected_feature, view_key)
+                st.plotly_chart(fig, use_container_width=True)
+
+@st_fragment
+def render_state_feature_panel(features_state_df):
+    """State feature selector, number-of-states slider and the bar chart they drive"""
+    # Get feature columns (exclude state name)
+    feature_cols = [col for col in features_state_df.columns if col != 'state']
+
+    if len(feature_cols) > 0:
+        selected_feature_state = st.selectbox("Select Feature", feature_cols[:15], key="selected_feature_state")
+
+        if selected_feature_state in features_state_df.columns and 'state' in features_state_df.columns:
+            # Top states by feature value
+            st.session_state.setdefault("top_n_features", 15)
+            top_n_features = st.slider("Number of States", 5, 30, key="top_n_features")
+            top_states = top_n_rows(features_state_df, selected_feature_state, top_n_features)[['state', selected_feature_state]]
+
+            fig = px.bar(
+                top_states,
+                x=selected_feature_state,
+                y='state',
+                orientation='h',
+                labels={selected_feature_state: 'Feature Value', 'state': 'State'},
+                color=selected_feature_state,
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
+            st.plotly_chart(fig, use_container_width=True)
+
+@st_fragment
+def render_district_forecasts(district_forecasts_df, state_agg_df, view_key):
+    """District forecast filters and everything they drive: charts, state aggregations and detail table"""
+    # Filters
+    col1, col2 = st.columns(2)
+
+    with col1:
+        state_filter = st.selectbox(
+            "Filter by State",
+            ['All'] + unique_values(district_forecasts_df, 'state', (view_key, 'district_forecasts'), sort=True) if 'state' in district_forecasts_df.columns else ['All'],
+            key="district_state_filter"
+        )
+
+    with col2:
+        volume_filter = st.selectbox(
+            "Filter by Volume Classification",
+            ['All', 'high_volume', 'low_volume'],
+            key="district_volume_filter"
+        )
+
+    # Apply filters
+    district_mask = equality_filter_mask(
+        district_forecasts_df, [('state', state_filter), ('volume_classification', volume_filter)]
+    )
+    filtered_district_df = district_forecasts_df if district_mask.all() else district_forecasts_df[district_mask]
+    district_key = (view_key, state_filter, volume_filter)
+
+    if len(filtered_district_df) > 0:
+        # Volume classification distribution
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("##### Forecasts by Volume Classification")
+            if 'volume_classification' in filtered_district_df.columns:
+                fig = build_volume_pie_figure(
+                    filtered_district_df, "District Forecasts by Volume Type", px.colors.qualitative.Set2, district_key
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.markdown("##### Top Districts by Forecast Mean")
+            if 'forecast_mean' in filtered_district_df.columns:
+                st.session_state.setdefault("top_districts_forecast", 15)
+                top_n_districts = st.slider("Number of Districts", 5, 30, key="top_districts_forecast")
+                fig = build_top_districts_figure(filtered_district_df, top_n_districts, district_key)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # State aggregations
+        if state_agg_df is not None:
+            st.markdown("---")
+            st.markdown("##### State-Level Aggregations (Resource Planning)")
+            fig = build_district_state_agg_figure(state_agg_df, view_key)
+            st.plotly_chart(fig, use_container_width=True)
+
+        # District forecasts table
+        with st.expander("📋 View District Forecasts Data"):
+            display_cols = ['state', 'district', 'metric', 'volume_classification', 'historical_mean', 
+                           'forecast_mean', 'forecast_trend', 'forecast_periods', 'data_points']
+            available_cols = [col for col in display_cols if col in filtered_district_df.columns]
+            display_df = filtered_district_df[available_cols].sort_values('forecast_mean', ascending=False)
+            render_limited_table(display_df, "district_forecasts.csv", "dl_district_forecasts")
+    else:
+        st.info("No district forecasts found with the selected filters.")
+
+@st_fragment
+def render_pincode_anomalies(pincode_anomalies_df, view_key):
+    """Pincode anomaly filters and everything they drive: charts, state summary and detail table"""
+    # Filters
+    col1, col2 = st.columns(2)
+
+    with col1:
+        pincode_state_filter = st.selectbox(
+            "Filter by State",
+            ['All'] + unique_values(pincode_anomalies_df, 'state', (view_key, 'pincode_anomalies'), sort=True) if 'state' in pincode_anomalies_df.columns else ['All'],
+            key="pincode_state_filter"
+        )
+
+    with col2:
+        severity_filter = st.selectbox(
+            "Filter by Severity",
+            ['All'] + list(SEVERITY_BANDS),
+            key="pincode_severity_filter"
+        )
+
+    # Apply filters
+    pincode_mask = equality_filter_mask(pincode_anomalies_df, [('state', pincode_state_filter)])
+    if severity_filter in SEVERITY_BANDS and 'severity' in pincode_anomalies_df.columns:
+        low, high = SEVERITY_BANDS[severity_filter]
+        severity = pincode_anomalies_df['severity'].to_numpy()
+        pincode_mask &= (severity >= low) & (severity < high)
+    filtered_pincode_df = pincode_anomalies_df if pincode_mask.all() else pincode_anomalies_df[pincode_mask]
+    pincode_key = (view_key, pincode_state_filter, severity_filter)
+
+    if len(filtered_pincode_df) > 0:
+        # Volume classification distribution
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("##### Anomalies by Volume Classification")
+            if 'volume_classification' in filtered_pincode_df.columns:
+                fig = build_volume_pie_figure(
+                    filtered_pincode_df, "Pincode Anomalies by Volume Type", px.colors.qualitative.Set1, pincode_key
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.markdown("##### Top Pincodes by Anomaly Severity")
+            if 'severity' in filtered_pincode_df.columns:
+                st.session_state.setdefault("top_pincodes_anomalies", 20)
+                top_n_pincodes = st.slider("Number of Pincodes", 5, 50, key="top_pincodes_anomalies")
+                fig = build_top_pincodes_figure(filtered_pincode_df, top_n_pincodes, pincode_key)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # State-level anomaly summary
+        if 'state' in filtered_pincode_df.columns:
+            st.markdown("---")
+            st.markdown("##### Anomalies by State")
+            state_anomaly_counts = compute_pincode_state_summary(filtered_pincode_df, pincode_key)
+            fig = build_pincode_state_figure(state_anomaly_counts, pincode_key)
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Pincode anomalies table
+        with st.expander("📋 View Pincode Anomalies Data"):
+            display_cols = ['pincode', 'state', 'district', 'metric', 'value', 'volume_classification',
+                           'severity', 'mad_z_score', 'is_high_anomaly']
+            available_cols = [col for col in display_cols if col in filtered_pincode_df.columns]
+            display_df = filtered_pincode_df[available_cols].sort_values('severity', ascending=False)
+            render_limited_table(display_df, "pincode_anomalies.csv", "dl_pincode_anomalies")
+    else:
+        st.info("No pincode anomalies found with the selected filters.")
+
+@st_fragment
+def render_actionable_insights(insights_df, view_key):
+    """Actionable insight filters and everything they drive: charts, action cards and detail table"""
+    # Filters
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        insight_type_filter = st.selectbox(
+            "Filter by Insight Type",
+            ['All'] + unique_values(insights_df, 'insight_type', (view_key, 'actionable_insights')) if 'insight_type' in insights_df.columns else ['All'],
+            key="actionable_insight_type_filter"
+        )
+
+    with col2:
+        priority_filter = st.selectbox(
+            "Filter by Priority",
+            ['All', 'Critical', 'High', 'Medium', 'Low'],
+            key="actionable_priority_filter"
+        )
+
+    with col3:
+        state_filter = st.selectbox(
+            "Filter by State",
+            ['All'] + unique_values(insights_df, 'state', (view_key, 'actionable_insights'), sort=True) if 'state' in insights_df.columns else ['All'],
+            key="actionable_state_filter"
+        )
+
+    # Apply filters
+    insight_mask = equality_filter_mask(
+        insights_df,
+        [('insight_type', insight_type_filter), ('priority', priority_filter), ('state', state_filter)]
+    )
+    filtered_insights = insights_df if insight_mask.all() else insights_df[insight_mask]
+
+    st.markdown(f"**Showing {len(filtered_insights)} of {len(insights_df)} insights**")
+    st.markdown("---")
+
+    # Visualizations
+    if len(filtered_insights) > 0:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("##### Insights by Type")
+            if 'insight_type' in filtered_insights.columns:
+                type_counts = count_values(
+                    filtered_insights, 'insight_type', ('Insight Type', 'Count'),
+                    (view_key, insight_type_filter, priority_filter, state_filter)
+                )
+
+                # Format insight type names
+                type_counts['Insight Type'] = type_counts['Insight Type'].str.replace('_', ' ').str.title()
+
+                fig = px.pie(
+                    type_counts,
+                    values='Count',
+                    names='Insight Type',
+                    title="Distribution by Insight Type",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.markdown("##### Insights by Priority")
+            if 'priority' in filtered_insights.columns:
+                priority_counts = count_priorities(
+                    filtered_insights,
+                    (view_key, insight_type_filter, priority_filter, state_filter),
+                    with_critical=True
+                )
+
+                color_map = {'Critical': '#8B0000', **PRIORITY_COLORS}
+
+                fig = px.bar(
+                    priority_counts,
+                    x='Priority',
+                    y='Count',
+                    title="Distribution by Priority",
+                    labels={'Count': 'Number of Insights', 'Priority': 'Priority Level'},
+                    color='Priority',
+                    color_discrete_map=color_map
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+        # State distribution if available
+        if 'state' in filtered_insights.columns and filtered_insights['state'].notna().sum() > 0:
+            st.markdown("---")
+            st.markdown("##### Insights by State")
+            state_counts = filtered_insights[filtered_insights['state'].notna()]['state'].value_counts().head(15).reset_index()
+            state_counts.columns = ['State', 'Count']
+
+            fig = px.bar(
+                state_counts,
+                x='Count',
+                y='State',
+                orientation='h',
+                title="Top 15 States by Number of Insights",
+                labels={'Count': 'Number of Insights', 'State': 'State'},
+                color='Count',
+                color_continuous_scale='Blues'
+            )
+            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+            st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("---")
+
+  #change title color in bottom tabs          
+    # Display insights
+    st.subheader("Actionable Insights & Recommendations")
+
+    if len(filtered_insights) > 0:
+        card_rows = with_default_columns(filtered_insights, {
+            'priority': 'Medium', 'insight_type': 'general', 'title': 'Insight', 'rationale': '',
+            'expected_impact': '', 'timeline': 'Not specified', 'state': 'N/A', 'district': '',
+            'action_items': ''
+        })
+        action_cards = []
+        for row in card_rows.itertuples(index=False):
+            priority = row.priority
+            insight_type = row.insight_type.replace('_', ' ').title()
+            title = row.title
+            rationale = row.rationale
+            expected_impact = row.expected_impact
+            timeline = row.timeline
+            state = row.state
+            district = row.district
+
+            # Parse action items (could be string or list)
+            action_items_str = row.action_items
+            if isinstance(action_items_str, str):
+                action_items = [item.strip() for item in action_items_str.split(';') if item.strip()]
+            else:
+                action_items = action_items_str if isinstance(action_items_str, list) else []
+
+            # Build location string
+            location = state if state != 'N/A' and pd.notna(state) else 'National'
+            if district and pd.notna(district):
+                location = f"{district}, {location}"
+
+            # Build action items HTML
+            action_items_html = ""
+            if action_items:
+                action_items_html = "<ul style='margin-top: 0.5rem; margin-bottom: 0.5rem; color: #333;'>"
+                for item in action_items[:5]:  # Limit to 5 items for display
+                    action_items_html += f"<li style='margin-bottom: 0.25rem; color: #333;'>{item}</li>"
+                if len(action_items) > 5:
+                    action_items_html += f"<li style='color: #666;'><em>... and {len(action_items) - 5} more</em></li>"
+                action_items_html += "</ul>"
+
+            action_cards.append(action_card_html(
+                priority, title, insight_type, location, timeline,
+                rationale, expected_impact, action_items_html
+            ))
+        # One markdown element for every card
+        st.markdown(''.join(action_cards), unsafe_allow_html=True)
+
+        # Insights table
+        st.markdown("---")
+        with st.expander("📋 View All Insights in Table Format"):
+            display_cols = ['insight_id', 'insight_type', 'title', 'priority', 'impact', 'state', 'district', 'timeline']
+            available_cols = [col for col in display_cols if col in filtered_insights.columns]
+            display_df = filtered_insights[available_cols].copy()
+
+            # Format display
+            if 'insight_type' in display_df.columns:
+                display_df['insight_type'] = display_df['insight_type'].str.replace('_', ' ').str.title()
+
+            st.dataframe(display_df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No insights match the selected filters.")
+
+
+def main():
+    """Main dashboard application"""
+    
+    # Tab bodies only render while open, so keep their widget values across tab switches
+    keep_widget_state()
+    
+    # Government Header with Emblem
+    try:
+        emblem_data_uri = get_emblem_data_uri()
+        if emblem_data_uri:
+            st.markdown(f"""
+            <div class="gov-header">
+                <div class="gov-header-content">
+                    <div class="emblem-container">
+                        <img src="{emblem_data_uri}" class="emblem-img" alt="State Emblem of India">
+                    </div>
+                    <div class="header-text">
+                        <p class="gov-title">भारत सरकार | Government of India</p>
+                        <h1 class="main-header">UIDAI Analytics Dashboard</h1>
+                        <p class="sub-header">AI-Driven Early Warning System for Aadhaar Update Surges and Anomalies</p>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            raise FileNotFoundError("Emblem image not found")
+            
+    except Exception as e:
+        # Fallback header if emblem image not found
+        st.markdown("""
+        <div class="gov-header">
+            <div class="gov-header-content">
+                <div class="header-text">
+                    <p class="gov-title">🇮🇳 भारत सरकार | Government of India</p>
+                    <h1 class="main-header">UIDAI Analytics Dashboard</h1>
+                    <p class="sub-header">AI-Driven Early Warning System for Aadhaar Update Surges and Anomalies</p>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Load data (shallow copy so per-rerun filters don't replace the shared frames)
+    files_signature = get_data_files_signature()
+    data = load_data(files_signature)
+    if data is None:
         return
+    data = dict(data)
     
     # Sidebar filters
     st.sidebar.header("🔍 Filters")
     
     # State filter (apply first so date range uses state-filtered data)
     if 'state' in data:
-        # Use normalized unique states from all data sources
-        unique_states = get_unique_states(data)
+        # Normalized unique states from all data sources, precomputed in load_data
+        unique_states = data['state_categories'].tolist()
         all_states = ['All'] + unique_states
+        
+        # Open on the state in ?state= so shared links skip rendering the national view first
+        if 'initial_state_index' not in st.session_state:
+            query_state = st.query_params.get('state')
+            st.session_state['initial_state_index'] = all_states.index(query_state) if query_state in all_states else 0
+        
         # selected_state = st.sidebar.selectbox("Select State", all_states)
         selected_state = st.sidebar.selectbox(
             "Select State",
             all_states,
+            index=st.session_state['initial_state_index'],
             format_func=lambda x: x.title() if x != 'All' else x
         )
+        
+        # Keep the URL in sync with the selection
+        if selected_state == 'All':
+            st.query_params.pop('state', None)
+        else:
+            st.query_params['state'] = selected_state
 
         
         # Apply state filter to all data
@@ -761,6 +2409,7 @@ def main():
         selected_state = 'All'
     
     # Date range filter (applies to all datasets with date column)
+    date_range_key = None
     if 'daily' in data and len(data['daily']) > 0:
         min_date = data['daily']['date'].min().date()
         max_date = data['daily']['date'].max().date()
@@ -776,2551 +2425,1490 @@ def main():
             # Convert to pandas Timestamp for proper comparison with datetime64
             start_ts = pd.Timestamp(start_date)
             end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)  # End of day
+            date_range_key = (start_ts, end_ts)
             
             # Apply date filter to all datasets with date column
             for key in ['daily', 'biometric', 'demographic', 'enrolment', 'anomalies', 'features_daily']:
                 if key in data and isinstance(data[key], pd.DataFrame) and 'date' in data[key].columns:
-                    data[key] = data[key][
-                        (data[key]['date'] >= start_ts) & 
-                        (data[key]['date'] <= end_ts)
-                    ]
-
-
-
-
-    # Dashboard tabs
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12 = st.tabs([
-        "📈 Overview", 
-        "📅 Temporal Analysis", 
-        "🔮 Forecasting & Predictions",
-        "🗺️ Geographic Analysis",
-        "👥 Age Group Analysis",
-        "⚠️ Coverage & Anomalies",
-        "💡 Insights & Recommendations",
-        "🚨 Surge Predictions",
-        "⚙️ Feature Engineering",
-        "🏘️ District & Pincode Models",
-        "🎯 Actionable Insights",
-        "🕵️ Forensic Signal Intelligence"
-    ])
+                    if key in DATE_SORTED_KEYS:
+                        data[key] = slice_date_range(data[key], start_ts, end_ts)
+                    else:
+                        data[key] = data[key][
+                            (data[key]['date'] >= start_ts) & 
+                            (data[key]['date'] <= end_ts)
+                        ]
+
+
+
+
+    # Identifies the filtered view for caches keyed on the current selection
+    view_key = (selected_state, date_range_key, files_signature)
+
+    # Dashboard tabs; each body only runs while its tab is open
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10, tab11, tab12 = create_tabs(TAB_LABELS)
     
     # Tab 1: Overview
     with tab1:
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+        if is_tab_open(tab1):
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        st.markdown("""
+            st.markdown("""
         <div class="tab-description">
             High-level summary of biometric and demographic updates and enrolments across India.
         </div>
         """, unsafe_allow_html=True)
-        if 'daily' in data:
-            render_export_button(data['daily'], "Overview_Data", "tab1_export")
-        st.header("Dashboard Overview")
+            if 'daily' in data:
+                render_export_button(data['daily'], "Overview_Data", "tab1_export")
+            st.header("Dashboard Overview")
         
-        # Key metrics
-        col1, col2, col3, col4 = st.columns(4)
+            # Sums, top states/districts and the recent slice, cached per filter selection
+            overview = compute_overview(data, selected_state, date_range_key, files_signature)
         
-        if 'daily' in data and len(data['daily']) > 0:
-            with col1:
-                total_bio = data['daily']['bio_total'].sum()
-                st.metric("Biometric Updates", f"{total_bio:,.0f}")
-            
-            with col2:
-                total_demo = data['daily']['demo_total'].sum()
-                st.metric("Demographic Updates", f"{total_demo:,.0f}")
-            
-            with col3:
-                total_enrol = data['daily']['enrol_total'].sum()
-                st.metric("Total Enrolments", f"{total_enrol:,.0f}")
-            
-            with col4:
-                avg_daily = data['daily']['bio_total'].mean()
-                st.metric("Avg Daily Updates", f"{avg_daily:,.0f}")
+            # Key metrics
+            if 'daily' in data and len(data['daily']) > 0:
+                render_metric_row([
+                    ("Biometric Updates", f"{overview['bio_sum']:,.0f}", {}),
+                    ("Demographic Updates", f"{overview['demo_sum']:,.0f}", {}),
+                    ("Total Enrolments", f"{overview['enrol_sum']:,.0f}", {}),
+                    ("Avg Daily Updates", f"{overview['bio_mean']:,.0f}", {}),
+                ])
         
-        st.markdown("---")
+            st.markdown("---")
 
-        # ---------------------------------------------------------
-        # NEW: Impact & Utility Section (User Request)
-        # ---------------------------------------------------------
-        with st.expander("🚀 Project Impact & Strategic Utility", expanded=True):
-            imp_col1, imp_col2 = st.columns(2)
+            # ---------------------------------------------------------
+            # NEW: Impact & Utility Section (User Request)
+            # ---------------------------------------------------------
+            with st.expander("🚀 Project Impact & Strategic Utility", expanded=True):
+                imp_col1, imp_col2 = st.columns(2)
             
-            with imp_col1:
-                st.markdown("""
+                with imp_col1:
+                    st.markdown("""
                 ### 🌟 Social & Administrative Benefit
                 *   **Targeted Service Delivery:** Identify high-demand areas for **Biometric Updates** to deploy mobile Aadhaar camps, reducing citizen wait times.
                 *   **Resource Optimization:** Use **Demographic Update** trends to allocate staff efficiently during peak operational periods.
                 *   **Policy Planning:** **Age Group Analysis** assists in linking Aadhaar with school admissions (5-17 yrs) or voter ID updates (18+ yrs).
                 """)
                 
-            with imp_col2:
-                st.markdown("""
+                with imp_col2:
+                    st.markdown("""
                 ### 🛠️ Practicality & Feasibility
                 *   **Proactive Management:** **Forecasting** modules allow administrators to prepare for demand surges 7-30 days in advance.
                 *   **Anomaly Detection:** Automatically flags irregular drops in enrolment, enabling quick technical interventions in specific districts.
                 *   **Actionable Granularity:** Drill-down capabilities from **State to District** level make insights directly usable for local administration.
                 """)
         
-        st.markdown("---")
+            st.markdown("---")
         
-        # Quick summary charts
-        col1, col2 = st.columns(2)
+            # Quick summary charts
+            col1, col2 = st.columns(2)
         
-        with col1:
-            st.subheader("Dataset Comparison")
-            if 'daily' in data:
-                comparison_data = {
-                    'Biometric': data['daily']['bio_total'].sum(),
-                    'Demographic': data['daily']['demo_total'].sum(),
-                    'Enrolment': data['daily']['enrol_total'].sum()
-                }
-                fig = px.pie(
-                    values=list(comparison_data.values()),
-                    names=list(comparison_data.keys()),
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                fig.update_layout(height=400, margin=dict(l=20, r=20, t=20, b=20))
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            if selected_state == 'All':
-                st.subheader("Top 5 States by Biometric Updates")
-                if 'state' in data:
-                    top_states = data['state'].nlargest(5, 'bio_total')[['state', 'bio_total']]
-                    fig = px.bar(
-                        top_states,
-                        x='bio_total',
-                        y='state',
-                        orientation='h',
-                        labels={'bio_total': 'Biometric Updates', 'state': 'State'},
-                        color='bio_total',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400, margin=dict(l=20, r=20, t=20, b=20))
-                    st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.subheader(f"Top Districts in {selected_state}")
-                if 'biometric' in data and len(data['biometric']) > 0:
-                    # Aggregate by district for the selected state
-                    district_data = data['biometric'].groupby('district').agg({
-                        'bio_age_5_17': 'sum',
-                        'bio_age_17_': 'sum'
-                    }).reset_index()
-                    district_data['bio_total'] = district_data['bio_age_5_17'] + district_data['bio_age_17_']
-                    top_districts = district_data.nlargest(10, 'bio_total')[['district', 'bio_total']]
-                    
-                    fig = px.bar(
-                        top_districts,
-                        x='bio_total',
-                        y='district',
-                        orientation='h',
-                        title=f"Top 10 Districts in {selected_state}",
-                        labels={'bio_total': 'Biometric Updates', 'district': 'District'},
-                        color='bio_total',
-                        color_continuous_scale='Blues'
+            with col1:
+                st.subheader("Dataset Comparison")
+                if 'daily' in data:
+                    fig = px.pie(
+                        overview['totals'],
+                        values='total',
+                        names='type',
+                        color_discrete_sequence=px.colors.qualitative.Set3
                     )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+                    fig.update_traces(textposition='inside', textinfo='percent+label')
+                    fig.update_layout(height=400, margin=dict(l=20, r=20, t=20, b=20))
                     st.plotly_chart(fig, use_container_width=True)
+        
+            with col2:
+                if selected_state == 'All':
+                    st.subheader("Top 5 States by Biometric Updates")
+                    if 'state' in data:
+                        top_states = overview['top_states']
+                        fig = px.bar(
+                            top_states,
+                            x='bio_total',
+                            y='state',
+                            orientation='h',
+                            labels={'bio_total': 'Biometric Updates', 'state': 'State'},
+                            color='bio_total',
+                            color_continuous_scale='Blues'
+                        )
+                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400, margin=dict(l=20, r=20, t=20, b=20))
+                        st.plotly_chart(fig, use_container_width=True)
                 else:
-                    st.info(f"No district data available for {selected_state}")
+                    st.subheader(f"Top Districts in {selected_state}")
+                    if 'top_districts' in overview:
+                        # Districts of the selected state, aggregated in compute_overview
+                        top_districts = overview['top_districts']
+                    
+                        fig = px.bar(
+                            top_districts,
+                            x='bio_total',
+                            y='district',
+                            orientation='h',
+                            title=f"Top 10 Districts in {selected_state}",
+                            labels={'bio_total': 'Biometric Updates', 'district': 'District'},
+                            color='bio_total',
+                            color_continuous_scale='Blues'
+                        )
+                        fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.info(f"No district data available for {selected_state}")
         
-        # Recent trends
-        st.subheader("Recent Trends (Last 30 Days)")
-        if 'daily' in data and len(data['daily']) > 0:
-            recent_data = data['daily'].tail(30).copy()
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=recent_data['date'],
-                y=recent_data['bio_total'],
-                mode='lines+markers',
-                name='Biometric',
-                line=dict(color='#1f77b4', width=2)
-            ))
-            fig.add_trace(go.Scatter(
-                x=recent_data['date'],
-                y=recent_data['demo_total'],
-                mode='lines+markers',
-                name='Demographic',
-                line=dict(color='#ff7f0e', width=2)
-            ))
-            fig.add_trace(go.Scatter(
-                x=recent_data['date'],
-                y=recent_data['enrol_total'],
-                mode='lines+markers',
-                name='Enrolment',
-                line=dict(color='#2ca02c', width=2)
-            ))
-            fig.update_layout(
-                title="Daily Updates Trend",
-                xaxis_title="Date",
-                yaxis_title="Count",
-                hovermode='x unified',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Recent trends
+            st.subheader("Recent Trends (Last 30 Days)")
+            if 'daily' in data and len(data['daily']) > 0:
+                fig = build_daily_totals_figure(
+                    overview['recent30'],
+                    'overview_recent',
+                    view_key,
+                    ('Biometric', 'Demographic', 'Enrolment'),
+                    'lines+markers',
+                    dict(
+                        title="Daily Updates Trend",
+                        xaxis_title="Date",
+                        yaxis_title="Count",
+                        hovermode='x unified',
+                        height=400
+                    )
+                )
+                st.plotly_chart(fig, use_container_width=True)
     
     # Tab 2: Temporal Analysis
     with tab2:
-        st.markdown('<div class="tab-description">Analysis of daily, weekly, and monthly trends in update volumes.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab2):
+            st.markdown('<div class="tab-description">Analysis of daily, weekly, and monthly trends in update volumes.</div>', unsafe_allow_html=True)
         
-        if 'daily' in data:
-            render_export_button(data['daily'], "Temporal_Trends", "tab2_export")
+            if 'daily' in data:
+                render_export_button(data['daily'], "Temporal_Trends", "tab2_export")
 
-        st.header("Temporal Pattern Analysis")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            st.header("Temporal Pattern Analysis")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        if 'daily' in data and len(data['daily']) > 0:
-            # Overview Section: Daily, Weekly, Monthly Averages
-            st.subheader("Volume Overview (Averages)")
-            
-            # Create a temporary dataframe with date index for resampling
-            df_temp = data['daily'].set_index('date').copy()
-            
-            # Calculate averages for each metric
-            metrics = {
-                'Biometric': 'bio_total',
-                'Demographic': 'demo_total',
-                'Enrolment': 'enrol_total'
-            }
+            if 'daily' in data and len(data['daily']) > 0:
+                # Overview Section: Daily, Weekly, Monthly Averages
+                st.subheader("Volume Overview (Averages)")
+            
+                # Date-indexed view for resampling (set_index already returns a new frame)
+                df_temp = data['daily'].set_index('date')
+            
+                # Calculate averages for each metric
+                metrics = {
+                    'Biometric': 'bio_total',
+                    'Demographic': 'demo_total',
+                    'Enrolment': 'enrol_total'
+                }
             
-            # Display in columns by Timeframe
-            col_d, col_w, col_m = st.columns(3)
+                # Display in columns by Timeframe
+                col_d, col_w, col_m = st.columns(3)
             
-            with col_d:
-                st.markdown("#### 📅 Daily Average")
-                for label, col in metrics.items():
-                    val = df_temp[col].mean()
-                    st.metric(f"{label}", f"{val:,.0f}")
+                with col_d:
+                    st.markdown("#### 📅 Daily Average")
+                    for label, col in metrics.items():
+                        val = df_temp[col].mean()
+                        st.metric(f"{label}", f"{val:,.0f}")
             
-            with col_w:
-                st.markdown("#### 🗓️ Weekly Average")
-                for label, col in metrics.items():
-                    val = df_temp[col].resample('W').sum().mean()
-                    st.metric(f"{label}", f"{val:,.0f}")
+                with col_w:
+                    st.markdown("#### 🗓️ Weekly Average")
+                    for label, col in metrics.items():
+                        val = df_temp[col].resample('W').sum().mean()
+                        st.metric(f"{label}", f"{val:,.0f}")
                     
-            with col_m:
-                st.markdown("#### 📆 Monthly Average")
-                for label, col in metrics.items():
-                    val = df_temp[col].resample('ME').sum().mean()
-                    st.metric(f"{label}", f"{val:,.0f}")
+                with col_m:
+                    st.markdown("#### 📆 Monthly Average")
+                    for label, col in metrics.items():
+                        val = df_temp[col].resample('ME').sum().mean()
+                        st.metric(f"{label}", f"{val:,.0f}")
             
-            st.markdown("---")
+                st.markdown("---")
 
-            # Time series chart
-            st.subheader("Time Series Trends")
-            
-            chart_type = st.radio("Select Chart Type", ["Line Chart", "Pattern Heatmap"], horizontal=True)
-            
-            if chart_type == "Line Chart":
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['bio_total'],
-                    mode='lines',
-                    name='Biometric Updates',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['demo_total'],
-                    mode='lines',
-                    name='Demographic Updates',
-                    line=dict(color='#ff7f0e', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['enrol_total'],
-                    mode='lines',
-                    name='Enrolments',
-                    line=dict(color='#2ca02c', width=2)
-                ))
-                
-                fig.update_layout(
-                    xaxis_title="Date",
-                    yaxis_title="Count",
-                    hovermode='x unified',
-                    height=500,
-                    margin=dict(l=20, r=20, t=20, b=20)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                # Heatmap Pattern: Month vs Day of Month (Calendar View)
-                heatmap_metric = st.selectbox(
-                    "Select Metric for Heatmap",
-                    ["Biometric Updates", "Demographic Updates", "Enrolments"],
-                    key="temp_heatmap_metric"
-                )
+                # Time series chart
+                st.subheader("Time Series Trends")
+            
+                chart_type = st.radio("Select Chart Type", ["Line Chart", "Pattern Heatmap"], horizontal=True, key="temp_chart_type")
+            
+                if chart_type == "Line Chart":
+                    fig = build_daily_totals_figure(
+                        data['daily'],
+                        'temporal_line',
+                        view_key,
+                        ('Biometric Updates', 'Demographic Updates', 'Enrolments'),
+                        'lines',
+                        dict(
+                            xaxis_title="Date",
+                            yaxis_title="Count",
+                            hovermode='x unified',
+                            height=500,
+                            margin=dict(l=20, r=20, t=20, b=20)
+                        )
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    # Heatmap Pattern: Month vs Day of Month (Calendar View)
+                    heatmap_metric = st.selectbox(
+                        "Select Metric for Heatmap",
+                        ["Biometric Updates", "Demographic Updates", "Enrolments"],
+                        key="temp_heatmap_metric"
+                    )
                 
-                metric_map = {
-                    "Biometric Updates": "bio_total",
-                    "Demographic Updates": "demo_total",
-                    "Enrolments": "enrol_total"
-                }
+                    metric_map = {
+                        "Biometric Updates": "bio_total",
+                        "Demographic Updates": "demo_total",
+                        "Enrolments": "enrol_total"
+                    }
                 
-                target_col = metric_map[heatmap_metric]
+                    target_col = metric_map[heatmap_metric]
                 
-                # Pivot data for heatmap: Month vs Day of Month
-                df_heatmap = data['daily'].copy()
-                df_heatmap['month'] = df_heatmap['date'].dt.month
-                df_heatmap['day_of_month'] = df_heatmap['date'].dt.day
+                    # Pivot data for heatmap: Month vs Day of Month
+                    # Group the target column by date parts directly instead of copying the frame
+                    heatmap_dates = data['daily']['date'].dt
                 
-                # Aggregate to handle multiple years if present (taking average)
-                pivot_df = df_heatmap.groupby(['month', 'day_of_month'])[target_col].mean().unstack()
+                    # Aggregate to handle multiple years if present (taking average)
+                    pivot_df = data['daily'][target_col].groupby(
+                        [heatmap_dates.month.rename('month'), heatmap_dates.day.rename('day_of_month')]
+                    ).mean().unstack()
                 
-                # Ensure all 12 months and 31 days exist
-                pivot_df = pivot_df.reindex(index=range(1, 13), columns=range(1, 32))
+                    # Ensure all 12 months and 31 days exist
+                    pivot_df = pivot_df.reindex(index=range(1, 13), columns=range(1, 32))
                 
-                # Map Month Numbers to Names for Y-axis
-                month_names = {
-                    1: 'January', 2: 'February', 3: 'March', 4: 'April', 5: 'May', 6: 'June',
-                    7: 'July', 8: 'August', 9: 'September', 10: 'October', 11: 'November', 12: 'December'
-                }
-                pivot_df.index = pivot_df.index.map(month_names)
+                    # Map Month Numbers to Names for Y-axis
+                    pivot_df.index = pd.Index(MONTH_NAMES[pivot_df.index.to_numpy()], name=pivot_df.index.name)
                 
-                fig = px.imshow(
-                    pivot_df,
-                    labels=dict(x="Day of Month", y="Month", color="Avg Volume"),
-                    x=pivot_df.columns,
-                    y=pivot_df.index,
-                    color_continuous_scale='Viridis', # High volume = Lighter/Brighter
-                    aspect="auto"
-                )
+                    fig = px.imshow(
+                        pivot_df,
+                        labels=dict(x="Day of Month", y="Month", color="Avg Volume"),
+                        x=pivot_df.columns,
+                        y=pivot_df.index,
+                        color_continuous_scale='Viridis', # High volume = Lighter/Brighter
+                        aspect="auto"
+                    )
                 
-                fig.update_layout(
-                    title=f"Calendar Seasonality: {heatmap_metric}",
-                    height=600,
-                    margin=dict(l=20, r=20, t=50, b=20),
-                    xaxis_title="Day of Month (1-31)",
-                    yaxis_title="Month",
-                    coloraxis_colorbar=dict(title="Avg Volume")
-                )
+                    fig.update_layout(
+                        title=f"Calendar Seasonality: {heatmap_metric}",
+                        height=600,
+                        margin=dict(l=20, r=20, t=50, b=20),
+                        xaxis_title="Day of Month (1-31)",
+                        yaxis_title="Month",
+                        coloraxis_colorbar=dict(title="Avg Volume")
+                    )
                 
-                # Show every day on X axis
-                fig.update_xaxes(tickmode='linear', tick0=1, dtick=1)
+                    # Show every day on X axis
+                    fig.update_xaxes(tickmode='linear', tick0=1, dtick=1)
                 
-                st.plotly_chart(fig, use_container_width=True)
-                st.caption(f"ℹ️ **How to read:** This 'Calendar Heatmap' shows the average daily volume for each day of every month. Darker colors indicate lower activity, while brighter/yellow colors indicate high activity. Look for horizontal bands (busy months) or vertical stripes (busy days, e.g., end-of-month surges).")
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(f"ℹ️ **How to read:** This 'Calendar Heatmap' shows the average daily volume for each day of every month. Darker colors indicate lower activity, while brighter/yellow colors indicate high activity. Look for horizontal bands (busy months) or vertical stripes (busy days, e.g., end-of-month surges).")
             
-            # Weekly patterns
-            col1, col2 = st.columns(2)
+                # Weekly patterns
+                col1, col2 = st.columns(2)
             
-            with col1:
-                st.subheader("Weekly Pattern (Day of Week)")
-                if 'weekday' in data['daily'].columns:
-                    weekday_avg = data['daily'].groupby('weekday')[
-                        ['bio_total', 'demo_total', 'enrol_total']
-                    ].mean().reset_index()
-                    weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                    weekday_avg['weekday'] = pd.Categorical(weekday_avg['weekday'], categories=weekday_order, ordered=True)
-                    weekday_avg = weekday_avg.sort_values('weekday')
+                with col1:
+                    st.subheader("Weekly Pattern (Day of Week)")
+                    if 'weekday' in data['daily'].columns:
+                        # Weekday codes in calendar order, so the means come out Monday..Sunday
+                        weekday_codes = pd.Index(WEEKDAY_NAMES).get_indexer(data['daily']['weekday'])
+                        weekdays, weekday_means = group_means(
+                            weekday_codes, data['daily'][DAILY_TOTAL_COLUMNS].to_numpy(dtype=np.float64), len(WEEKDAY_NAMES)
+                        )
+                        weekday_avg = pd.DataFrame(weekday_means, columns=DAILY_TOTAL_COLUMNS)
+                        weekday_avg.insert(0, 'weekday', WEEKDAY_NAMES[weekdays])
                     
-                    fig = go.Figure()
-                    fig.add_trace(go.Bar(
-                        x=weekday_avg['weekday'],
-                        y=weekday_avg['bio_total'],
-                        name='Biometric',
-                        marker_color='#1f77b4'
-                    ))
-                    fig.add_trace(go.Bar(
-                        x=weekday_avg['weekday'],
-                        y=weekday_avg['demo_total'],
-                        name='Demographic',
-                        marker_color='#ff7f0e'
-                    ))
-                    fig.add_trace(go.Bar(
-                        x=weekday_avg['weekday'],
-                        y=weekday_avg['enrol_total'],
-                        name='Enrolment',
-                        marker_color='#2ca02c'
-                    ))
-                    fig.update_layout(
-                        title="Average by Day of Week",
-                        xaxis_title="Day",
-                        yaxis_title="Average Count",
-                        barmode='group',
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                        fig = go.Figure()
+                        fig.add_trace(go.Bar(
+                            x=weekday_avg['weekday'],
+                            y=weekday_avg['bio_total'],
+                            name='Biometric',
+                            marker_color='#1f77b4'
+                        ))
+                        fig.add_trace(go.Bar(
+                            x=weekday_avg['weekday'],
+                            y=weekday_avg['demo_total'],
+                            name='Demographic',
+                            marker_color='#ff7f0e'
+                        ))
+                        fig.add_trace(go.Bar(
+                            x=weekday_avg['weekday'],
+                            y=weekday_avg['enrol_total'],
+                            name='Enrolment',
+                            marker_color='#2ca02c'
+                        ))
+                        fig.update_layout(
+                            title="Average by Day of Week",
+                            xaxis_title="Day",
+                            yaxis_title="Average Count",
+                            barmode='group',
+                            height=400
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
             
-            with col2:
-                st.subheader("Monthly Trend")
-                if 'month' in data['daily'].columns:
-                    monthly_avg = data['daily'].groupby('month')[
-                        ['bio_total', 'demo_total', 'enrol_total']
-                    ].mean().reset_index()
-                    month_names = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
-                                  7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
-                    monthly_avg['month_name'] = monthly_avg['month'].map(month_names)
+                with col2:
+                    st.subheader("Monthly Trend")
+                    if 'month' in data['daily'].columns:
+                        months, monthly_means = group_means(
+                            data['daily']['month'].to_numpy(), data['daily'][DAILY_TOTAL_COLUMNS].to_numpy(dtype=np.float64), 13
+                        )
+                        monthly_avg = pd.DataFrame(monthly_means, columns=DAILY_TOTAL_COLUMNS)
+                        monthly_avg.insert(0, 'month', months)
+                        monthly_avg['month_name'] = MONTH_ABBRS[monthly_avg['month'].to_numpy()]
                     
-                    fig = px.line(
-                        monthly_avg,
-                        x='month_name',
-                        y=['bio_total', 'demo_total', 'enrol_total'],
-                        title="Average by Month",
-                        labels={'value': 'Average Count', 'month_name': 'Month', 'variable': 'Type'},
-                        markers=True
-                    )
-                    fig.update_layout(height=400)
-                    st.plotly_chart(fig, use_container_width=True)
+                        fig = px.line(
+                            monthly_avg,
+                            x='month_name',
+                            y=['bio_total', 'demo_total', 'enrol_total'],
+                            title="Average by Month",
+                            labels={'value': 'Average Count', 'month_name': 'Month', 'variable': 'Type'},
+                            markers=True
+                        )
+                        fig.update_layout(height=400)
+                        st.plotly_chart(fig, use_container_width=True)
             
-            # Pattern Learning Visualizations (Feature 1)
-            if 'daily_patterns' in data or 'state_patterns' in data:
-                st.markdown("---")
-                st.subheader("📊 Pattern Insights")
+                # Pattern Learning Visualizations (Feature 1)
+                if 'daily_patterns' in data or 'state_patterns' in data:
+                    st.markdown("---")
+                    st.subheader("📊 Pattern Insights")
                 
-                with st.expander("ℹ️ About Pattern Learning"):
-                    st.markdown("""
+                    with st.expander("ℹ️ About Pattern Learning"):
+                        st.markdown("""
                     This system uses automated decomposition to separate regular trends from seasonal cycles. 
                     It helps identify whether a particular metric is consistently increasing or just showing normal periodic fluctuation.
                     """)
                 
-                # Daily Patterns Section
-                if 'daily_patterns' in data:
-                    st.markdown("#### Daily Aggregated Patterns")
+                    # Daily Patterns Section
+                    if 'daily_patterns' in data:
+                        st.markdown("#### Daily Aggregated Patterns")
                     
-                    daily_patterns_df = data['daily_patterns']
+                        daily_patterns_df = data['daily_patterns']
                     
-                    col1, col2, col3 = st.columns(3)
+                        col1, col2, col3 = st.columns(3)
                     
-                    with col1:
-                        st.markdown("##### Trend Directions")
-                        # Create trend direction chart
-                        trend_counts = daily_patterns_df['trend_direction'].value_counts().reset_index()
-                        trend_counts.columns = ['Direction', 'Count']
+                        with col1:
+                            st.markdown("##### Trend Directions")
+                            # Create trend direction chart
+                            trend_counts = daily_patterns_df['trend_direction'].value_counts().reset_index()
+                            trend_counts.columns = ['Direction', 'Count']
                         
-                        # Color mapping
-                        color_map = {
-                            'increasing': '#2ca02c',
-                            'decreasing': '#d62728',
-                            'stable': '#ff7f0e',
-                            'insufficient_data': '#7f7f7f'
-                        }
-                        trend_counts['color'] = trend_counts['Direction'].map(color_map)
+                            # Color mapping
+                            color_map = {
+                                'increasing': '#2ca02c',
+                                'decreasing': '#d62728',
+                                'stable': '#ff7f0e',
+                                'insufficient_data': '#7f7f7f'
+                            }
+                            trend_counts['color'] = trend_counts['Direction'].map(color_map)
                         
-                        fig = px.bar(
-                            trend_counts,
-                            x='Direction',
-                            y='Count',
-                            title="Trend Direction Distribution",
-                            color='Direction',
-                            color_discrete_map=color_map,
-                            labels={'Count': 'Number of Metrics'}
-                        )
-                        fig.update_layout(showlegend=False, height=300)
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    with col2:
-                        st.markdown("##### Trend Slopes")
-                        fig = px.bar(
-                            daily_patterns_df,
-                            x='metric',
-                            y='trend_slope',
-                            title="Trend Slopes by Metric",
-                            labels={'metric': 'Metric', 'trend_slope': 'Trend Slope'},
-                            color='trend_slope',
-                            color_continuous_scale='RdYlGn'
-                        )
-                        fig.update_layout(height=300, xaxis_tickangle=-45)
-                        st.plotly_chart(fig, use_container_width=True)
+                            fig = px.bar(
+                                trend_counts,
+                                x='Direction',
+                                y='Count',
+                                title="Trend Direction Distribution",
+                                color='Direction',
+                                color_discrete_map=color_map,
+                                labels={'Count': 'Number of Metrics'}
+                            )
+                            fig.update_layout(showlegend=False, height=300)
+                            st.plotly_chart(fig, use_container_width=True)
                     
-                    with col3:
-                        st.markdown("##### Pattern Statistics")
-                        # Display key statistics
-                        for idx, row in daily_patterns_df.iterrows():
-                            metric_name = row['metric'].replace('_', ' ').title()
-                            st.metric(
-                                label=f"{metric_name}",
-                                value=row['trend_direction'].title(),
-                                delta=f"Slope: {row['trend_slope']:.2f}"
+                        with col2:
+                            st.markdown("##### Trend Slopes")
+                            fig = px.bar(
+                                daily_patterns_df,
+                                x='metric',
+                                y='trend_slope',
+                                title="Trend Slopes by Metric",
+                                labels={'metric': 'Metric', 'trend_slope': 'Trend Slope'},
+                                color='trend_slope',
+                                color_continuous_scale='RdYlGn'
                             )
+                            fig.update_layout(height=300, xaxis_tickangle=-45)
+                            st.plotly_chart(fig, use_container_width=True)
+                    
+                        with col3:
+                            st.markdown("##### Pattern Statistics")
+                            # Display key statistics
+                            for row in daily_patterns_df.itertuples(index=False):
+                                metric_name = row.metric.replace('_', ' ').title()
+                                st.metric(
+                                    label=f"{metric_name}",
+                                    value=row.trend_direction.title(),
+                                    delta=f"Slope: {row.trend_slope:.2f}"
+                                )
                     
-                    # Detailed pattern table
-                    with st.expander("📋 View Detailed Pattern Data"):
-                        display_cols = ['metric', 'trend_direction', 'trend_slope', 'trend_mean', 'seasonal_amplitude', 'resid_std']
-                        display_df = daily_patterns_df[display_cols].copy()
-                        display_df.columns = ['Metric', 'Trend Direction', 'Trend Slope', 'Trend Mean', 'Seasonal Amplitude', 'Residual Std']
-                        display_df['Trend Slope'] = display_df['Trend Slope'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Trend Mean'] = display_df['Trend Mean'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Seasonal Amplitude'] = display_df['Seasonal Amplitude'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Residual Std'] = display_df['Residual Std'].apply(lambda x: f"{x:,.2f}")
-                        st.dataframe(display_df, use_container_width=True, hide_index=True)
+                        # Detailed pattern table
+                        with st.expander("📋 View Detailed Pattern Data"):
+                            display_cols = ['metric', 'trend_direction', 'trend_slope', 'trend_mean', 'seasonal_amplitude', 'resid_std']
+                            display_df = daily_patterns_df[display_cols]
+                            display_df.columns = ['Metric', 'Trend Direction', 'Trend Slope', 'Trend Mean', 'Seasonal Amplitude', 'Residual Std']
+                            # Format at display time so the columns stay numeric (and sort numerically)
+                            st.dataframe(
+                                display_df.style.format('{:,.2f}', subset=PATTERN_NUMBER_COLUMNS),
+                                use_container_width=True,
+                                hide_index=True
+                            )
                 
-                # State-Level Patterns Section
-                if 'state_patterns' in data:
-                    st.markdown("#### State-Level Patterns")
+                    # State-Level Patterns Section
+                    if 'state_patterns' in data:
+                        st.markdown("#### State-Level Patterns")
                     
-                    state_patterns_df = data['state_patterns']
+                        state_patterns_df = data['state_patterns']
                     
-                    col1, col2 = st.columns(2)
+                        col1, col2 = st.columns(2)
                     
-                    with col1:
-                        st.markdown("##### Top States by Trend Slope")
-                        top_n_states = st.slider("Number of States", 5, 30, 15, key="top_pattern_states")
-                        top_states = state_patterns_df.nlargest(top_n_states, 'trend_slope')
+                        with col1:
+                            st.markdown("##### Top States by Trend Slope")
+                            st.session_state.setdefault("top_pattern_states", 15)
+                            top_n_states = st.slider("Number of States", 5, 30, key="top_pattern_states")
+                            top_states = top_n_rows(state_patterns_df, 'trend_slope', top_n_states)
                         
-                        fig = px.bar(
-                            top_states,
-                            x='trend_slope',
-                            y='state',
-                            orientation='h',
-                            title=f"Top {top_n_states} States by Trend Slope",
-                            labels={'trend_slope': 'Trend Slope', 'state': 'State'},
-                            color='trend_slope',
-                            color_continuous_scale='Greens'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                        st.plotly_chart(fig, use_container_width=True)
+                            fig = px.bar(
+                                top_states,
+                                x='trend_slope',
+                                y='state',
+                                orientation='h',
+                                title=f"Top {top_n_states} States by Trend Slope",
+                                labels={'trend_slope': 'Trend Slope', 'state': 'State'},
+                                color='trend_slope',
+                                color_continuous_scale='Greens'
+                            )
+                            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+                            st.plotly_chart(fig, use_container_width=True)
                     
-                    with col2:
-                        st.markdown("##### Trend Direction Distribution (States)")
-                        state_trend_counts = state_patterns_df['trend_direction'].value_counts().reset_index()
-                        state_trend_counts.columns = ['Direction', 'Count']
+                        with col2:
+                            st.markdown("##### Trend Direction Distribution (States)")
+                            state_trend_counts = state_patterns_df['trend_direction'].value_counts().reset_index()
+                            state_trend_counts.columns = ['Direction', 'Count']
                         
-                        color_map = {
-                            'increasing': '#2ca02c',
-                            'decreasing': '#d62728',
-                            'stable': '#ff7f0e',
-                            'insufficient_data': '#7f7f7f'
-                        }
-                        state_trend_counts['color'] = state_trend_counts['Direction'].map(color_map)
+                            color_map = {
+                                'increasing': '#2ca02c',
+                                'decreasing': '#d62728',
+                                'stable': '#ff7f0e',
+                                'insufficient_data': '#7f7f7f'
+                            }
+                            state_trend_counts['color'] = state_trend_counts['Direction'].map(color_map)
                         
-                        fig = px.pie(
-                            state_trend_counts,
-                            values='Count',
-                            names='Direction',
-                            title="State Trend Directions",
-                            color='Direction',
-                            color_discrete_map=color_map
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        fig.update_layout(height=400)
-                        st.plotly_chart(fig, use_container_width=True)
+                            fig = px.pie(
+                                state_trend_counts,
+                                values='Count',
+                                names='Direction',
+                                title="State Trend Directions",
+                                color='Direction',
+                                color_discrete_map=color_map
+                            )
+                            fig.update_traces(textposition='inside', textinfo='percent+label')
+                            fig.update_layout(height=400)
+                            st.plotly_chart(fig, use_container_width=True)
                         
-                        # State pattern statistics
-                        st.markdown("##### State Pattern Statistics")
-                        col_stat1, col_stat2 = st.columns(2)
-                        with col_stat1:
-                            avg_slope = state_patterns_df['trend_slope'].mean()
-                            st.metric("Avg Trend Slope", f"{avg_slope:.2f}")
-                        with col_stat2:
-                            increasing_count = (state_patterns_df['trend_direction'] == 'increasing').sum()
-                            st.metric("Increasing Trends", f"{increasing_count}/{len(state_patterns_df)}")
+                            # State pattern statistics
+                            st.markdown("##### State Pattern Statistics")
+                            col_stat1, col_stat2 = st.columns(2)
+                            with col_stat1:
+                                avg_slope = state_patterns_df['trend_slope'].mean()
+                                st.metric("Avg Trend Slope", f"{avg_slope:.2f}")
+                            with col_stat2:
+                                increasing_count = (state_patterns_df['trend_direction'] == 'increasing').sum()
+                                st.metric("Increasing Trends", f"{increasing_count}/{len(state_patterns_df)}")
                     
-                    # State patterns table
-                    with st.expander("📋 View All State Patterns"):
-                        display_cols = ['state', 'trend_direction', 'trend_slope', 'trend_mean', 'seasonal_amplitude', 'resid_std']
-                        display_df = state_patterns_df[display_cols].copy().sort_values('trend_slope', ascending=False)
-                        display_df.columns = ['State', 'Trend Direction', 'Trend Slope', 'Trend Mean', 'Seasonal Amplitude', 'Residual Std']
-                        display_df['Trend Slope'] = display_df['Trend Slope'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Trend Mean'] = display_df['Trend Mean'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Seasonal Amplitude'] = display_df['Seasonal Amplitude'].apply(lambda x: f"{x:,.2f}")
-                        display_df['Residual Std'] = display_df['Residual Std'].apply(lambda x: f"{x:,.2f}")
-                        st.dataframe(display_df, use_container_width=True, hide_index=True)
+                        # State patterns table
+                        with st.expander("📋 View All State Patterns"):
+                            display_cols = ['state', 'trend_direction', 'trend_slope', 'trend_mean', 'seasonal_amplitude', 'resid_std']
+                            display_df = state_patterns_df[display_cols].sort_values('trend_slope', ascending=False)
+                            display_df.columns = ['State', 'Trend Direction', 'Trend Slope', 'Trend Mean', 'Seasonal Amplitude', 'Residual Std']
+                            # Format at display time so the columns stay numeric (and sort numerically)
+                            st.dataframe(
+                                display_df.style.format('{:,.2f}', subset=PATTERN_NUMBER_COLUMNS),
+                                use_container_width=True,
+                                hide_index=True
+                            )
     
     
     # Tab 3: Forecasting & Predictions
     with tab3:
-        st.markdown('<div class="tab-description">30 to 90-day projections for Aadhaar update workloads.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab3):
+            st.markdown('<div class="tab-description">30 to 90-day projections for Aadhaar update workloads.</div>', unsafe_allow_html=True)
         
-        # Export forecast data if available, otherwise daily data
-        if 'daily_forecasts' in data:
-            render_export_button(data['daily_forecasts'], "Forecasts", "tab3_export")
-        elif 'daily' in data:
-            render_export_button(data['daily'], "Forecast_Input_Data", "tab3_export")
+            # Export forecast data if available, otherwise daily data
+            if 'daily_forecasts' in data:
+                render_export_button(data['daily_forecasts'], "Forecasts", "tab3_export")
+            elif 'daily' in data:
+                render_export_button(data['daily'], "Forecast_Input_Data", "tab3_export")
 
-        st.header("Forecasting & Predictions")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            st.header("Forecasting & Predictions")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        # Forecasting Visualizations (Feature 2)
-        if 'daily_forecasts' in data or 'state_forecasts' in data:
-            # Daily Forecasts Section
-            if 'daily_forecasts' in data and 'daily_forecasts_summary' in data:
-                st.markdown("#### Daily Aggregated Forecasts")
+            # Forecasting Visualizations (Feature 2)
+            if 'daily_forecasts' in data or 'state_forecasts' in data:
+                # Daily Forecasts Section
+                if 'daily_forecasts' in data and 'daily_forecasts_summary' in data:
+                    st.markdown("#### Daily Aggregated Forecasts")
                 
-                daily_forecasts_df = data['daily_forecasts']
-                daily_summary_df = data['daily_forecasts_summary']
+                    daily_forecasts_df = data['daily_forecasts']
+                    daily_summary_df = data['daily_forecasts_summary']
                 
-                # Forecast type selector
-                forecast_type = st.radio(
-                    "Select Forecast Type",
-                    ["short_term", "medium_term"],
-                    format_func=lambda x: "Short-term (1-3 months)" if x == "short_term" else "Medium-term (3-6 months)",
-                    horizontal=True,
-                    key="daily_forecast_type"
-                )
-                    
-                filtered_forecasts = daily_forecasts_df[daily_forecasts_df['forecast_type'] == forecast_type]
+                    # Forecast type selector
+                    forecast_type = st.radio(
+                        "Select Forecast Type",
+                        ["short_term", "medium_term"],
+                        format_func=lambda x: "Short-term (1-3 months)" if x == "short_term" else "Medium-term (3-6 months)",
+                        horizontal=True,
+                        key="daily_forecast_type"
+                    )
                     
-                # Metric selector
-                metrics = filtered_forecasts['metric'].unique()
-                selected_metric = st.selectbox("Select Metric", metrics, key="daily_forecast_metric")
+                    # Metric selector
+                    type_mask = daily_forecasts_df['forecast_type'].to_numpy() == forecast_type
+                    metrics = pd.unique(daily_forecasts_df['metric'].to_numpy()[type_mask])
+                    selected_metric = st.selectbox("Select Metric", metrics, key="daily_forecast_metric")
                     
-                metric_forecasts = filtered_forecasts[filtered_forecasts['metric'] == selected_metric]
-                metric_summary = daily_summary_df[
-                    (daily_summary_df['metric'] == selected_metric) & 
-                    (daily_summary_df['forecast_type'] == forecast_type)
-                ].iloc[0] if len(daily_summary_df[
-                    (daily_summary_df['metric'] == selected_metric) & 
-                    (daily_summary_df['forecast_type'] == forecast_type)
-                ]) > 0 else None
+                    metric_forecasts, metric_summary = get_forecast_metric_view(
+                        daily_forecasts_df, daily_summary_df, forecast_type, selected_metric, view_key
+                    )
                     
-                col1, col2 = st.columns(2)
+                    col1, col2 = st.columns(2)
                     
-                with col1:
-                    # Forecast chart with confidence intervals
-                    st.markdown("##### Forecast with Confidence Intervals")
-                    fig = go.Figure()
-                        
-                    # Forecast line
-                    fig.add_trace(go.Scatter(
-                        x=metric_forecasts['period'],
-                        y=metric_forecasts['forecast_value'],
-                        mode='lines+markers',
-                        name='Forecast',
-                        line=dict(color='#1f77b4', width=2),
-                        marker=dict(size=4)
-                    ))
-                        
-                    # Confidence intervals
-                    fig.add_trace(go.Scatter(
-                        x=metric_forecasts['period'],
-                        y=metric_forecasts['conf_upper'],
-                        mode='lines',
-                        name='Upper Bound (95%)',
-                        line=dict(width=0),
-                        showlegend=False
-                    ))
-                    fig.add_trace(go.Scatter(
-                        x=metric_forecasts['period'],
-                        y=metric_forecasts['conf_lower'],
-                        mode='lines',
-                        name='Lower Bound (95%)',
-                        line=dict(width=0),
-                        fillcolor='rgba(31, 119, 180, 0.2)',
-                        fill='tonexty',
-                        showlegend=True
-                    ))
-                        
-                    fig.update_layout(
-                        title=f"{selected_metric.replace('_', ' ').title()} Forecast ({forecast_type.replace('_', ' ').title()})",
-                        xaxis_title="Period (Days Ahead)",
-                        yaxis_title="Forecasted Value",
-                        hovermode='x unified',
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    with col1:
+                        # Forecast chart with confidence intervals
+                        st.markdown("##### Forecast with Confidence Intervals")
+                        fig = build_forecast_figure(
+                            metric_forecasts,
+                            ('daily_forecast', forecast_type, selected_metric),
+                            view_key,
+                            dict(name='Forecast', line=dict(color='#1f77b4', width=2), marker=dict(size=4)),
+                            dict(name='Upper Bound (95%)'),
+                            dict(name='Lower Bound (95%)', fillcolor='rgba(31, 119, 180, 0.2)', showlegend=True),
+                            dict(
+                                title=f"{selected_metric.replace('_', ' ').title()} Forecast ({forecast_type.replace('_', ' ').title()})",
+                                xaxis_title="Period (Days Ahead)",
+                                yaxis_title="Forecasted Value",
+                                hovermode='x unified',
+                                height=400
+                            )
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
                     
-                with col2:
-                    st.markdown("##### Forecast Insights")
-                    if metric_summary is not None:
-                        # User-friendly metrics
-                        mape = metric_summary['mape']
-                        if mape < 5:
-                            reliability = "High"
-                            reliability_color = "#48BB78" # Green
-                            reliability_msg = "Excellent forecast accuracy."
-                        elif mape < 15:
-                            reliability = "Medium"
-                            reliability_color = "#FF9933" # Orange
-                            reliability_msg = "Moderate forecast accuracy."
-                        else:
-                            reliability = "Low"
-                            reliability_color = "#F56565" # Red
-                            reliability_msg = "Low forecast accuracy; use with caution."
+                    with col2:
+                        st.markdown("##### Forecast Insights")
+                        if metric_summary is not None:
+                            # User-friendly metrics
+                            mape = metric_summary['mape']
+                            if mape < 5:
+                                reliability = "High"
+                                reliability_color = "#48BB78" # Green
+                                reliability_msg = "Excellent forecast accuracy."
+                            elif mape < 15:
+                                reliability = "Medium"
+                                reliability_color = "#FF9933" # Orange
+                                reliability_msg = "Moderate forecast accuracy."
+                            else:
+                                reliability = "Low"
+                                reliability_color = "#F56565" # Red
+                                reliability_msg = "Low forecast accuracy; use with caution."
                         
-                        # Determine trend
-                        try:
-                            start_val = metric_forecasts['forecast_value'].iloc[0]
-                            end_val = metric_forecasts['forecast_value'].iloc[-1]
-                            pct_change = ((end_val - start_val) / start_val) * 100
+                            # Determine trend
+                            try:
+                                start_val = metric_forecasts['forecast_value'].iloc[0]
+                                end_val = metric_forecasts['forecast_value'].iloc[-1]
+                                pct_change = ((end_val - start_val) / start_val) * 100
                             
-                            if pct_change > 2:
-                                trend = "Increasing 📈"
-                            elif pct_change < -2:
-                                trend = "Decreasing 📉"
-                            else:
+                                if pct_change > 2:
+                                    trend = "Increasing 📈"
+                                elif pct_change < -2:
+                                    trend = "Decreasing 📉"
+                                else:
+                                    trend = "Stable ➡️"
+                            except:
                                 trend = "Stable ➡️"
-                        except:
-                            trend = "Stable ➡️"
 
-                        st.markdown(f"""
+                            st.markdown(f"""
                         <div style="background-color: rgba(255,255,255,0.05); padding: 15px; border-radius: 5px; border-left: 5px solid {reliability_color}; margin-bottom: 15px;">
                             <h3 style="margin:0; font-size: 1.1rem; color: #FAFAFA;">Forecast Reliability: <span style="color:{reliability_color}">{reliability}</span></h3>
                             <p style="margin:5px 0 0 0; color: #A0AEC0; font-size: 0.9rem;">{reliability_msg}</p>
                         </div>
                         """, unsafe_allow_html=True)
                         
-                        # Total Projected Volume
-                        total_projected = metric_forecasts['forecast_value'].sum()
-                        st.metric("Total Projected Volume", f"{total_projected:,.0f}", help=f"Total projected {selected_metric.replace('_', ' ')} for the next {int(metric_summary['forecast_periods'])} days")
+                            # Total Projected Volume
+                            total_projected = metric_forecasts['forecast_value'].sum()
+                            st.metric("Total Projected Volume", f"{total_projected:,.0f}", help=f"Total projected {selected_metric.replace('_', ' ')} for the next {int(metric_summary['forecast_periods'])} days")
                         
-                        col_trend1, col_trend2 = st.columns(2)
-                        with col_trend1:
-                            st.metric("Expected Trend", trend)
-                        with col_trend2:
-                            st.metric("Forecast Horizon", f"{int(metric_summary['forecast_periods'])} days")
+                            col_trend1, col_trend2 = st.columns(2)
+                            with col_trend1:
+                                st.metric("Expected Trend", trend)
+                            with col_trend2:
+                                st.metric("Forecast Horizon", f"{int(metric_summary['forecast_periods'])} days")
                         
-                    st.markdown("##### Model Information")
-                    if metric_summary is not None:
-                        st.info(f"""
+                        st.markdown("##### Model Information")
+                        if metric_summary is not None:
+                            st.info(f"""
                         This forecast is generated using advanced time-series analysis optimized for {selected_metric.replace('_', ' ')}.
                         The model automatically adjusts for seasonal patterns and historical trends.
                         """)
                     
-                # Forecast comparison table
-                with st.expander("📋 View Detailed Forecast Data"):
-                    display_cols = ['metric', 'forecast_type', 'period', 'forecast_value', 'conf_lower', 'conf_upper']
-                    display_df = metric_forecasts[display_cols].copy()
-                    display_df.columns = ['Metric', 'Forecast Type', 'Period', 'Forecast Value', 'Confidence Lower', 'Confidence Upper']
-                    display_df['Forecast Value'] = display_df['Forecast Value'].apply(lambda x: f"{x:,.2f}")
-                    display_df['Confidence Lower'] = display_df['Confidence Lower'].apply(lambda x: f"{x:,.2f}")
-                    display_df['Confidence Upper'] = display_df['Confidence Upper'].apply(lambda x: f"{x:,.2f}")
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
+                    # Forecast comparison table
+                    with st.expander("📋 View Detailed Forecast Data"):
+                        display_cols = ['metric', 'forecast_type', 'period', 'forecast_value', 'conf_lower', 'conf_upper']
+                        # Labels and number formats are applied client-side instead of renaming and formatting a copy
+                        st.dataframe(
+                            metric_forecasts[display_cols],
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                'metric': 'Metric',
+                                'forecast_type': 'Forecast Type',
+                                'period': 'Period',
+                                'forecast_value': st.column_config.NumberColumn('Forecast Value', format="%,.2f"),
+                                'conf_lower': st.column_config.NumberColumn('Confidence Lower', format="%,.2f"),
+                                'conf_upper': st.column_config.NumberColumn('Confidence Upper', format="%,.2f")
+                            }
+                        )
                 
-            # State-Level Forecasts Section
-            if 'state_forecasts' in data and 'state_forecasts_summary' in data:
-                st.markdown("#### State-Level Forecasts")
+                # State-Level Forecasts Section
+                if 'state_forecasts' in data and 'state_forecasts_summary' in data:
+                    st.markdown("#### State-Level Forecasts")
                     
-                state_forecasts_df = data['state_forecasts']
-                state_summary_df = data['state_forecasts_summary']
-
-                # --- Normalize state names (FIXES mismatch & iloc error) ---
-                for df in [state_forecasts_df, state_summary_df]:
-                    if 'state' in df.columns:
-                        df['state'] = (
-                            df['state']
-                            .astype(str)
-                            .str.strip()
-                            .str.lower()
-                        )
+                    # --- Normalize state names (FIXES mismatch & iloc error) ---
+                    # Done once per filter selection, with per-state row positions for the lookups below
+                    state_forecasts_df, state_summary_df, state_fc_rows, state_summary_rows = prepare_state_forecasts(
+                        data['state_forecasts'], data['state_forecasts_summary'], view_key
+                    )
+                    no_rows = np.empty(0, dtype=np.intp)
 
 
-                col1, col2 = st.columns(2)
+                    col1, col2 = st.columns(2)
                     
-                with col1:
-                    st.markdown("##### Top States Forecast Performance")
-                    top_n_states = st.slider("Number of States", 5, 15, 10, key="top_forecast_states")
-                    top_states_forecast = state_summary_df.nlargest(top_n_states, 'forecast_periods')
-                        
-                    fig = px.bar(
-                        top_states_forecast,
-                        x='mae',
-                        y='state',
-                        orientation='h',
-                        title=f"Forecast MAE by State (Top {top_n_states})",
-                        labels={'mae': 'Mean Absolute Error', 'state': 'State'},
-                        color='mae',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                    st.plotly_chart(fig, use_container_width=True)
+                    with col1:
+                        st.markdown("##### Top States Forecast Performance")
+                        st.session_state.setdefault("top_forecast_states", 10)
+                        top_n_states = st.slider("Number of States", 5, 15, key="top_forecast_states")
+                        fig = build_state_mae_figure(state_summary_df, top_n_states, view_key)
+                        st.plotly_chart(fig, use_container_width=True)
                     
-                with col2:
-                    st.markdown("##### State Forecast Summary")
-                    # State selector
-                    # states = state_summary_df['state'].unique()
-                    states = sorted(state_summary_df['state'].dropna().unique())
+                    with col2:
+                        st.markdown("##### State Forecast Summary")
+                        # State selector
+                        # states = state_summary_df['state'].unique()
+                        states = sorted(state_summary_df['state'].dropna().unique())
 
-                    selected_state_forecast = st.selectbox("Select State", states, key="state_forecast_select")
+                        selected_state_forecast = st.selectbox("Select State", states, key="state_forecast_select")
                         
-                    #state_forecast_data = state_summary_df[state_summary_df['state'] == selected_state_forecast].iloc[0]
-                    filtered_df = state_summary_df[
-                        state_summary_df['state'] == selected_state_forecast
-                    ]
-
-                    if not filtered_df.empty:
-                        state_forecast_data = filtered_df.iloc[0]
-
-                        # User-friendly metrics
-                        mape = state_forecast_data['mape']
-                        if mape < 5:
-                            reliability = "High"
-                            reliability_color = "#48BB78"
-                        elif mape < 15:
-                            reliability = "Medium"
-                            reliability_color = "#FF9933"
-                        else:
-                            reliability = "Low"
-                            reliability_color = "#F56565"
+                        #state_forecast_data = state_summary_df[state_summary_df['state'] == selected_state_forecast].iloc[0]
+                        filtered_df = state_summary_df.take(state_summary_rows.get(selected_state_forecast, no_rows))
+
+                        if not filtered_df.empty:
+                            state_forecast_data = filtered_df.iloc[0]
+
+                            # User-friendly metrics
+                            mape = state_forecast_data['mape']
+                            if mape < 5:
+                                reliability = "High"
+                                reliability_color = "#48BB78"
+                            elif mape < 15:
+                                reliability = "Medium"
+                                reliability_color = "#FF9933"
+                            else:
+                                reliability = "Low"
+                                reliability_color = "#F56565"
                         
-                        st.markdown(f"""
+                            st.markdown(f"""
                         <div style="background-color: rgba(255,255,255,0.05); padding: 15px; border-radius: 5px; border-left: 5px solid {reliability_color}; margin-bottom: 15px;">
                             <h3 style="margin:0; font-size: 1.1rem; color: #FAFAFA;">Forecast Reliability: <span style="color:{reliability_color}">{reliability}</span></h3>
                         </div>
                         """, unsafe_allow_html=True)
                         
-                        # Total Projected Volume for State
-                        state_fc_subset = state_forecasts_df[state_forecasts_df['state'] == selected_state_forecast]
-                        if not state_fc_subset.empty:
-                            total_projected = state_fc_subset['forecast_value'].sum()
-                            st.metric("Total Projected Volume", f"{total_projected:,.0f}")
+                            # Total Projected Volume for State
+                            state_fc_subset = state_forecasts_df.take(state_fc_rows.get(selected_state_forecast, no_rows))
+                            if not state_fc_subset.empty:
+                                total_projected = state_fc_subset['forecast_value'].sum()
+                                st.metric("Total Projected Volume", f"{total_projected:,.0f}")
 
-                        st.metric("Forecast Horizon", f"{int(state_forecast_data['forecast_periods'])} days")
-                    else:
-                        st.warning("No forecast summary available for this state.")
-                        st.stop()
-    
-                    # Forecast chart for selected state
-                    state_fc = state_forecasts_df[state_forecasts_df['state'] == selected_state_forecast]
-                    if len(state_fc) > 0:
-                        fig_state = go.Figure()
-                        fig_state.add_trace(go.Scatter(
-                            x=state_fc['period'],
-                            y=state_fc['forecast_value'],
-                            mode='lines+markers',
-                            name='Forecast',
-                            line=dict(color='#2ca02c', width=2)
-                        ))
-                        fig_state.add_trace(go.Scatter(
-                            x=state_fc['period'],
-                            y=state_fc['conf_upper'],
-                            mode='lines',
-                            name='Upper',
-                            line=dict(width=0),
-                            showlegend=False
-                        ))
-                        fig_state.add_trace(go.Scatter(
-                            x=state_fc['period'],
-                            y=state_fc['conf_lower'],
-                            mode='lines',
-                            name='Lower',
-                            line=dict(width=0),
-                            fillcolor='rgba(44, 160, 44, 0.2)',
-                            fill='tonexty',
-                            showlegend=False
-                        ))
-                        fig_state.update_layout(
-                            xaxis_title="Period (Days Ahead)",
-                            yaxis_title="Forecasted Value",
-                            height=300
-                        )
-                        st.plotly_chart(fig_state, use_container_width=True)
+                            st.metric("Forecast Horizon", f"{int(state_forecast_data['forecast_periods'])} days")
+                        else:
+                            st.warning("No forecast summary available for this state.")
+                            st.stop()
+    
+                        # Forecast chart for selected state
+                        state_fc = state_fc_subset
+                        if len(state_fc) > 0:
+                            fig_state = build_forecast_figure(
+                                state_fc,
+                                ('state_forecast', selected_state_forecast),
+                                view_key,
+                                dict(name='Forecast', line=dict(color='#2ca02c', width=2)),
+                                dict(name='Upper'),
+                                dict(name='Lower', fillcolor='rgba(44, 160, 44, 0.2)', showlegend=False),
+                                dict(
+                                    xaxis_title="Period (Days Ahead)",
+                                    yaxis_title="Forecasted Value",
+                                    height=300
+                                )
+                            )
+                            st.plotly_chart(fig_state, use_container_width=True)
                     
-                # State forecasts table
-                with st.expander("📋 View All State Forecasts Summary"):
-                    display_cols = ['state', 'forecast_type', 'forecast_periods', 'mape']
-                    display_df = state_summary_df[display_cols].copy().sort_values('mape', ascending=True)
-                    display_df.columns = ['State', 'Forecast Type', 'Forecast Horizon', 'Error Rate (MAPE)']
-                    display_df['Error Rate (MAPE)'] = display_df['Error Rate (MAPE)'].apply(lambda x: f"{x:.2f}%")
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
+                    # State forecasts table
+                    with st.expander("📋 View All State Forecasts Summary"):
+                        st.dataframe(
+                            build_state_forecast_table(state_summary_df, view_key),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                'state': 'State',
+                                'forecast_type': 'Forecast Type',
+                                'forecast_periods': 'Forecast Horizon',
+                                'mape': st.column_config.NumberColumn('Error Rate (MAPE)', format="%.2f%%")
+                            }
+                        )
     
     
     # Tab 4: Geographic Analysis
     with tab4:
-        st.markdown('<div class="tab-description">Spatial distribution of Aadhaar activity and state-wise comparisons.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab4):
+            st.markdown('<div class="tab-description">Spatial distribution of Aadhaar activity and state-wise comparisons.</div>', unsafe_allow_html=True)
         
-        if 'state' in data:
-            render_export_button(data['state'], "Geographic_Data", "tab4_export")
-        st.header("Geographic Distribution Analysis")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            if 'state' in data:
+                render_export_button(data['state'], "Geographic_Data", "tab4_export")
+            st.header("Geographic Distribution Analysis")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        if 'state' in data:
-            # Indian Map Visualization with State-wise Heatmap
-            st.subheader("🗺️ Indian Map: State-wise Heatmap Visualization")
-            
-            map_metric_choice = st.selectbox(
-                "Select Metric for Map",
-                ["Biometric Updates", "Demographic Updates", "Enrolments"],
-                key="map_metric"
-            )
+            if 'state' in data:
+                # Indian Map Visualization with State-wise Heatmap
+                st.subheader("🗺️ Indian Map: State-wise Heatmap Visualization")
+            
+                map_metric_choice = st.selectbox(
+                    "Select Metric for Map",
+                    ["Biometric Updates", "Demographic Updates", "Enrolments"],
+                    key="map_metric"
+                )
             
-            map_metric_col = {
-                "Biometric Updates": "bio_total",
-                "Demographic Updates": "demo_total",
-                "Enrolments": "enrol_total"
-            }[map_metric_choice]
+                map_metric_col = {
+                    "Biometric Updates": "bio_total",
+                    "Demographic Updates": "demo_total",
+                    "Enrolments": "enrol_total"
+                }[map_metric_choice]
             
-            # Prepare data for map
-            state_map_data = data['state'][['state', map_metric_col]].copy()
+                # Prepare data for map
+                state_map_data = data['state'][['state', map_metric_col]].copy()
             
-            # Try to create proper choropleth map with GeoJSON
-            if GEOJSON_HELPER_AVAILABLE:
-                india_geojson = load_india_geojson()
+                # Try to create proper choropleth map with GeoJSON
+                if GEOJSON_HELPER_AVAILABLE:
+                    india_geojson = get_india_geojson()
                 
-                if india_geojson:
-                    state_name_field = get_state_name_field(india_geojson)
+                    if india_geojson:
+                        state_name_field = get_state_name_field(india_geojson)
                     
-                    if state_name_field:
-                        try:
-                            # ---------------------------------------------------------
-                            # FIX: Align data state names with GeoJSON state names
-                            # ---------------------------------------------------------
-                            # Get all state names from GeoJSON
-                            geojson_states = set()
-                            for feature in india_geojson['features']:
-                                if 'properties' in feature and state_name_field in feature['properties']:
-                                    geojson_states.add(feature['properties'][state_name_field])
+                        if state_name_field:
+                            try:
+                                # ---------------------------------------------------------
+                                # FIX: Align data state names with GeoJSON state names
+                                # ---------------------------------------------------------
+                                # Get all state names from GeoJSON
+                                geojson_states = set()
+                                for feature in india_geojson['features']:
+                                    if 'properties' in feature and state_name_field in feature['properties']:
+                                        geojson_states.add(feature['properties'][state_name_field])
                             
-                            # Define specific mapping corrections (Data Name -> GeoJSON Name)
-                            name_replacements = {}
+                                # Define specific mapping corrections (Data Name -> GeoJSON Name)
+                                name_replacements = {}
                             
-                            # 1. Jammu & Kashmir
-                            if "Jammu and Kashmir" in geojson_states:
-                                # Data might have "Jammu And Kashmir" or "Jammu & Kashmir"
-                                if "Jammu And Kashmir" in state_map_data['state'].values:
-                                    name_replacements["Jammu And Kashmir"] = "Jammu and Kashmir"
-                                elif "Jammu & Kashmir" in state_map_data['state'].values:
-                                    name_replacements["Jammu & Kashmir"] = "Jammu and Kashmir"
+                                # 1. Jammu & Kashmir
+                                if "Jammu and Kashmir" in geojson_states:
+                                    # Data might have "Jammu And Kashmir" or "Jammu & Kashmir"
+                                    if "Jammu And Kashmir" in state_map_data['state'].values:
+                                        name_replacements["Jammu And Kashmir"] = "Jammu and Kashmir"
+                                    elif "Jammu & Kashmir" in state_map_data['state'].values:
+                                        name_replacements["Jammu & Kashmir"] = "Jammu and Kashmir"
                             
-                            # 2. Andaman & Nicobar
-                            if "Andaman and Nicobar" in geojson_states:
-                                if "Andaman And Nicobar Islands" in state_map_data['state'].values:
-                                    name_replacements["Andaman And Nicobar Islands"] = "Andaman and Nicobar"
+                                # 2. Andaman & Nicobar
+                                if "Andaman and Nicobar" in geojson_states:
+                                    if "Andaman And Nicobar Islands" in state_map_data['state'].values:
+                                        name_replacements["Andaman And Nicobar Islands"] = "Andaman and Nicobar"
                             
-                            # 3. Dadra & Nagar Haveli and Daman & Diu
-                            # GeoJSON might have them separate or combined. The debug output showed them separate.
-                            # "Dadra and Nagar Haveli", "Daman and Diu"
-                            # Data likely has "Dadra And Nagar Haveli And Daman And Diu"
-                            # This is tricky because one data row maps to two GeoJSON features.
-                            # For now, we can try to map to one of them or leave it (it might just show on one part).
-                            # If we want to show on both, we'd need to duplicate the row in data. 
-                            # Let's check if we can map to the larger one or just skip for now to avoid errors.
+                                # 3. Dadra & Nagar Haveli and Daman & Diu
+                                # GeoJSON might have them separate or combined. The debug output showed them separate.
+                                # "Dadra and Nagar Haveli", "Daman and Diu"
+                                # Data likely has "Dadra And Nagar Haveli And Daman And Diu"
+                                # This is tricky because one data row maps to two GeoJSON features.
+                                # For now, we can try to map to one of them or leave it (it might just show on one part).
+                                # If we want to show on both, we'd need to duplicate the row in data. 
+                                # Let's check if we can map to the larger one or just skip for now to avoid errors.
                             
-                            # 4. Odisha / Orissa
-                            if "Orissa" in geojson_states and "Odisha" in state_map_data['state'].values:
-                                name_replacements["Odisha"] = "Orissa"
+                                # 4. Odisha / Orissa
+                                if "Orissa" in geojson_states and "Odisha" in state_map_data['state'].values:
+                                    name_replacements["Odisha"] = "Orissa"
                                 
-                            # 5. Uttarakhand / Uttaranchal
-                            if "Uttaranchal" in geojson_states and "Uttarakhand" in state_map_data['state'].values:
-                                name_replacements["Uttarakhand"] = "Uttaranchal"
-
-                            # Apply replacements
-                            if name_replacements:
-                                state_map_data['state'] = state_map_data['state'].replace(name_replacements)
-                            # ---------------------------------------------------------
-
-                            # Create choropleth map with proper boundaries
-                            fig_map = px.choropleth(
-                                state_map_data,
-                                geojson=india_geojson,
-                                locations='state',
-                                featureidkey=f'properties.{state_name_field}',
-                                color=map_metric_col,
-                                color_continuous_scale='YlOrRd',
-                                title=f'🗺️ Indian States Choropleth Map: {map_metric_choice}',
-                                hover_data=['state'],
-                                labels={map_metric_col: map_metric_choice}
-                            )
-                            
-                            # Update layout for India
-                            fig_map.update_geos(
-                                fitbounds="locations",
-                                visible=False,
-                                projection_type="mercator",
-                                center=dict(lon=78.9629, lat=20.5937),
-                                projection_scale=4.5
-                            )
-                            
-                            fig_map.update_layout(
-                                height=750,
-                                margin=dict(l=0, r=0, t=50, b=0),
-                                coloraxis_colorbar=dict(
-                                    title=dict(text=map_metric_choice, font=dict(size=14)),
-                                    len=0.7,
-                                    thickness=20
+                                # 5. Uttarakhand / Uttaranchal
+                                if "Uttaranchal" in geojson_states and "Uttarakhand" in state_map_data['state'].values:
+                                    name_replacements["Uttarakhand"] = "Uttaranchal"
+
+                                # Apply replacements
+                                if name_replacements:
+                                    state_map_data['state'] = state_map_data['state'].replace(name_replacements)
+                                # ---------------------------------------------------------
+
+                                # Create choropleth map with proper boundaries (cached per metric and selection)
+                                fig_map = build_state_choropleth(
+                                    state_map_data, india_geojson, state_name_field,
+                                    map_metric_col, map_metric_choice, view_key
                                 )
-                            )
                             
-                            st.plotly_chart(fig_map, use_container_width=True)
-                            st.success("✅ Using proper choropleth map with state boundaries!")
+                                st.plotly_chart(fig_map, use_container_width=True)
+                                st.success("✅ Using proper choropleth map with state boundaries!")
                             
-                        except Exception as e:
-                            st.warning(f"Could not create choropleth map: {str(e)}. Using fallback visualization.")
+                            except Exception as e:
+                                st.warning(f"Could not create choropleth map: {str(e)}. Using fallback visualization.")
+                                create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice)
+                        else:
+                            st.warning("Could not detect state name field in GeoJSON. Using fallback visualization.")
                             create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice)
                     else:
-                        st.warning("Could not detect state name field in GeoJSON. Using fallback visualization.")
+                        st.info("ℹ️ GeoJSON file not found. Using marker-based visualization. To get proper boundaries, download 'india_states.geojson' file.")
                         create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice)
                 else:
-                    st.info("ℹ️ GeoJSON file not found. Using marker-based visualization. To get proper boundaries, download 'india_states.geojson' file.")
                     create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice)
-            else:
-                create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice)
     
     # Tab 5: Age Group Analysis
     with tab5:
-        st.markdown('<div class="tab-description">Analysis of updates across different demographic age groups.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab5):
+            st.markdown('<div class="tab-description">Analysis of updates across different demographic age groups.</div>', unsafe_allow_html=True)
         
-        if 'daily' in data:
-            render_export_button(data['daily'], "Age_Group_Data", "tab5_export")
-        st.header("Age Group Analysis")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            if 'daily' in data:
+                render_export_button(data['daily'], "Age_Group_Data", "tab5_export")
+            st.header("Age Group Analysis")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        if 'daily' in data and len(data['daily']) > 0:
-            # Age group distributions
-            st.subheader("Age Group Distributions")
+            if 'daily' in data and len(data['daily']) > 0:
+                # Age group distributions
+                st.subheader("Age Group Distributions")
+            
+                # Totals, percentages and pies only change with the filters
+                age_summaries = compute_age_summaries(data['daily'], view_key)
+                for age_col, (key, (heading, totals_label, _, palette)) in zip(st.columns(3), AGE_PIE_GROUPS.items()):
+                    with age_col:
+                        st.markdown(f"##### {heading}")
+                        summary = age_summaries.get(key)
+                        if summary is not None and summary['total'] > 0:
+                            fig = build_age_pie_figure(
+                                tuple(summary['counts']), tuple(summary['counts'].values()), palette
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
+                        
+                            # Show totals
+                            st.markdown(f"**{totals_label}:**")
+                            for line in summary['lines']:
+                                st.markdown(line)
             
-            col1, col2, col3 = st.columns(3)
+                st.markdown("---")
             
-            with col1:
-                st.markdown("##### Biometric Updates by Age Group")
-                if 'bio_age_5_17' in data['daily'].columns and 'bio_age_17_' in data['daily'].columns:
-                    bio_age_totals = {
-                        '5-17 years': data['daily']['bio_age_5_17'].sum(),
-                        '17+ years': data['daily']['bio_age_17_'].sum()
-                    }
-                    bio_total = sum(bio_age_totals.values())
-                    if bio_total > 0:
-                        fig = px.pie(
-                            values=list(bio_age_totals.values()),
-                            names=list(bio_age_totals.keys()),
-                            color_discrete_sequence=px.colors.qualitative.Set2
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10))
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Show totals
-                        st.markdown("**Total Biometric Updates:**")
-                        for age, count in bio_age_totals.items():
-                            pct = (count / bio_total * 100) if bio_total > 0 else 0
-                            st.markdown(f"- {age}: {count:,.0f} ({pct:.1f}%)")
+                # Age group trends over time
+                st.subheader("Age Group Trends Over Time")
             
-            with col2:
-                st.markdown("##### Demographic Updates by Age Group")
-                if 'demo_age_5_17' in data['daily'].columns and 'demo_age_17_' in data['daily'].columns:
-                    demo_age_totals = {
-                        '5-17 years': data['daily']['demo_age_5_17'].sum(),
-                        '17+ years': data['daily']['demo_age_17_'].sum()
-                    }
-                    demo_total = sum(demo_age_totals.values())
-                    if demo_total > 0:
-                        fig = px.pie(
-                            values=list(demo_age_totals.values()),
-                            names=list(demo_age_totals.keys()),
-                            color_discrete_sequence=px.colors.qualitative.Set1
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10))
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Show totals
-                        st.markdown("**Total Demographic Updates:**")
-                        for age, count in demo_age_totals.items():
-                            pct = (count / demo_total * 100) if demo_total > 0 else 0
-                            st.markdown(f"- {age}: {count:,.0f} ({pct:.1f}%)")
-            
-            with col3:
-                st.markdown("##### Enrolments by Age Group")
-                if 'age_0_5' in data['daily'].columns and 'age_5_17' in data['daily'].columns and 'age_18_greater' in data['daily'].columns:
-                    enrol_age_totals = {
-                        '0-5 years': data['daily']['age_0_5'].sum(),
-                        '5-17 years': data['daily']['age_5_17'].sum(),
-                        '18+ years': data['daily']['age_18_greater'].sum()
-                    }
-                    enrol_total = sum(enrol_age_totals.values())
-                    if enrol_total > 0:
-                        fig = px.pie(
-                            values=list(enrol_age_totals.values()),
-                            names=list(enrol_age_totals.keys()),
-                            color_discrete_sequence=px.colors.qualitative.Pastel
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10))
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Show totals
-                        st.markdown("**Total Enrolments:**")
-                        for age, count in enrol_age_totals.items():
-                            pct = (count / enrol_total * 100) if enrol_total > 0 else 0
-                            st.markdown(f"- {age}: {count:,.0f} ({pct:.1f}%)")
-            
-            st.markdown("---")
-            
-            # Age group trends over time
-            st.subheader("Age Group Trends Over Time")
-            
-            age_metric = st.selectbox(
-                "Select Metric",
-                ["Biometric", "Demographic", "Enrolment"],
-                key="age_trend_metric"
-            )
-            
-            if age_metric == "Biometric" and 'bio_age_5_17' in data['daily'].columns and 'bio_age_17_' in data['daily'].columns:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['bio_age_5_17'],
-                    mode='lines+markers',
-                    name='5-17 years',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['bio_age_17_'],
-                    mode='lines+markers',
-                    name='17+ years',
-                    line=dict(color='#ff7f0e', width=2)
-                ))
-                fig.update_layout(
-                    title="Biometric Updates by Age Group Over Time",
-                    xaxis_title="Date",
-                    yaxis_title="Count",
-                    hovermode='x unified',
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            
-            elif age_metric == "Demographic" and 'demo_age_5_17' in data['daily'].columns and 'demo_age_17_' in data['daily'].columns:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['demo_age_5_17'],
-                    mode='lines+markers',
-                    name='5-17 years',
-                    line=dict(color='#2ca02c', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['demo_age_17_'],
-                    mode='lines+markers',
-                    name='17+ years',
-                    line=dict(color='#d62728', width=2)
-                ))
-                fig.update_layout(
-                    title="Demographic Updates by Age Group Over Time",
-                    xaxis_title="Date",
-                    yaxis_title="Count",
-                    hovermode='x unified',
-                    height=400
+                age_metric = st.selectbox(
+                    "Select Metric",
+                    ["Biometric", "Demographic", "Enrolment"],
+                    key="age_trend_metric"
                 )
-                st.plotly_chart(fig, use_container_width=True)
             
-            elif age_metric == "Enrolment" and 'age_0_5' in data['daily'].columns and 'age_5_17' in data['daily'].columns and 'age_18_greater' in data['daily'].columns:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['age_0_5'],
-                    mode='lines+markers',
-                    name='0-5 years',
-                    line=dict(color='#9467bd', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['age_5_17'],
-                    mode='lines+markers',
-                    name='5-17 years',
-                    line=dict(color='#8c564b', width=2)
-                ))
-                fig.add_trace(go.Scatter(
-                    x=data['daily']['date'],
-                    y=data['daily']['age_18_greater'],
-                    mode='lines+markers',
-                    name='18+ years',
-                    line=dict(color='#e377c2', width=2)
-                ))
-                fig.update_layout(
-                    title="Enrolments by Age Group Over Time",
-                    xaxis_title="Date",
-                    yaxis_title="Count",
-                    hovermode='x unified',
-                    height=400
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                age_columns = [column for column, _, _ in AGE_TREND_SERIES[age_metric][1]]
+                if all(column in data['daily'].columns for column in age_columns):
+                    # LTTB-downsampled traces, reused until the filters change
+                    fig = build_age_trend_figure(data['daily'], age_metric, view_key)
+                    st.plotly_chart(fig, use_container_width=True)
             
-            # State-level age group analysis
-            if 'state' in data:
-                st.markdown("---")
-                st.subheader("State-Level Age Group Analysis")
+                # State-level age group analysis
+                if 'state' in data:
+                    st.markdown("---")
+                    st.subheader("State-Level Age Group Analysis")
                 
-                if 'bio_age_5_17' in data['state'].columns and 'bio_age_17_' in data['state'].columns:
-                    col1, col2 = st.columns(2)
+                    if 'bio_age_5_17' in data['state'].columns and 'bio_age_17_' in data['state'].columns:
+                        col1, col2 = st.columns(2)
                     
-                    with col1:
-                        st.markdown("##### Top States by Biometric Updates (5-17 years)")
-                        top_n_age = st.slider("Number of States", 5, 20, 10, key="top_age_states")
-                        top_states_age = data['state'].nlargest(top_n_age, 'bio_age_5_17')[['state', 'bio_age_5_17']]
-                        fig = px.bar(
-                            top_states_age,
-                            x='bio_age_5_17',
-                            y='state',
-                            orientation='h',
-                            title=f"Top {top_n_age} States by Biometric Updates (5-17 years)",
-                            labels={'bio_age_5_17': 'Biometric Updates (5-17)', 'state': 'State'},
-                            color='bio_age_5_17',
-                            color_continuous_scale='Blues'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-                        st.plotly_chart(fig, use_container_width=True)
+                        with col1:
+                            st.markdown("##### Top States by Biometric Updates (5-17 years)")
+                            st.session_state.setdefault("top_age_states", 10)
+                            top_n_age = st.slider("Number of States", 5, 20, key="top_age_states")
+                            fig = build_top_states_figure(
+                                data['state'], 'bio_age_5_17', 'Biometric Updates (5-17)', 'Blues',
+                                f"Top {top_n_age} States by Biometric Updates (5-17 years)", top_n_age, view_key
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
                     
-                    with col2:
-                        st.markdown("##### Top States by Biometric Updates (17+ years)")
-                        top_states_age17 = data['state'].nlargest(top_n_age, 'bio_age_17_')[['state', 'bio_age_17_']]
-                        fig = px.bar(
-                            top_states_age17,
-                            x='bio_age_17_',
-                            y='state',
-                            orientation='h',
-                            title=f"Top {top_n_age} States by Biometric Updates (17+ years)",
-                            labels={'bio_age_17_': 'Biometric Updates (17+)', 'state': 'State'},
-                            color='bio_age_17_',
-                            color_continuous_scale='Oranges'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-                        st.plotly_chart(fig, use_container_width=True)
+                        with col2:
+                            st.markdown("##### Top States by Biometric Updates (17+ years)")
+                            fig = build_top_states_figure(
+                                data['state'], 'bio_age_17_', 'Biometric Updates (17+)', 'Oranges',
+                                f"Top {top_n_age} States by Biometric Updates (17+ years)", top_n_age, view_key
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
                 
-                # State age comparison table
-                with st.expander("📋 View All States Age Group Data"):
-                    if 'bio_age_5_17' in data['state'].columns:
-                        display_cols = ['state', 'bio_age_5_17', 'bio_age_17_', 'demo_age_5_17', 'demo_age_17_', 'age_0_5', 'age_5_17', 'age_18_greater']
-                        available_cols = [col for col in display_cols if col in data['state'].columns]
-                        if len(available_cols) > 1:
-                            # Sort by first numeric column (skip 'state' which is index 0)
-                            sort_col = available_cols[1] if len(available_cols) > 1 else available_cols[0]
-                            display_df = data['state'][available_cols].copy().sort_values(sort_col, ascending=False)
-                            # Format columns
-                            for col in available_cols[1:]:
-                                if col in display_df.columns:
-                                    display_df[col] = display_df[col].apply(lambda x: f"{x:,.0f}")
-                            st.dataframe(display_df, use_container_width=True, hide_index=True)
+                    # State age comparison table
+                    with st.expander("📋 View All States Age Group Data"):
+                        if 'bio_age_5_17' in data['state'].columns:
+                            display_cols = ['state', 'bio_age_5_17', 'bio_age_17_', 'demo_age_5_17', 'demo_age_17_', 'age_0_5', 'age_5_17', 'age_18_greater']
+                            available_cols = [col for col in display_cols if col in data['state'].columns]
+                            if len(available_cols) > 1:
+                                # Sort by first numeric column (skip 'state' which is index 0)
+                                sort_col = available_cols[1] if len(available_cols) > 1 else available_cols[0]
+                                # Counts stay numeric (so they sort) and are formatted client-side
+                                count_column = st.column_config.NumberColumn(format="%,.0f")
+                                st.dataframe(
+                                    data['state'][available_cols].sort_values(sort_col, ascending=False),
+                                    use_container_width=True,
+                                    hide_index=True,
+                                    column_config={col: count_column for col in available_cols[1:]}
+                                )
     
     # Tab 6: Coverage & Anomalies
     with tab6:
-        st.markdown('<div class="tab-description">Detection of service coverage gaps and unusual update spikes.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab6):
+            st.markdown('<div class="tab-description">Detection of service coverage gaps and unusual update spikes.</div>', unsafe_allow_html=True)
         
-        if 'district_coverage' in data:
-            render_export_button(data['district_coverage'], "Coverage_Data", "tab6_export")
-        elif 'anomalies' in data:
-            render_export_button(data['anomalies'], "Anomaly_Data", "tab6_export")  
-        st.header("Coverage & Anomaly Analysis")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            if 'district_coverage' in data:
+                render_export_button(data['district_coverage'], "Coverage_Data", "tab6_export")
+            elif 'anomalies' in data:
+                render_export_button(data['anomalies'], "Anomaly_Data", "tab6_export")  
+            st.header("Coverage & Anomaly Analysis")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        # Coverage Analysis Section
-        if 'district_coverage' in data:
-            st.subheader("📊 Coverage Completeness Analysis")
-            
-            # Coverage statistics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            coverage_df = data['district_coverage'].copy()
-            coverage_df = coverage_df[coverage_df['coverage_index'].notna()]
-            
-            with col1:
-                avg_coverage = coverage_df['coverage_index'].mean()
-                st.metric("Avg Coverage", f"{avg_coverage:.2f}")
-            
-            with col2:
-                low_coverage = (coverage_df['coverage_index'] < 0.5).sum()
-                st.metric("Low Coverage", f"{low_coverage}")
-            
-            with col3:
-                good_coverage = (coverage_df['coverage_index'] >= 1.0).sum()
-                st.metric("Good Coverage", f"{good_coverage}")
-            
-            with col4:
-                total_districts = len(coverage_df)
-                st.metric("Districts", f"{total_districts}")
-            
-            st.markdown("---")
-            
-            # Coverage distribution
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("##### Coverage Index Distribution")
-                fig = px.histogram(
-                    coverage_df,
-                    x='coverage_index',
-                    nbins=50,
-                    labels={'coverage_index': 'Coverage Index', 'count': 'Number of Districts'},
-                    color_discrete_sequence=['#1f77b4']
-                )
-                fig.add_vline(x=1.0, line_dash="dash", line_color="green", annotation_text="Ideal (1.0)")
-                fig.add_vline(x=0.5, line_dash="dash", line_color="red", annotation_text="Low (0.5)")
-                fig.update_layout(height=450, margin=dict(l=20, r=20, t=20, b=20))
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                st.markdown("##### Districts Needing Attention (Low Coverage)")
-                threshold = st.slider("Coverage Threshold", 0.0, 1.0, 0.5, 0.1, key="coverage_threshold")
-                low_coverage_districts = coverage_df[coverage_df['coverage_index'] < threshold].sort_values('coverage_index')
-                
-                if len(low_coverage_districts) > 0:
-                    top_low = low_coverage_districts.head(20)[['state', 'district', 'coverage_index', 'demo_total', 'bio_total']]
-                    fig = px.bar(
-                        top_low,
-                        x='coverage_index',
-                        y='district',
-                        orientation='h',
-                        color='coverage_index',
-                        color_continuous_scale='Reds',
-                        title=f"Top 20 Districts with Coverage < {threshold}",
-                        labels={'coverage_index': 'Coverage Index', 'district': 'District'},
-                        hover_data=['state', 'demo_total', 'bio_total']
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info(f"No districts found with coverage below {threshold}")
-            
-            # Coverage by state
-            st.markdown("---")
-            st.markdown("##### Coverage by State")
-            state_coverage = coverage_df.groupby('state').agg({
-                'coverage_index': 'mean',
-                'district': 'count',
-                'demo_total': 'sum',
-                'bio_total': 'sum'
-            }).reset_index()
-            state_coverage.columns = ['state', 'avg_coverage_index', 'district_count', 'demo_total', 'bio_total']
-            state_coverage = state_coverage.sort_values('avg_coverage_index', ascending=False)
-            
-            top_n_coverage = st.slider("Number of States", 5, 30, 15, key="top_coverage_states")
-            top_states_coverage = state_coverage.head(top_n_coverage)
-            
-            fig = px.bar(
-                top_states_coverage,
-                x='avg_coverage_index',
-                y='state',
-                orientation='h',
-                color='avg_coverage_index',
-                color_continuous_scale='RdYlGn',
-                labels={'avg_coverage_index': 'Avg Coverage', 'state': 'State'},
-                hover_data=['district_count', 'demo_total', 'bio_total']
-            )
-            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Coverage table
-            with st.expander("📋 View All Coverage Data"):
-                display_df = coverage_df[['state', 'district', 'coverage_index', 'demo_total', 'bio_total']].copy().sort_values('coverage_index', ascending=True)
-                display_df['coverage_index'] = display_df['coverage_index'].apply(lambda x: f"{x:.3f}")
-                display_df['demo_total'] = display_df['demo_total'].apply(lambda x: f"{x:,.0f}")
-                display_df['bio_total'] = display_df['bio_total'].apply(lambda x: f"{x:,.0f}")
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-        
-        # Anomaly Detection Section
-        if 'anomalies' in data:
-            st.markdown("---")
-            st.subheader("⚠️ Anomaly Detection Results")
-            
-            anomalies_df = data['anomalies'].copy()
-            
-            # Filter anomalies
-            detection_level = st.selectbox(
-                "Detection Level",
-                ['All'] + anomalies_df['detection_level'].unique().tolist(),
-                key="anomaly_level"
-            )
-            
-            if detection_level != 'All':
-                anomalies_df = anomalies_df[anomalies_df['detection_level'] == detection_level]
+            # Coverage Analysis Section
+            if 'district_coverage' in data:
+                st.subheader("📊 Coverage Completeness Analysis")
+            
+                # Coverage statistics
+                coverage_df = data['district_coverage']
+                coverage_df = coverage_df[coverage_df['coverage_index'].notna()]
+                coverage_stats = compute_coverage_stats(coverage_df, view_key)
+                render_metric_row([
+                    ("Avg Coverage", f"{coverage_stats['avg']:.2f}", {}),
+                    ("Low Coverage", f"{coverage_stats['low']}", {}),
+                    ("Good Coverage", f"{coverage_stats['good']}", {}),
+                    ("Districts", f"{coverage_stats['total']}", {}),
+                ])
             
-            metric_filter = st.selectbox(
-                "Metric",
-                ['All'] + anomalies_df['metric'].unique().tolist(),
-                key="anomaly_metric"
-            )
-            
-            if metric_filter != 'All':
-                anomalies_df = anomalies_df[anomalies_df['metric'] == metric_filter]
-            
-            # Anomaly statistics
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                total_anomalies = len(anomalies_df)
-                st.metric("Anomalies", f"{total_anomalies}")
-            
-            with col2:
-                high_severity = (anomalies_df['severity'] >= 0.8).sum() if 'severity' in anomalies_df.columns else 0
-                st.metric("High Severity Anomalies", f"{high_severity}")
-            
-            with col3:
-                if 'date' in anomalies_df.columns:
-                    anomalies_df['date'] = pd.to_datetime(anomalies_df['date'], errors='ignore')
-                    recent_anomalies = anomalies_df[anomalies_df['date'] >= anomalies_df['date'].max() - pd.Timedelta(days=30)] if len(anomalies_df) > 0 else anomalies_df
-                    st.metric("Last 30 Days", f"{len(recent_anomalies)}")
-            
-            # Temporal anomalies visualization
-            if 'date' in anomalies_df.columns and len(anomalies_df) > 0:
-                st.markdown("##### Temporal Anomalies")
-                temporal_anomalies = anomalies_df[anomalies_df['detection_level'] == 'temporal'] if 'detection_level' in anomalies_df.columns else anomalies_df
-                if len(temporal_anomalies) > 0:
-                    fig = go.Figure()
-                    
-                    # Plot anomalies
-                    if 'value' in temporal_anomalies.columns:
-                        fig.add_trace(go.Scatter(
-                            x=temporal_anomalies['date'],
-                            y=temporal_anomalies['value'],
-                            mode='markers',
-                            name='Anomalies',
-                            marker=dict(
-                                size=10,
-                                color='red',
-                                symbol='x'
-                            ),
-                            text=temporal_anomalies['metric'] if 'metric' in temporal_anomalies.columns else None,
-                            hovertemplate='Date: %{x}<br>Value: %{y:,.0f}<br>Metric: %{text}<extra></extra>'
-                        ))
-                    
-                    fig.update_layout(
-                        title="Detected Temporal Anomalies",
-                        xaxis_title="Date",
-                        yaxis_title="Value",
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            # Geographic anomalies
-            if 'state' in anomalies_df.columns and len(anomalies_df[anomalies_df['state'].notna()]) > 0:
-                st.markdown("##### Geographic Anomalies by State")
-                geo_anomalies = anomalies_df[anomalies_df['state'].notna()]
-                if len(geo_anomalies) > 0:
-                    state_anomaly_counts = geo_anomalies.groupby('state').size().reset_index(name='anomaly_count')
-                    state_anomaly_counts = state_anomaly_counts.sort_values('anomaly_count', ascending=False).head(20)
-                    
-                    fig = px.bar(
-                        state_anomaly_counts,
-                        x='anomaly_count',
-                        y='state',
-                        orientation='h',
-                        title="Top 20 States by Anomaly Count",
-                        labels={'anomaly_count': 'Number of Anomalies', 'state': 'State'},
-                        color='anomaly_count',
-                        color_continuous_scale='Reds'
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            # Anomalies table
-            with st.expander("📋 View All Anomalies"):
-                display_cols = ['detection_level', 'metric', 'date', 'value', 'severity', 'state']
-                available_cols = [col for col in display_cols if col in anomalies_df.columns]
-                display_df = anomalies_df[available_cols].copy()
-                if 'value' in display_df.columns:
-                    display_df['value'] = display_df['value'].apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
-                if 'severity' in display_df.columns:
-                    display_df['severity'] = display_df['severity'].apply(lambda x: f"{x:.3f}" if pd.notna(x) else "")
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("Anomaly detection data not available. Please run anomaly detection analysis first.")
-    
-    # Tab 7: Insights & Recommendations
-    with tab7:
-        st.markdown('<div class="tab-description">Actionable findings and prioritized recommendations.</div>', unsafe_allow_html=True)
-        
-        if 'insights' in data:
-            render_export_button(data['insights'], "Insights_Recommendations", "tab7_export")    
-        st.header("Insights & Recommendations")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
-        
-        if 'insights' in data:
-            insights_df = data['insights'].copy()
-            
-            # Filter by priority
-            priority_filter = st.selectbox(
-                "Filter by Priority",
-                ['All', 'High', 'Medium', 'Low'],
-                key="priority_filter"
-            )
-            
-            if priority_filter != 'All':
-                insights_df = insights_df[insights_df['priority'] == priority_filter]
-            
-            # Insights summary
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                total_insights = len(insights_df)
-                st.metric("Total Insights", f"{total_insights}")
-            
-            with col2:
-                high_priority = (insights_df['priority'] == 'High').sum() if 'priority' in insights_df.columns else 0
-                st.metric("High Priority", f"{high_priority}", delta_color="inverse")
-            
-            with col3:
-                medium_priority = (insights_df['priority'] == 'Medium').sum() if 'priority' in insights_df.columns else 0
-                st.metric("Medium Priority", f"{medium_priority}")
-            
-            with col4:
-                low_priority = (insights_df['priority'] == 'Low').sum() if 'priority' in insights_df.columns else 0
-                st.metric("Low Priority", f"{low_priority}")
-            
-            st.markdown("---")
+                st.markdown("---")
             
-            # Category distribution
-            if 'category' in insights_df.columns:
+                # Coverage distribution
                 col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("##### Insights by Category")
-                    category_counts = insights_df['category'].value_counts().reset_index()
-                    category_counts.columns = ['Category', 'Count']
-                    
-                    fig = px.pie(
-                        category_counts,
-                        values='Count',
-                        names='Category',
-                        title="Distribution of Insights by Category",
-                        color_discrete_sequence=px.colors.qualitative.Set3
-                    )
-                    fig.update_traces(textposition='inside', textinfo='percent+label')
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    st.markdown("##### Insights by Priority")
-                    if 'priority' in insights_df.columns:
-                        priority_counts = insights_df['priority'].value_counts().reset_index()
-                        priority_counts.columns = ['Priority', 'Count']
-                        priority_order = ['High', 'Medium', 'Low']
-                        priority_counts['Priority'] = pd.Categorical(priority_counts['Priority'], categories=priority_order, ordered=True)
-                        priority_counts = priority_counts.sort_values('Priority')
-                        
-                        color_map = {'High': '#d62728', 'Medium': '#ff7f0e', 'Low': '#2ca02c'}
-                        
-                        fig = px.bar(
-                            priority_counts,
-                            x='Priority',
-                            y='Count',
-                            title="Distribution of Insights by Priority",
-                            labels={'Count': 'Number of Insights', 'Priority': 'Priority Level'},
-                            color='Priority',
-                            color_discrete_map=color_map
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Display insights
-            st.subheader("Key Insights & Recommendations")
-            
-            for idx, row in insights_df.iterrows():
-                priority = row.get('priority', 'N/A')
-                category = row.get('category', 'General')
-                finding = row.get('finding', '')
-                recommendation = row.get('recommendation', '')
-                
-                # Color based on priority
-                if priority == 'High':
-                    border_color = '#d62728'
-                    bg_color = '#ffe6e6'
-                elif priority == 'Medium':
-                    border_color = '#ff7f0e'
-                    bg_color = '#fff4e6'
-                else:
-                    border_color = '#2ca02c'
-                    bg_color = '#e6ffe6'
-                
-                st.markdown(f"""
-                <div style="background-color: {bg_color}; padding: 1rem; border-left: 4px solid {border_color}; border-radius: 0.25rem; margin: 1rem 0;">
-                    <h4 style="color: {border_color}; margin-top: 0;">
-                        {category} - {priority} Priority
-                    </h4>
-                    <p style="margin-bottom: 0.5rem; color: black;"><strong>Finding:</strong> {finding}</p>
-                    <p style="margin-bottom: 0; color: black;"><strong>Recommendation:</strong> {recommendation}</p>
-
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Insights table
-            with st.expander("📋 View All Insights in Table Format"):
-                display_df = insights_df.copy()
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("Insights data not available. Please run exploratory data analysis to generate insights.")
-    
-    # Tab 8: Surge Predictions
-    with tab8:
-        st.markdown('<div class="tab-description">Early warnings for upcoming surges based on age transitions and regional patterns.</div>', unsafe_allow_html=True)
-        
-        if 'surge_predictions' in data:
-            render_export_button(data['surge_predictions'], "Surge_Predictions", "tab8_export")
-        st.header("🚨 Surge Prediction System")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
-        
-        if 'surge_predictions' in data:
-            predictions_df = data['surge_predictions'].copy()
-            
-            # Summary metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                total_predictions = len(predictions_df)
-                st.metric("Total Surge Predictions", f"{total_predictions}")
-            
-            with col2:
-                high_priority = len(predictions_df[predictions_df['priority'] == 'High']) if 'priority' in predictions_df.columns else 0
-                st.metric("High Priority Surges", f"{high_priority}", delta_color="inverse")
-            
-            with col3:
-                upcoming_30 = len(predictions_df[predictions_df['days_until_surge'] <= 30]) if 'days_until_surge' in predictions_df.columns else 0
-                st.metric("Upcoming (30 days)", f"{upcoming_30}", delta_color="inverse")
-            
-            with col4:
-                avg_confidence = predictions_df['confidence'].mean() if 'confidence' in predictions_df.columns else 0
-                st.metric("Avg Confidence", f"{avg_confidence:.2f}")
-            
-            st.markdown("---")
-            
-            # Filters
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                surge_type_filter = st.selectbox(
-                    "Filter by Surge Type",
-                    ['All'] + predictions_df['surge_type'].unique().tolist() if 'surge_type' in predictions_df.columns else ['All'],
-                    key="surge_type_filter"
-                )
-            
-            with col2:
-                priority_filter = st.selectbox(
-                    "Filter by Priority",
-                    ['All', 'High', 'Medium', 'Low'],
-                    key="surge_priority_filter"
-                )
-            
-            with col3:
-                time_horizon = st.selectbox(
-                    "Time Horizon",
-                    ['All', 'Next 30 days', 'Next 60 days', 'Next 90 days'],
-                    key="surge_time_horizon"
-                )
             
-            # Apply filters
-            filtered_df = predictions_df.copy()
-            
-            if surge_type_filter != 'All' and 'surge_type' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['surge_type'] == surge_type_filter]
-            
-            if priority_filter != 'All' and 'priority' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['priority'] == priority_filter]
-            
-            if time_horizon != 'All' and 'days_until_surge' in filtered_df.columns:
-                if time_horizon == 'Next 30 days':
-                    filtered_df = filtered_df[filtered_df['days_until_surge'] <= 30]
-                elif time_horizon == 'Next 60 days':
-                    filtered_df = filtered_df[filtered_df['days_until_surge'] <= 60]
-                elif time_horizon == 'Next 90 days':
-                    filtered_df = filtered_df[filtered_df['days_until_surge'] <= 90]
-            
-            st.markdown("---")
-            
-            # Surge predictions visualization
-            if len(filtered_df) > 0:
-                # Surge type distribution
-                col1, col2 = st.columns(2)
-                
                 with col1:
-                    st.markdown("##### Surges by Type")
-                    if 'surge_type' in filtered_df.columns:
-                        type_counts = filtered_df['surge_type'].value_counts().reset_index()
-                        type_counts.columns = ['Surge Type', 'Count']
-                        
-                        fig = px.pie(
-                            type_counts,
-                            values='Count',
-                            names='Surge Type',
-                            title="Distribution of Surge Predictions by Type",
-                            color_discrete_sequence=px.colors.qualitative.Set3
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        st.plotly_chart(fig, use_container_width=True)
-                
+                    st.markdown("##### Coverage Index Distribution")
+                    fig = build_coverage_histogram_figure(coverage_df, view_key)
+                    st.plotly_chart(fig, use_container_width=True, key="coverage_hist")
+            
                 with col2:
-                    st.markdown("##### Surges by Priority")
-                    if 'priority' in filtered_df.columns:
-                        priority_counts = filtered_df['priority'].value_counts().reset_index()
-                        priority_counts.columns = ['Priority', 'Count']
-                        priority_order = ['High', 'Medium', 'Low']
-                        priority_counts['Priority'] = pd.Categorical(
-                            priority_counts['Priority'], 
-                            categories=priority_order, 
-                            ordered=True
-                        )
-                        priority_counts = priority_counts.sort_values('Priority')
-                        
-                        color_map = {'High': '#d62728', 'Medium': '#ff7f0e', 'Low': '#2ca02c'}
-                        
-                        fig = px.bar(
-                            priority_counts,
-                            x='Priority',
-                            y='Count',
-                            title="Distribution of Surge Predictions by Priority",
-                            labels={'Count': 'Number of Surges', 'Priority': 'Priority Level'},
-                            color='Priority',
-                            color_discrete_map=color_map
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("---")
-                
-                # Timeline visualization
-                st.markdown("##### Surge Timeline")
-                if 'predicted_date' in filtered_df.columns and 'days_until_surge' in filtered_df.columns:
-                    timeline_df = filtered_df.copy()
-                    timeline_df = timeline_df.sort_values('predicted_date')
-                    
-                    fig = go.Figure()
-                    
-                    # Color by priority
-                    for priority in timeline_df['priority'].unique() if 'priority' in timeline_df.columns else ['High']:
-                        priority_data = timeline_df[timeline_df['priority'] == priority] if 'priority' in timeline_df.columns else timeline_df
-                        
-                        color_map = {'High': '#d62728', 'Medium': '#ff7f0e', 'Low': '#2ca02c'}
-                        color = color_map.get(priority, '#1f77b4')
-                        
-                        fig.add_trace(go.Scatter(
-                            x=priority_data['predicted_date'],
-                            y=priority_data['expected_magnitude'] if 'expected_magnitude' in priority_data.columns else range(len(priority_data)),
-                            mode='markers+lines',
-                            name=f'{priority} Priority',
-                            marker=dict(size=10, color=color),
-                            line=dict(color=color, width=2),
-                            hovertemplate='<b>%{text}</b><br>Date: %{x}<br>Magnitude: %{y:.2f}<extra></extra>',
-                            text=priority_data['state'] if 'state' in priority_data.columns else None
-                        ))
-                    
-                    fig.update_layout(
-                        title="Surge Predictions Timeline",
-                        xaxis_title="Predicted Date",
-                        yaxis_title="Expected Surge Magnitude",
-                        hovermode='closest',
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
+                    render_low_coverage_districts(coverage_df)
+            
+                # Coverage by state
                 st.markdown("---")
-                
-                # Top surges by magnitude
-                st.markdown("##### Top Surges by Expected Magnitude")
-                if 'expected_magnitude' in filtered_df.columns:
-                    top_surges = filtered_df.nlargest(20, 'expected_magnitude')
-                    
-                    fig = px.bar(
-                        top_surges,
-                        x='expected_magnitude',
-                        y='state' if 'state' in top_surges.columns else top_surges.index,
-                        orientation='h',
-                        color='confidence' if 'confidence' in top_surges.columns else None,
-                        title="Top 20 Surge Predictions by Magnitude",
-                        labels={'expected_magnitude': 'Expected Surge Magnitude', 'state': 'State'},
-                        color_continuous_scale='Reds',
-                        hover_data=['days_until_surge', 'confidence', 'priority'] if all(col in top_surges.columns for col in ['days_until_surge', 'confidence', 'priority']) else None
+                st.markdown("##### Coverage by State")
+                state_coverage = compute_state_coverage(coverage_df, view_key)
+            
+                render_state_coverage_chart(state_coverage)
+            
+                # Coverage table
+                with st.expander("📋 View All Coverage Data"):
+                    display_df = coverage_df[['state', 'district', 'coverage_index', 'demo_total', 'bio_total']].sort_values('coverage_index', ascending=True)
+                    # Formatted in the browser, so the columns stay numeric
+                    st.dataframe(
+                        display_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            'coverage_index': st.column_config.NumberColumn(format="%.3f"),
+                            'demo_total': st.column_config.NumberColumn(format="%,.0f"),
+                            'bio_total': st.column_config.NumberColumn(format="%,.0f")
+                        }
                     )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("---")
-                
-                # Detailed surge predictions table
-                st.markdown("##### Detailed Surge Predictions")
-                display_cols = ['surge_type', 'subtype', 'state', 'predicted_date', 'days_until_surge', 
-                               'expected_magnitude', 'estimated_volume', 'confidence', 'priority']
-                available_cols = [col for col in display_cols if col in filtered_df.columns]
-                display_df = filtered_df[available_cols].copy().sort_values('days_until_surge', ascending=True)
-                
-                # Format columns
-                if 'predicted_date' in display_df.columns:
-                    display_df['predicted_date'] = display_df['predicted_date'].dt.strftime('%Y-%m-%d')
-                if 'expected_magnitude' in display_df.columns:
-                    display_df['expected_magnitude'] = display_df['expected_magnitude'].apply(lambda x: f"{x:.2f}")
-                if 'estimated_volume' in display_df.columns:
-                    display_df['estimated_volume'] = display_df['estimated_volume'].apply(lambda x: f"{x:,.0f}" if pd.notna(x) else "")
-                if 'confidence' in display_df.columns:
-                    display_df['confidence'] = display_df['confidence'].apply(lambda x: f"{x:.2f}")
-                
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-                
-                # Upcoming surges alert
-                if 'upcoming_surges' in data and len(data['upcoming_surges']) > 0:
-                    st.markdown("---")
-                    st.markdown("##### 🚨 Upcoming Surges (Next 30 Days)")
-                    upcoming_df = data['upcoming_surges'].copy()
-                    
-                    for idx, row in upcoming_df.iterrows():
-                        priority = row.get('priority', 'High')
-                        state = row.get('state', 'Unknown')
-                        days_until = row.get('days_until_surge', 0)
-                        magnitude = row.get('expected_magnitude', 0)
-                        confidence = row.get('confidence', 0)
-                        
-                        if priority == 'High':
-                            border_color = '#d62728'
-                            bg_color = '#ffe6e6'
-                        elif priority == 'Medium':
-                            border_color = '#ff7f0e'
-                            bg_color = '#fff4e6'
-                        else:
-                            border_color = '#2ca02c'
-                            bg_color = '#e6ffe6'
-                        
-                        st.markdown(f"""
-                        <div style="background-color: {bg_color}; padding: 1rem; border-left: 4px solid {border_color}; border-radius: 0.25rem; margin: 1rem 0;">
-                            <h4 style="color: {border_color}; margin-top: 0;">
-                                {state} - {priority} Priority Surge
-                            </h4>
-                            <p style="margin-bottom: 0.5rem;"><strong>Days Until Surge:</strong> {days_until} days</p>
-                            <p style="margin-bottom: 0.5rem;"><strong>Expected Magnitude:</strong> {magnitude:.2f}x baseline</p>
-                            <p style="margin-bottom: 0;"><strong>Confidence:</strong> {confidence:.2f}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
-            else:
-                st.info("No surge predictions found with the selected filters.")
-        else:
-            st.info("Surge prediction data not available. Please run surge_prediction.py to generate predictions.")
-    
-    # Tab 9: Feature Engineering
-    with tab9:
-        st.markdown('<div class="tab-description">Engineered data variables used by the AI models.</div>', unsafe_allow_html=True)
-        
-        if 'features_daily' in data:
-            render_export_button(data['features_daily'], "Feature_Engineering_Data", "tab9_export")
-        st.header("⚙️ Data Variable Insights")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        if 'features_daily' in data or 'features_state' in data:
-            # Feature summary
-            if 'features_summary' in data:
-                summary = data['features_summary']
-                st.subheader("Feature Engineering Summary")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    total_features = sum(
-                        summary['feature_counts'][k]['num_features_created'] 
-                        for k in summary['feature_counts'].keys()
-                    )
-                    st.metric("Total Features Created", f"{total_features}")
-                
-                with col2:
-                    daily_features = summary['feature_counts'].get('daily', {}).get('num_features_created', 0)
-                    st.metric("Daily Features", f"{daily_features}")
-                
-                with col3:
-                    state_features = summary['feature_counts'].get('state', {}).get('num_features_created', 0)
-                    st.metric("State Features", f"{state_features}")
-                
-                with col4:
-                    st.metric("Feature Types", "7 types")
-                
+            # Anomaly Detection Section
+            if 'anomalies' in data:
                 st.markdown("---")
+                st.subheader("⚠️ Anomaly Detection Results")
             
-            # Feature types visualization
-            if 'features_summary' in data and 'feature_types' in data['features_summary']:
-                st.subheader("Feature Types Distribution")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("##### Daily Features by Type")
-                    if 'daily' in data['features_summary']['feature_types']:
-                        daily_types = data['features_summary']['feature_types']['daily']
-                        type_df = pd.DataFrame([
-                            {'Type': 'Lag Features', 'Count': daily_types.get('lag_features', 0)},
-                            {'Type': 'Rolling Features', 'Count': daily_types.get('rolling_features', 0)},
-                            {'Type': 'Seasonal Features', 'Count': daily_types.get('seasonal_features', 0)},
-                            {'Type': 'Z-Score Features', 'Count': daily_types.get('z_score_features', 0)},
-                            {'Type': 'IQR Features', 'Count': daily_types.get('iqr_features', 0)},
-                            {'Type': 'Scaled Features', 'Count': daily_types.get('scaled_features', 0)},
-                        ])
-                        
-                        fig = px.bar(
-                            type_df,
-                            x='Type',
-                            y='Count',
-                            title="Daily Feature Types",
-                            labels={'Count': 'Number of Features', 'Type': 'Feature Type'},
-                            color='Count',
-                            color_continuous_scale='Blues'
-                        )
-                        fig.update_layout(height=400)
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    st.markdown("##### State Features by Type")
-                    if 'state' in data['features_summary']['feature_types']:
-                        state_types = data['features_summary']['feature_types']['state']
-                        type_df = pd.DataFrame([
-                            {'Type': 'Geographic Features', 'Count': state_types.get('geographic_features', 0)},
-                            {'Type': 'Scaled Features', 'Count': state_types.get('scaled_features', 0)},
-                        ])
-                        
-                        if len(type_df) > 0:
-                            fig = px.bar(
-                                type_df,
-                                x='Type',
-                                y='Count',
-                                title="State Feature Types",
-                                labels={'Count': 'Number of Features', 'Type': 'Feature Type'},
-                                color='Count',
-                                color_continuous_scale='Oranges'
-                            )
-                            fig.update_layout(height=400)
-                            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
+                anomalies_df = data['anomalies']
             
-            # Daily features visualization
-            if 'features_daily' in data:
-                st.subheader("Daily Features Analysis")
-                
-                features_daily_df = data['features_daily'].copy()
-                
-                # Feature category selector
-                feature_category = st.selectbox(
-                    "Select Feature Category",
-                    ['Lag Features', 'Rolling Statistics', 'Z-Score Features', 'IQR Features', 'Seasonal Features'],
-                    key="feature_category"
+                # Filter anomalies
+                detection_level = st.selectbox(
+                    "Detection Level",
+                    ['All'] + unique_values(anomalies_df, 'detection_level', (view_key, 'anomalies')),
+                    key="anomaly_level"
                 )
-                
-                # Get relevant columns
-                if feature_category == 'Lag Features':
-                    feature_cols = [col for col in features_daily_df.columns if '_lag_' in col]
-                elif feature_category == 'Rolling Statistics':
-                    feature_cols = [col for col in features_daily_df.columns if '_rolling_' in col]
-                elif feature_category == 'Z-Score Features':
-                    feature_cols = [col for col in features_daily_df.columns if '_z_score' in col or '_deviation' in col or '_pct_change' in col]
-                elif feature_category == 'IQR Features':
-                    feature_cols = [col for col in features_daily_df.columns if '_iqr' in col]
-                elif feature_category == 'Seasonal Features':
-                    feature_cols = [col for col in features_daily_df.columns if any(x in col for x in ['day_of_week', 'month', 'quarter', 'week_of_year'])]
-                else:
-                    feature_cols = []
-                
-                if len(feature_cols) > 0 and 'date' in features_daily_df.columns:
-                    # Select a feature to visualize
-                    selected_feature = st.selectbox("Select Feature", feature_cols[:10], key="selected_feature_daily")
-                    
-                    if selected_feature in features_daily_df.columns:
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown(f"##### {selected_feature} Over Time")
-                            fig = go.Figure()
-                            fig.add_trace(go.Scatter(
-                                x=features_daily_df['date'],
-                                y=features_daily_df[selected_feature],
-                                mode='lines+markers',
-                                name=selected_feature,
-                                line=dict(color='#1f77b4', width=2)
-                            ))
-                            fig.update_layout(
-                                title=f"{selected_feature} Timeline",
-                                xaxis_title="Date",
-                                yaxis_title="Feature Value",
-                                height=400
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
-                        
-                        with col2:
-                            st.markdown(f"##### {selected_feature} Statistics")
-                            feature_stats = features_daily_df[selected_feature].describe()
-                            
-                            col_stat1, col_stat2 = st.columns(2)
-                            with col_stat1:
-                                st.metric("Mean", f"{feature_stats.get('mean', 0):.2f}")
-                                st.metric("Std", f"{feature_stats.get('std', 0):.2f}")
-                            with col_stat2:
-                                st.metric("Min", f"{feature_stats.get('min', 0):.2f}")
-                                st.metric("Max", f"{feature_stats.get('max', 0):.2f}")
-                            
-                            # Distribution histogram
-                            fig = px.histogram(
-                                features_daily_df,
-                                x=selected_feature,
-                                nbins=30,
-                                labels={'count': 'Frequency'},
-                                color_discrete_sequence=['#1f77b4']
-                            )
-                            fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10))
-                            st.plotly_chart(fig, use_container_width=True)
             
-            st.markdown("---")
+                # Both filters build one mask so the frame is indexed once
+                anomaly_mask = np.ones(len(anomalies_df), dtype=bool)
+                if detection_level != 'All':
+                    anomaly_mask &= (anomalies_df['detection_level'] == detection_level).to_numpy()
             
-            # State features visualization
-            if 'features_state' in data:
-                st.subheader("State Features Analysis")
-                
-                features_state_df = data['features_state'].copy()
-                
-                # Get feature columns (exclude state name)
-                feature_cols = [col for col in features_state_df.columns if col != 'state']
-                
-                if len(feature_cols) > 0:
-                    selected_feature_state = st.selectbox("Select Feature", feature_cols[:15], key="selected_feature_state")
-                    
-                    if selected_feature_state in features_state_df.columns and 'state' in features_state_df.columns:
-                        # Top states by feature value
-                        top_n_features = st.slider("Number of States", 5, 30, 15, key="top_n_features")
-                        top_states = features_state_df.nlargest(top_n_features, selected_feature_state)[['state', selected_feature_state]]
-                        
-                        fig = px.bar(
-                            top_states,
-                            x=selected_feature_state,
-                            y='state',
-                            orientation='h',
-                            labels={selected_feature_state: 'Feature Value', 'state': 'State'},
-                            color=selected_feature_state,
-                            color_continuous_scale='Viridis'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
-                        st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Feature data tables
-            with st.expander("📋 View Daily Features Data"):
-                if 'features_daily' in data:
-                    display_df = data['features_daily'].copy()
-                    # Show only first 20 columns for performance
-                    display_cols = display_df.columns[:20].tolist()
-                    if 'date' in display_df.columns:
-                        display_cols = ['date'] + [c for c in display_cols if c != 'date']
-                    st.dataframe(display_df[display_cols], use_container_width=True, hide_index=True)
-            
-            with st.expander("📋 View State Features Data"):
-                if 'features_state' in data:
-                    display_df = data['features_state'].copy()
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("Feature engineering data not available. Please run feature_engineering.py to generate features.")
-    
-    # Tab 10: District & Pincode Models
-    with tab10:
-        st.markdown('<div class="tab-description">Granular forecasting and anomaly detection at district and pincode levels.</div>', unsafe_allow_html=True)
-        
-        if 'district_forecasts' in data:
-            render_export_button(data['district_forecasts'], "District_Forecasts", "tab10_export")
-        st.header("🏘️ District & Pincode Analysis")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
-        
-        # Summary metrics
-        if 'district_pincode_summary' in data:
-            summary = data['district_pincode_summary']
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                if 'district_forecasts' in summary.get('summary', {}):
-                    total_forecasts = summary['summary']['district_forecasts'].get('total_forecasts', 0)
-                    st.metric("Dist. Forecasts", f"{total_forecasts}")
-                else:
-                    st.metric("Dist. Forecasts", "0")
-            
-            with col2:
-                if 'pincode_anomalies' in summary.get('summary', {}):
-                    total_anomalies = summary['summary']['pincode_anomalies'].get('total_anomalies', 0)
-                    st.metric("Pincode Anomalies", f"{total_anomalies}")
-                else:
-                    st.metric("Pincode Anomalies", "0")
-            
-            with col3:
-                if 'district_forecasts' in summary.get('summary', {}):
-                    unique_states = summary['summary']['district_forecasts'].get('unique_states', 0)
-                    st.metric("States Analyzed", f"{unique_states}")
-                else:
-                    st.metric("States Analyzed", "0")
-            
-            with col4:
-                if 'pincode_anomalies' in summary.get('summary', {}):
-                    unique_pincodes = summary['summary']['pincode_anomalies'].get('unique_pincodes', 0)
-                    st.metric("Pincodes Analyzed", f"{unique_pincodes}")
-                else:
-                    st.metric("Pincodes Analyzed", "0")
-        
-        st.markdown("---")
-        
-        # District-level forecasts section
-        if 'district_forecasts' in data:
-            st.subheader("District-Level Forecasts")
-            
-            district_forecasts_df = data['district_forecasts'].copy()
-            
-            # Filters
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                state_filter = st.selectbox(
-                    "Filter by State",
-                    ['All'] + sorted(district_forecasts_df['state'].unique().tolist()) if 'state' in district_forecasts_df.columns else ['All'],
-                    key="district_state_filter"
+                metric_filter = st.selectbox(
+                    "Metric",
+                    ['All'] + unique_values(anomalies_df, 'metric', (view_key, 'anomalies', detection_level), anomaly_mask),
+                    key="anomaly_metric"
                 )
             
-            with col2:
-                volume_filter = st.selectbox(
-                    "Filter by Volume Classification",
-                    ['All', 'high_volume', 'low_volume'],
-                    key="district_volume_filter"
+                if metric_filter != 'All':
+                    anomaly_mask &= (anomalies_df['metric'] == metric_filter).to_numpy()
+                if not anomaly_mask.all():
+                    anomalies_df = anomalies_df[anomaly_mask]
+            
+                # Anomaly statistics
+                anomaly_columns = frozenset(anomalies_df.columns)
+                # Count on the raw array instead of building a boolean Series
+                high_severity = (
+                    int(np.count_nonzero(anomalies_df['severity'].to_numpy() >= 0.8))
+                    if 'severity' in anomaly_columns else 0
                 )
-            
-            # Apply filters
-            filtered_district_df = district_forecasts_df.copy()
-            if state_filter != 'All' and 'state' in filtered_district_df.columns:
-                filtered_district_df = filtered_district_df[filtered_district_df['state'] == state_filter]
-            if volume_filter != 'All' and 'volume_classification' in filtered_district_df.columns:
-                filtered_district_df = filtered_district_df[filtered_district_df['volume_classification'] == volume_filter]
-            
-            if len(filtered_district_df) > 0:
-                # Volume classification distribution
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("##### Forecasts by Volume Classification")
-                    if 'volume_classification' in filtered_district_df.columns:
-                        volume_counts = filtered_district_df['volume_classification'].value_counts().reset_index()
-                        volume_counts.columns = ['Volume Classification', 'Count']
-                        
-                        fig = px.pie(
-                            volume_counts,
-                            values='Count',
-                            names='Volume Classification',
-                            title="District Forecasts by Volume Type",
-                            color_discrete_sequence=px.colors.qualitative.Set2
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    st.markdown("##### Top Districts by Forecast Mean")
-                    if 'forecast_mean' in filtered_district_df.columns:
-                        top_n_districts = st.slider("Number of Districts", 5, 30, 15, key="top_districts_forecast")
-                        top_districts = filtered_district_df.nlargest(top_n_districts, 'forecast_mean')
-                        
+                anomaly_metrics = [
+                    ("Anomalies", f"{len(anomalies_df)}", {}),
+                    ("High Severity Anomalies", f"{high_severity}", {}),
+                ]
+                # load_data parses the dates once; nothing is re-parsed per rerun
+                if 'date' in anomaly_columns and pd.api.types.is_datetime64_any_dtype(anomalies_df['date']):
+                    anomaly_dates = anomalies_df['date']
+                    recent_anomalies = (
+                        int((anomaly_dates >= anomaly_dates.max() - pd.Timedelta(days=30)).sum())
+                        if len(anomalies_df) > 0 else 0
+                    )
+                    anomaly_metrics.append(("Last 30 Days", f"{recent_anomalies}", {}))
+                render_metric_row(anomaly_metrics, num_columns=3)
+            
+                # Temporal anomalies visualization
+                if 'date' in anomalies_df.columns and len(anomalies_df) > 0:
+                    st.markdown("##### Temporal Anomalies")
+                    temporal_anomalies = anomalies_df[anomalies_df['detection_level'] == 'temporal'] if 'detection_level' in anomalies_df.columns else anomalies_df
+                    if len(temporal_anomalies) > 0:
+                        fig = go.Figure()
+                    
+                        # Plot anomalies
+                        if 'value' in temporal_anomalies.columns:
+                            fig.add_trace(scatter_trace_class(len(temporal_anomalies))(
+                                x=temporal_anomalies['date'],
+                                y=temporal_anomalies['value'],
+                                mode='markers',
+                                name='Anomalies',
+                                marker=dict(
+                                    size=10,
+                                    color='red',
+                                    symbol='x'
+                                ),
+                                text=temporal_anomalies['metric'] if 'metric' in temporal_anomalies.columns else None,
+                                hovertemplate='Date: %{x}<br>Value: %{y:,.0f}<br>Metric: %{text}<extra></extra>'
+                            ))
+                    
+                        fig.update_layout(
+                            title="Detected Temporal Anomalies",
+                            xaxis_title="Date",
+                            yaxis_title="Value",
+                            height=400
+                        )
+                        st.plotly_chart(fig, use_container_width=True, key="anomaly_temporal")
+            
+                # Geographic anomalies
+                if 'state' in anomalies_df.columns and len(anomalies_df[anomalies_df['state'].notna()]) > 0:
+                    st.markdown("##### Geographic Anomalies by State")
+                    geo_anomalies = anomalies_df[anomalies_df['state'].notna()]
+                    if len(geo_anomalies) > 0:
+                        state_anomaly_counts = compute_state_anomaly_counts(
+                            geo_anomalies, (view_key, detection_level, metric_filter)
+                        )
+                    
                         fig = px.bar(
-                            top_districts,
-                            x='forecast_mean',
-                            y='district',
+                            state_anomaly_counts,
+                            x='anomaly_count',
+                            y='state',
                             orientation='h',
-                            color='volume_classification' if 'volume_classification' in top_districts.columns else None,
-                            labels={'forecast_mean': 'Forecast Mean', 'district': 'District'},
-                            hover_data=['state', 'historical_mean', 'forecast_trend'],
-                            color_discrete_map={'high_volume': '#1f77b4', 'low_volume': '#ff7f0e'} if 'volume_classification' in top_districts.columns else None
+                            title="Top 20 States by Anomaly Count",
+                            labels={'anomaly_count': 'Number of Anomalies', 'state': 'State'},
+                            color='anomaly_count',
+                            color_continuous_scale='Reds'
                         )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500, margin=dict(l=20, r=20, t=20, b=20))
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                # State aggregations
-                if 'district_state_aggregations' in data:
-                    st.markdown("---")
-                    st.markdown("##### State-Level Aggregations (Resource Planning)")
-                    state_agg_df = data['district_state_aggregations'].copy()
-                    
-                    fig = px.bar(
-                        state_agg_df,
-                        x='state',
-                        y='total_forecast_mean',
-                        color='forecast_increase',
-                        labels={'total_forecast_mean': 'Total Forecast Mean', 'state': 'State', 'forecast_increase': 'Forecast Increase (%)'},
-                        color_continuous_scale='RdYlGn'
+                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+                        st.plotly_chart(fig, use_container_width=True, key="anomaly_state")
+            
+                # Anomalies table
+                with st.expander("📋 View All Anomalies"):
+                    display_cols = ['detection_level', 'metric', 'date', 'value', 'severity', 'state']
+                    available_cols = [col for col in display_cols if col in anomalies_df.columns]
+                    display_df = anomalies_df[available_cols]
+                    st.dataframe(
+                        display_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            'value': st.column_config.NumberColumn(format="%,.0f"),
+                            'severity': st.column_config.NumberColumn(format="%.3f")
+                        }
                     )
-                    fig.update_layout(xaxis_tickangle=-45, height=400, margin=dict(l=20, r=20, t=20, b=20))
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # District forecasts table
-                with st.expander("📋 View District Forecasts Data"):
-                    display_cols = ['state', 'district', 'metric', 'volume_classification', 'historical_mean', 
-                                   'forecast_mean', 'forecast_trend', 'forecast_periods', 'data_points']
-                    available_cols = [col for col in display_cols if col in filtered_district_df.columns]
-                    display_df = filtered_district_df[available_cols].copy().sort_values('forecast_mean', ascending=False)
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
             else:
-                st.info("No district forecasts found with the selected filters.")
-        else:
-            st.info("District forecast data not available. Please run district_pincode_models.py to generate forecasts.")
+                st.info("Anomaly detection data not available. Please run anomaly detection analysis first.")
+    
+    # Tab 7: Insights & Recommendations
+    with tab7:
+        if is_tab_open(tab7):
+            st.markdown('<div class="tab-description">Actionable findings and prioritized recommendations.</div>', unsafe_allow_html=True)
         
-        st.markdown("---")
+            if 'insights' in data:
+                render_export_button(data['insights'], "Insights_Recommendations", "tab7_export")    
+            st.header("Insights & Recommendations")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        # Pincode-level anomalies section
-        if 'pincode_anomalies' in data:
-            st.subheader("Pincode-Level Anomalies")
+            if 'insights' in data:
+                insights_df = data['insights']
             
-            pincode_anomalies_df = data['pincode_anomalies'].copy()
-            
-            # Filters
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                pincode_state_filter = st.selectbox(
-                    "Filter by State",
-                    ['All'] + sorted(pincode_anomalies_df['state'].unique().tolist()) if 'state' in pincode_anomalies_df.columns else ['All'],
-                    key="pincode_state_filter"
+                # Filter by priority
+                priority_filter = st.selectbox(
+                    "Filter by Priority",
+                    ['All', 'High', 'Medium', 'Low'],
+                    key="priority_filter"
                 )
             
-            with col2:
-                severity_filter = st.selectbox(
-                    "Filter by Severity",
-                    ['All', 'High (≥0.7)', 'Medium (0.4-0.7)', 'Low (<0.4)'],
-                    key="pincode_severity_filter"
-                )
+                if priority_filter != 'All':
+                    insights_df = insights_df[insights_df['priority'] == priority_filter]
             
-            # Apply filters
-            filtered_pincode_df = pincode_anomalies_df.copy()
-            if pincode_state_filter != 'All' and 'state' in filtered_pincode_df.columns:
-                filtered_pincode_df = filtered_pincode_df[filtered_pincode_df['state'] == pincode_state_filter]
-            if severity_filter != 'All' and 'severity' in filtered_pincode_df.columns:
-                if severity_filter == 'High (≥0.7)':
-                    filtered_pincode_df = filtered_pincode_df[filtered_pincode_df['severity'] >= 0.7]
-                elif severity_filter == 'Medium (0.4-0.7)':
-                    filtered_pincode_df = filtered_pincode_df[(filtered_pincode_df['severity'] >= 0.4) & (filtered_pincode_df['severity'] < 0.7)]
-                else:
-                    filtered_pincode_df = filtered_pincode_df[filtered_pincode_df['severity'] < 0.4]
+                # Insights summary
+                # One pass over the priority column for all three priority metrics
+                priority_tally = insights_df['priority'].value_counts() if 'priority' in insights_df.columns else pd.Series(dtype=int)
+                render_metric_row([
+                    ("Total Insights", f"{len(insights_df)}", {}),
+                    ("High Priority", f"{int(priority_tally.get('High', 0))}", {'delta_color': "inverse"}),
+                    ("Medium Priority", f"{int(priority_tally.get('Medium', 0))}", {}),
+                    ("Low Priority", f"{int(priority_tally.get('Low', 0))}", {}),
+                ])
             
-            if len(filtered_pincode_df) > 0:
-                # Volume classification distribution
-                col1, col2 = st.columns(2)
+                st.markdown("---")
+            
+                # Category distribution
+                if 'category' in insights_df.columns:
+                    col1, col2 = st.columns(2)
                 
-                with col1:
-                    st.markdown("##### Anomalies by Volume Classification")
-                    if 'volume_classification' in filtered_pincode_df.columns:
-                        volume_counts = filtered_pincode_df['volume_classification'].value_counts().reset_index()
-                        volume_counts.columns = ['Volume Classification', 'Count']
-                        
+                    with col1:
+                        st.markdown("##### Insights by Category")
+                        category_counts = count_values(insights_df, 'category', ('Category', 'Count'), (view_key, priority_filter))
+                    
                         fig = px.pie(
-                            volume_counts,
+                            category_counts,
                             values='Count',
-                            names='Volume Classification',
-                            title="Pincode Anomalies by Volume Type",
-                            color_discrete_sequence=px.colors.qualitative.Set1
+                            names='Category',
+                            title="Distribution of Insights by Category",
+                            color_discrete_sequence=px.colors.qualitative.Set3
                         )
                         fig.update_traces(textposition='inside', textinfo='percent+label')
-                        st.plotly_chart(fig, use_container_width=True)
+                        st.plotly_chart(fig, use_container_width=True, key="insight_category_pie")
                 
-                with col2:
-                    st.markdown("##### Top Pincodes by Anomaly Severity")
-                    if 'severity' in filtered_pincode_df.columns:
-                        top_n_pincodes = st.slider("Number of Pincodes", 5, 50, 20, key="top_pincodes_anomalies")
-                        top_pincodes = filtered_pincode_df.nlargest(top_n_pincodes, 'severity')
+                    with col2:
+                        st.markdown("##### Insights by Priority")
+                        if 'priority' in insights_df.columns:
+                            priority_counts = count_priorities(insights_df, (view_key, priority_filter))
                         
-                        fig = px.bar(
-                            top_pincodes,
-                            x='severity',
-                            y='pincode',
-                            orientation='h',
-                            color='severity',
-                            title=f"Top {top_n_pincodes} Pincodes by Anomaly Severity",
-                            labels={'severity': 'Severity', 'pincode': 'Pincode'},
-                            hover_data=['state', 'district', 'value', 'mad_z_score'],
-                            color_continuous_scale='Reds'
-                        )
-                        fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                # State-level anomaly summary
-                if 'state' in filtered_pincode_df.columns:
-                    st.markdown("---")
-                    st.markdown("##### Anomalies by State")
-                    state_anomaly_counts = filtered_pincode_df.groupby('state').agg({
-                        'pincode': 'count',
-                        'severity': 'mean'
-                    }).reset_index()
-                    state_anomaly_counts.columns = ['state', 'anomaly_count', 'avg_severity']
-                    state_anomaly_counts = state_anomaly_counts.sort_values('anomaly_count', ascending=False).head(20)
-                    
-                    fig = px.bar(
-                        state_anomaly_counts,
-                        x='anomaly_count',
-                        y='state',
-                        orientation='h',
-                        color='avg_severity',
-                        title="Top 20 States by Pincode Anomaly Count",
-                        labels={'anomaly_count': 'Number of Anomalies', 'state': 'State', 'avg_severity': 'Avg Severity'},
-                        color_continuous_scale='Reds'
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Pincode anomalies table
-                with st.expander("📋 View Pincode Anomalies Data"):
-                    display_cols = ['pincode', 'state', 'district', 'metric', 'value', 'volume_classification',
-                                   'severity', 'mad_z_score', 'is_high_anomaly']
-                    available_cols = [col for col in display_cols if col in filtered_pincode_df.columns]
-                    display_df = filtered_pincode_df[available_cols].copy().sort_values('severity', ascending=False)
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
+                            color_map = PRIORITY_COLORS
+                        
+                            fig = px.bar(
+                                priority_counts,
+                                x='Priority',
+                                y='Count',
+                                title="Distribution of Insights by Priority",
+                                labels={'Count': 'Number of Insights', 'Priority': 'Priority Level'},
+                                color='Priority',
+                                color_discrete_map=color_map
+                            )
+                            st.plotly_chart(fig, use_container_width=True, key="insight_priority_bar")
+            
+                st.markdown("---")
+            
+                # Display insights
+                st.subheader("Key Insights & Recommendations")
+            
+                # All cards go out as one markdown element rather than one per insight
+                insight_cards = []
+                card_rows = with_default_columns(
+                    insights_df, {'priority': 'N/A', 'category': 'General', 'finding': '', 'recommendation': ''}
+                )
+                for row in card_rows.itertuples(index=False):
+                    priority = row.priority
+                    category = row.category
+                    finding = row.finding
+                    recommendation = row.recommendation
+                    insight_cards.append(priority_card_html(
+                        priority,
+                        f"{category} - {priority} Priority",
+                        f'<p style="margin-bottom: 0.5rem; color: black;"><strong>Finding:</strong> {finding}</p>'
+                        f'<p style="margin-bottom: 0; color: black;"><strong>Recommendation:</strong> {recommendation}</p>'
+                    ))
+                if insight_cards:
+                    st.markdown(''.join(insight_cards), unsafe_allow_html=True)
+            
+                # Insights table
+                with st.expander("📋 View All Insights in Table Format"):
+                    st.dataframe(insights_df, use_container_width=True, hide_index=True)
             else:
-                st.info("No pincode anomalies found with the selected filters.")
-        else:
-            st.info("Pincode anomaly data not available. Please run district_pincode_models.py to generate anomalies.")
+                st.info("Insights data not available. Please run exploratory data analysis to generate insights.")
     
-    # Tab 11: Actionable Insights
-    with tab11:
-        st.markdown('<div class="tab-description">Synthesis of AI findings into task-oriented recommendations.</div>', unsafe_allow_html=True)
-        
-        # --- NEW EXPORT CODE STARTS HERE ---
-        # We try to export 'filtered_insights' if it exists, otherwise 'insights_df'
-        # We check locals() to see which dataframe is available to avoid errors
-        if 'filtered_insights' in locals():
-            export_df = filtered_insights
-        elif 'insights_df' in locals():
-            export_df = insights_df
-        elif 'actionable_insights' in data:
-            export_df = data['actionable_insights']
-        else:
-            export_df = None
-
-        if export_df is not None:
-            render_export_button(export_df, "Actionable_Insights", "tab11")
-        # --- NEW EXPORT CODE ENDS HERE ---
-        st.header("🎯 Final Action Plans")
+    # Tab 8: Surge Predictions
+    with tab8:
+        if is_tab_open(tab8):
+            st.markdown('<div class="tab-description">Early warnings for upcoming surges based on age transitions and regional patterns.</div>', unsafe_allow_html=True)
         
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}**...")
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            if 'surge_predictions' in data:
+                render_export_button(data['surge_predictions'], "Surge_Predictions", "tab8_export")
+            st.header("🚨 Surge Prediction System")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
         
-        if 'actionable_insights' in data:
-            insights_df = data['actionable_insights'].copy()
+            if 'surge_predictions' in data:
+                predictions_df = data['surge_predictions']
+            
+                # Summary metrics
+                prediction_columns = frozenset(predictions_df.columns)
+                high_priority = (
+                    int(np.count_nonzero((predictions_df['priority'] == 'High').to_numpy()))
+                    if 'priority' in prediction_columns else 0
+                )
+                upcoming_30 = (
+                    int(np.count_nonzero(predictions_df['days_until_surge'].to_numpy() <= 30))
+                    if 'days_until_surge' in prediction_columns else 0
+                )
+                avg_confidence = predictions_df['confidence'].mean() if 'confidence' in prediction_columns else 0
+                render_metric_row([
+                    ("Total Surge Predictions", f"{len(predictions_df)}", {}),
+                    ("High Priority Surges", f"{high_priority}", {'delta_color': "inverse"}),
+                    ("Upcoming (30 days)", f"{upcoming_30}", {'delta_color': "inverse"}),
+                    ("Avg Confidence", f"{avg_confidence:.2f}", {}),
+                ])
             
-            # Summary metrics from insights_summary if available
-            if 'insights_summary' in data:
-                summary = data['insights_summary']
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    total_insights = summary.get('total_insights', len(insights_df))
-                    st.metric("Total Insights", f"{total_insights}")
+                st.markdown("---")
+            
+                render_surge_explorer(predictions_df, data.get('upcoming_surges'), view_key)
+            else:
+                st.info("Surge prediction data not available. Please run surge_prediction.py to generate predictions.")
+    
+    # Tab 9: Feature Engineering
+    with tab9:
+        if is_tab_open(tab9):
+            st.markdown('<div class="tab-description">Engineered data variables used by the AI models.</div>', unsafe_allow_html=True)
+        
+            if 'features_daily' in data:
+                render_export_button(data['features_daily'], "Feature_Engineering_Data", "tab9_export")
+            st.header("⚙️ Data Variable Insights")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+        
+            if 'features_daily' in data or 'features_state' in data:
+                # Feature summary
+                if 'features_summary' in data:
+                    summary = data['features_summary']
+                    st.subheader("Feature Engineering Summary")
                 
-                with col2:
-                    high_priority = summary.get('by_priority', {}).get('High', 0)
-                    st.metric("High Priority", f"{high_priority}", delta_color="inverse")
+                    total_features = sum(
+                        summary['feature_counts'][k]['num_features_created'] 
+                        for k in summary['feature_counts'].keys()
+                    )
+                    daily_features = summary['feature_counts'].get('daily', {}).get('num_features_created', 0)
+                    state_features = summary['feature_counts'].get('state', {}).get('num_features_created', 0)
+                    render_metric_row([
+                        ("Total Features Created", f"{total_features}", {}),
+                        ("Daily Features", f"{daily_features}", {}),
+                        ("State Features", f"{state_features}", {}),
+                        ("Feature Types", "7 types", {}),
+                    ])
                 
-                with col3:
-                    critical_priority = summary.get('by_priority', {}).get('Critical', 0)
-                    if critical_priority > 0:
-                        st.metric("Critical Priority", f"{critical_priority}", delta_color="inverse")
-                    else:
-                        medium_priority = summary.get('by_priority', {}).get('Medium', 0)
-                        st.metric("Medium Priority", f"{medium_priority}")
+                    st.markdown("---")
+            
+                # Feature types visualization
+                if 'features_summary' in data and 'feature_types' in data['features_summary']:
+                    st.subheader("Feature Types Distribution")
                 
-                with col4:
-                    high_impact = summary.get('by_impact', {}).get('High', 0)
-                    st.metric("High Impact", f"{high_impact}", delta_color="inverse")
-            else:
-                # Fallback to calculating from dataframe
-                col1, col2, col3, col4 = st.columns(4)
+                    col1, col2 = st.columns(2)
                 
-                with col1:
-                    total_insights = len(insights_df)
-                    st.metric("Total Insights", f"{total_insights}")
+                    with col1:
+                        st.markdown("##### Daily Features by Type")
+                        if 'daily' in data['features_summary']['feature_types']:
+                            daily_types = data['features_summary']['feature_types']['daily']
+                            type_df = pd.DataFrame([
+                                {'Type': 'Lag Features', 'Count': daily_types.get('lag_features', 0)},
+                                {'Type': 'Rolling Features', 'Count': daily_types.get('rolling_features', 0)},
+                                {'Type': 'Seasonal Features', 'Count': daily_types.get('seasonal_features', 0)},
+                                {'Type': 'Z-Score Features', 'Count': daily_types.get('z_score_features', 0)},
+                                {'Type': 'IQR Features', 'Count': daily_types.get('iqr_features', 0)},
+                                {'Type': 'Scaled Features', 'Count': daily_types.get('scaled_features', 0)},
+                            ])
+                        
+                            fig = px.bar(
+                                type_df,
+                                x='Type',
+                                y='Count',
+                                title="Daily Feature Types",
+                                labels={'Count': 'Number of Features', 'Type': 'Feature Type'},
+                                color='Count',
+                                color_continuous_scale='Blues'
+                            )
+                            fig.update_layout(height=400)
+                            st.plotly_chart(fig, use_container_width=True)
                 
-                with col2:
-                    high_priority = len(insights_df[insights_df['priority'] == 'High']) if 'priority' in insights_df.columns else 0
-                    st.metric("High Priority", f"{high_priority}", delta_color="inverse")
+                    with col2:
+                        st.markdown("##### State Features by Type")
+                        if 'state' in data['features_summary']['feature_types']:
+                            state_types = data['features_summary']['feature_types']['state']
+                            type_df = pd.DataFrame([
+                                {'Type': 'Geographic Features', 'Count': state_types.get('geographic_features', 0)},
+                                {'Type': 'Scaled Features', 'Count': state_types.get('scaled_features', 0)},
+                            ])
+                        
+                            if len(type_df) > 0:
+                                fig = px.bar(
+                                    type_df,
+                                    x='Type',
+                                    y='Count',
+                                    title="State Feature Types",
+                                    labels={'Count': 'Number of Features', 'Type': 'Feature Type'},
+                                    color='Count',
+                                    color_continuous_scale='Oranges'
+                                )
+                                fig.update_layout(height=400)
+                                st.plotly_chart(fig, use_container_width=True)
+            
+                st.markdown("---")
+            
+                # Daily features visualization
+                if 'features_daily' in data:
+                    st.subheader("Daily Features Analysis")
                 
-                with col3:
-                    critical_priority = len(insights_df[insights_df['priority'] == 'Critical']) if 'priority' in insights_df.columns else 0
-                    if critical_priority > 0:
-                        st.metric("Critical Priority", f"{critical_priority}", delta_color="inverse")
-                    else:
-                        medium_priority = len(insights_df[insights_df['priority'] == 'Medium']) if 'priority' in insights_df.columns else 0
-                        st.metric("Medium Priority", f"{medium_priority}")
+                    features_daily_df = data['features_daily']
                 
-                with col4:
-                    high_impact = len(insights_df[insights_df['impact'] == 'High']) if 'impact' in insights_df.columns else 0
-                    st.metric("High Impact", f"{high_impact}", delta_color="inverse")
-            
-            st.markdown("---")
+                    render_daily_feature_panel(features_daily_df, view_key)
             
-            # Filters
-            col1, col2, col3 = st.columns(3)
+                st.markdown("---")
             
-            with col1:
-                insight_type_filter = st.selectbox(
-                    "Filter by Insight Type",
-                    ['All'] + insights_df['insight_type'].unique().tolist() if 'insight_type' in insights_df.columns else ['All'],
-                    key="actionable_insight_type_filter"
-                )
+                # State features visualization
+                if 'features_state' in data:
+                    st.subheader("State Features Analysis")
+                
+                    features_state_df = data['features_state']
+                
+                    render_state_feature_panel(features_state_df)
             
-            with col2:
-                priority_filter = st.selectbox(
-                    "Filter by Priority",
-                    ['All', 'Critical', 'High', 'Medium', 'Low'],
-                    key="actionable_priority_filter"
-                )
+                st.markdown("---")
             
-            with col3:
-                state_filter = st.selectbox(
-                    "Filter by State",
-                    ['All'] + sorted([s for s in insights_df['state'].dropna().unique().tolist() if pd.notna(s)]) if 'state' in insights_df.columns else ['All'],
-                    key="actionable_state_filter"
-                )
+                # Feature data tables
+                with st.expander("📋 View Daily Features Data"):
+                    if 'features_daily' in data:
+                        display_df = data['features_daily']
+                        # Show only first 20 columns for performance
+                        display_cols = display_df.columns[:20].tolist()
+                        if 'date' in display_df.columns:
+                            display_cols = ['date'] + [c for c in display_cols if c != 'date']
+                        st.dataframe(display_df[display_cols], use_container_width=True, hide_index=True)
+            
+                with st.expander("📋 View State Features Data"):
+                    if 'features_state' in data:
+                        st.dataframe(data['features_state'], use_container_width=True, hide_index=True)
+            else:
+                st.info("Feature engineering data not available. Please run feature_engineering.py to generate features.")
+    
+    # Tab 10: District & Pincode Models
+    with tab10:
+        if is_tab_open(tab10):
+            st.markdown('<div class="tab-description">Granular forecasting and anomaly detection at district and pincode levels.</div>', unsafe_allow_html=True)
+        
+            if 'district_forecasts' in data:
+                render_export_button(data['district_forecasts'], "District_Forecasts", "tab10_export")
+            st.header("🏘️ District & Pincode Analysis")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+        
+            # Summary metrics
+            if 'district_pincode_summary' in data:
+                summary = data['district_pincode_summary']
+            
+                district_summary = summary.get('summary', {}).get('district_forecasts', {})
+                pincode_summary = summary.get('summary', {}).get('pincode_anomalies', {})
+                render_metric_row([
+                    ("Dist. Forecasts", f"{district_summary.get('total_forecasts', 0)}", {}),
+                    ("Pincode Anomalies", f"{pincode_summary.get('total_anomalies', 0)}", {}),
+                    ("States Analyzed", f"{district_summary.get('unique_states', 0)}", {}),
+                    ("Pincodes Analyzed", f"{pincode_summary.get('unique_pincodes', 0)}", {}),
+                ])
+        
+            st.markdown("---")
+        
+            # District-level forecasts section
+            if 'district_forecasts' in data:
+                st.subheader("District-Level Forecasts")
             
-            # Apply filters
-            filtered_insights = insights_df.copy()
-            if insight_type_filter != 'All' and 'insight_type' in filtered_insights.columns:
-                filtered_insights = filtered_insights[filtered_insights['insight_type'] == insight_type_filter]
-            if priority_filter != 'All' and 'priority' in filtered_insights.columns:
-                filtered_insights = filtered_insights[filtered_insights['priority'] == priority_filter]
-            if state_filter != 'All' and 'state' in filtered_insights.columns:
-                filtered_insights = filtered_insights[filtered_insights['state'] == state_filter]
+                district_forecasts_df = data['district_forecasts']
             
-            st.markdown(f"**Showing {len(filtered_insights)} of {len(insights_df)} insights**")
+                render_district_forecasts(district_forecasts_df, data.get('district_state_aggregations'), view_key)
+            else:
+                st.info("District forecast data not available. Please run district_pincode_models.py to generate forecasts.")
+        
             st.markdown("---")
+        
+            # Pincode-level anomalies section
+            if 'pincode_anomalies' in data:
+                st.subheader("Pincode-Level Anomalies")
             
-            # Visualizations
-            if len(filtered_insights) > 0:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("##### Insights by Type")
-                    if 'insight_type' in filtered_insights.columns:
-                        type_counts = filtered_insights['insight_type'].value_counts().reset_index()
-                        type_counts.columns = ['Insight Type', 'Count']
-                        
-                        # Format insight type names
-                        type_counts['Insight Type'] = type_counts['Insight Type'].str.replace('_', ' ').str.title()
-                        
-                        fig = px.pie(
-                            type_counts,
-                            values='Count',
-                            names='Insight Type',
-                            title="Distribution by Insight Type",
-                            color_discrete_sequence=px.colors.qualitative.Set3
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    st.markdown("##### Insights by Priority")
-                    if 'priority' in filtered_insights.columns:
-                        priority_counts = filtered_insights['priority'].value_counts().reset_index()
-                        priority_counts.columns = ['Priority', 'Count']
-                        
-                        priority_order = ['Critical', 'High', 'Medium', 'Low']
-                        priority_counts['Priority'] = pd.Categorical(priority_counts['Priority'], categories=priority_order, ordered=True)
-                        priority_counts = priority_counts.sort_values('Priority')
-                        
-                        color_map = {'Critical': '#8B0000', 'High': '#d62728', 'Medium': '#ff7f0e', 'Low': '#2ca02c'}
-                        
-                        fig = px.bar(
-                            priority_counts,
-                            x='Priority',
-                            y='Count',
-                            title="Distribution by Priority",
-                            labels={'Count': 'Number of Insights', 'Priority': 'Priority Level'},
-                            color='Priority',
-                            color_discrete_map=color_map
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-                
-                # State distribution if available
-                if 'state' in filtered_insights.columns and filtered_insights['state'].notna().sum() > 0:
-                    st.markdown("---")
-                    st.markdown("##### Insights by State")
-                    state_counts = filtered_insights[filtered_insights['state'].notna()]['state'].value_counts().head(15).reset_index()
-                    state_counts.columns = ['State', 'Count']
-                    
-                    fig = px.bar(
-                        state_counts,
-                        x='Count',
-                        y='State',
-                        orientation='h',
-                        title="Top 15 States by Number of Insights",
-                        labels={'Count': 'Number of Insights', 'State': 'State'},
-                        color='Count',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
-                    st.plotly_chart(fig, use_container_width=True)
+                pincode_anomalies_df = data['pincode_anomalies']
             
-            st.markdown("---")
+                render_pincode_anomalies(pincode_anomalies_df, view_key)
+            else:
+                st.info("Pincode anomaly data not available. Please run district_pincode_models.py to generate anomalies.")
+    
+    # Tab 11: Actionable Insights
+    with tab11:
+        if is_tab_open(tab11):
+            st.markdown('<div class="tab-description">Synthesis of AI findings into task-oriented recommendations.</div>', unsafe_allow_html=True)
+        
+            # --- NEW EXPORT CODE STARTS HERE ---
+            # We try to export 'filtered_insights' if it exists, otherwise 'insights_df'
+            # We check locals() to see which dataframe is available to avoid errors
+            if 'filtered_insights' in locals():
+                export_df = filtered_insights
+            elif 'insights_df' in locals():
+                export_df = insights_df
+            elif 'actionable_insights' in data:
+                export_df = data['actionable_insights']
+            else:
+                export_df = None
 
-  #change title color in bottom tabs          
-            # Display insights
-            st.subheader("Actionable Insights & Recommendations")
-            
-            if len(filtered_insights) > 0:
-                for idx, row in filtered_insights.iterrows():
-                    priority = row.get('priority', 'Medium')
-                    insight_type = row.get('insight_type', 'general').replace('_', ' ').title()
-                    title = row.get('title', 'Insight')
-                    rationale = row.get('rationale', '')
-                    expected_impact = row.get('expected_impact', '')
-                    timeline = row.get('timeline', 'Not specified')
-                    state = row.get('state', 'N/A')
-                    district = row.get('district', '')
-                    
-                    # Parse action items (could be string or list)
-                    action_items_str = row.get('action_items', '')
-                    if isinstance(action_items_str, str):
-                        action_items = [item.strip() for item in action_items_str.split(';') if item.strip()]
-                    else:
-                        action_items = action_items_str if isinstance(action_items_str, list) else []
-                    
-                    # Color based on priority
-                    if priority == 'Critical':
-                        border_color = '#8B0000'
-                        bg_color = '#ffe6e6'
-                        priority_icon = '🔴'
-                    elif priority == 'High':
-                        border_color = '#d62728'
-                        bg_color = '#ffe6e6'
-                        priority_icon = '🟠'
-                    elif priority == 'Medium':
-                        border_color = '#ff7f0e'
-                        bg_color = '#fff4e6'
-                        priority_icon = '🟡'
-                    else:
-                        border_color = '#2ca02c'
-                        bg_color = '#e6ffe6'
-                        priority_icon = '🟢'
-                    
-                    # Build location string
-                    location = state if state != 'N/A' and pd.notna(state) else 'National'
-                    if district and pd.notna(district):
-                        location = f"{district}, {location}"
-                    
-                    # Build action items HTML
-                    action_items_html = ""
-                    if action_items:
-                        action_items_html = "<ul style='margin-top: 0.5rem; margin-bottom: 0.5rem; color: #333;'>"
-                        for item in action_items[:5]:  # Limit to 5 items for display
-                            action_items_html += f"<li style='margin-bottom: 0.25rem; color: #333;'>{item}</li>"
-                        if len(action_items) > 5:
-                            action_items_html += f"<li style='color: #666;'><em>... and {len(action_items) - 5} more</em></li>"
-                        action_items_html += "</ul>"
-                    
-                    st.markdown(f"""
-                    <div style="background-color: {bg_color}; padding: 1.5rem; border-left: 5px solid {border_color}; border-radius: 0.5rem; margin: 1.5rem 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1); color: #333;">
-                        <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;">
-                            <h3 style="color: {border_color}; margin-top: 0; margin-bottom: 0.5rem;">
-                                {priority_icon} {title}
-                            </h3>
-                            <span style="background-color: {border_color}; color: white; padding: 0.25rem 0.75rem; border-radius: 1rem; font-size: 0.85rem; font-weight: bold;">
-                                {priority}
-                            </span>
-                        </div>
-                        <div style="margin-bottom: 0.75rem; color: #333;">
-                            <strong style="color: #555;">Type:</strong> <span style="color: #333;">{insight_type}</span> | 
-                            <strong style="color: #555;">Location:</strong> <span style="color: #333;">{location}</span> | 
-                            <strong style="color: #555;">Timeline:</strong> <span style="color: #333;">{timeline}</span>
-                        </div>
-                        {f'<div style="margin-bottom: 0.75rem; color: #333;"><strong style="color: #555;">Rationale:</strong> <span style="color: #333;">{rationale}</span></div>' if rationale else ''}
-                        {f'<div style="margin-bottom: 0.75rem; color: #333;"><strong style="color: #555;">Expected Impact:</strong> <span style="color: #333;">{expected_impact}</span></div>' if expected_impact else ''}
-                        {f'<div style="margin-bottom: 0; color: #333;"><strong style="color: #555;">Action Items:</strong>{action_items_html}</div>' if action_items_html else ''}
-                    </div>
-                    """, unsafe_allow_html=True)
+            if export_df is not None:
+                render_export_button(export_df, "Actionable_Insights", "tab11")
+            # --- NEW EXPORT CODE ENDS HERE ---
+            st.header("🎯 Final Action Plans")
+        
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}**...")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+        
+            if 'actionable_insights' in data:
+                insights_df = data['actionable_insights']
+            
+                # Summary metrics from insights_summary if available
+                if 'insights_summary' in data:
+                    summary = data['insights_summary']
+                    priority_tally = summary.get('by_priority', {})
+                    total_insights = summary.get('total_insights', len(insights_df))
+                    high_impact = summary.get('by_impact', {}).get('High', 0)
+                else:
+                    # Fallback to calculating from dataframe
+                    priority_tally = insights_df['priority'].value_counts() if 'priority' in insights_df.columns else pd.Series(dtype=int)
+                    total_insights = len(insights_df)
+                    high_impact = int(np.count_nonzero(insights_df['impact'].to_numpy() == 'High')) if 'impact' in insights_df.columns else 0
                 
-                # Insights table
+                # Critical replaces Medium in the third slot whenever there are any
+                critical_priority = int(priority_tally.get('Critical', 0))
+                if critical_priority > 0:
+                    third_metric = ("Critical Priority", f"{critical_priority}", {'delta_color': "inverse"})
+                else:
+                    third_metric = ("Medium Priority", f"{int(priority_tally.get('Medium', 0))}", {})
+                render_metric_row([
+                    ("Total Insights", f"{total_insights}", {}),
+                    ("High Priority", f"{int(priority_tally.get('High', 0))}", {'delta_color': "inverse"}),
+                    third_metric,
+                    ("High Impact", f"{high_impact}", {'delta_color': "inverse"}),
+                ])
+            
                 st.markdown("---")
-                with st.expander("📋 View All Insights in Table Format"):
-                    display_cols = ['insight_id', 'insight_type', 'title', 'priority', 'impact', 'state', 'district', 'timeline']
-                    available_cols = [col for col in display_cols if col in filtered_insights.columns]
-                    display_df = filtered_insights[available_cols].copy()
-                    
-                    # Format display
-                    if 'insight_type' in display_df.columns:
-                        display_df['insight_type'] = display_df['insight_type'].str.replace('_', ' ').str.title()
-                    
-                    st.dataframe(display_df, use_container_width=True, hide_index=True)
+            
+                render_actionable_insights(insights_df, view_key)
             else:
-                st.info("No insights match the selected filters.")
-        else:
-            st.info("⚠️ Actionable insights data not available. Please run `insights_generator.py` to generate actionable insights.")
-            st.markdown("""
+                st.info("⚠️ Actionable insights data not available. Please run `insights_generator.py` to generate actionable insights.")
+                st.markdown("""
             **To generate actionable insights:**
             1. Ensure you have run the following modules:
                - `surge_prediction.py` (for surge predictions)
@@ -3339,230 +3927,232 @@ def main():
 
     # Tab 12: Forensic Signal Intelligence
     with tab12:
-        st.markdown('<div class="tab-description">Forensic-grade detection of statistical anomalies in adult enrollments.</div>', unsafe_allow_html=True)
+        if is_tab_open(tab12):
+            st.markdown('<div class="tab-description">Forensic-grade detection of statistical anomalies in adult enrollments.</div>', unsafe_allow_html=True)
         
-        # Forensic results are calculated on-the-fly, so we export the raw input data here
-        # (Detailed forensic reports have their own download button at the bottom of this tab)
-        if 'enrolment' in data:
-            render_export_button(data['enrolment'], "Forensic_Input_Data", "tab12_export")
-        st.header("🕵️ Enrollment Pattern Risk Intelligence (Forensic Signal)")
+            # Forensic results are calculated on-the-fly, so we export the raw input data here
+            # (Detailed forensic reports have their own download button at the bottom of this tab)
+            if 'enrolment' in data:
+                render_export_button(data['enrolment'], "Forensic_Input_Data", "tab12_export")
+            st.header("🕵️ Enrollment Pattern Risk Intelligence (Forensic Signal)")
         
-        if selected_state != 'All':
-            st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
+            if selected_state != 'All':
+                st.info(f"📍 **Currently viewing data for: {selected_state}** — Select 'All' in the sidebar to view national data.")
 
-        if not FORENSIC_AVAILABLE:
-            st.error("⚠️ Forensic Analysis module (`forensic_analysis.py`) is missing or failed to load.")
-        else:
-            if 'enrolment' in data and 'biometric' in data and 'demographic' in data:
-                # Run Analysis
-                with st.spinner("Running forensic algorithms (Temporal, Spatial, Cross-Signal)..."):
-                    # Initialize with current data (already filtered by date/state)
-                    analyzer = ForensicAnalyzer(data['enrolment'], data['biometric'], data['demographic'])
-                    # Run analysis
-                    results_df = analyzer.run_analysis()
-                    # Get temporal summary
-                    temporal_df = analyzer.get_temporal_summary(interval='2M')
+            if not FORENSIC_AVAILABLE:
+                st.error("⚠️ Forensic Analysis module (`forensic_analysis.py`) is missing or failed to load.")
+            else:
+                if 'enrolment' in data and 'biometric' in data and 'demographic' in data:
+                    # Run Analysis
+                    with st.spinner("Running forensic algorithms (Temporal, Spatial, Cross-Signal)..."):
+                        # Current data is already filtered by date/state; view_key identifies it
+                        results_df, temporal_df = run_forensic_analysis(
+                            data['enrolment'], data['biometric'], data['demographic'], view_key
+                        )
                 
-                if not temporal_df.empty:
-                    # --- TEMPORAL FORENSIC MAP ---
-                    st.subheader("🗺️ Temporal Forensic Map (2-Month Intervals)")
+                    if not temporal_df.empty:
+                        # --- TEMPORAL FORENSIC MAP ---
+                        st.subheader("🗺️ Temporal Forensic Map (2-Month Intervals)")
                     
-                    # Date Slider
-                    unique_periods = sorted(temporal_df['period'].unique())
-                    period_labels = [p.strftime('%b %Y') for p in unique_periods]
+                        # Date Slider
+                        unique_periods = sorted(temporal_df['period'].unique())
+                        period_labels = [p.strftime('%b %Y') for p in unique_periods]
                     
-                    if len(period_labels) > 0:
-                        selected_label = st.select_slider(
-                            "Select Time Period",
-                            options=period_labels,
-                            value=period_labels[-1]
-                        )
+                        if len(period_labels) > 0:
+                            # Start on the latest period, and fall back to it when the kept one is gone
+                            if st.session_state.get("forensic_period") not in period_labels:
+                                st.session_state["forensic_period"] = period_labels[-1]
+                            selected_label = st.select_slider(
+                                "Select Time Period",
+                                options=period_labels,
+                                key="forensic_period"
+                            )
                         
-                        # Find corresponding timestamp
-                        selected_idx = period_labels.index(selected_label)
-                        selected_period = unique_periods[selected_idx]
+                            # Find corresponding timestamp
+                            selected_idx = period_labels.index(selected_label)
+                            selected_period = unique_periods[selected_idx]
                         
-                        # Filter data by Period
-                        period_data = temporal_df[temporal_df['period'] == selected_period]
-
-                        # --- DRILL-DOWN FILTERS ---
-                        f_col1, f_col2, f_col3 = st.columns(3)
-                        with f_col1:
-                            # State Filter
-                            all_states = sorted(period_data['state'].unique().tolist())
-                            sel_state = st.selectbox("Filter by State", ["All"] + all_states, key='forensic_state')
+                            # Filter data by Period
+                            period_data = temporal_df[temporal_df['period'] == selected_period]
+
+                            # --- DRILL-DOWN FILTERS ---
+                            f_col1, f_col2, f_col3 = st.columns(3)
+                            with f_col1:
+                                # State Filter
+                                all_states = sorted(period_data['state'].unique().tolist())
+                                sel_state = st.selectbox("Filter by State", ["All"] + all_states, key='forensic_state')
                         
-                        with f_col2:
-                            # District Filter
-                            if sel_state != "All":
-                                districts = sorted(period_data[period_data['state'] == sel_state]['district'].unique().tolist())
-                                sel_dist = st.selectbox("Filter by District", ["All"] + districts, key='forensic_dist')
-                            else:
-                                sel_dist = st.selectbox("Filter by District", ["All"], disabled=True, key='forensic_dist')
+                            with f_col2:
+                                # District Filter
+                                if sel_state != "All":
+                                    districts = sorted(period_data[period_data['state'] == sel_state]['district'].unique().tolist())
+                                    sel_dist = st.selectbox("Filter by District", ["All"] + districts, key='forensic_dist')
+                                else:
+                                    sel_dist = st.selectbox("Filter by District", ["All"], disabled=True, key='forensic_dist')
                         
-                        with f_col3:
-                            # Pincode Filter (Optional search)
+                            with f_col3:
+                                # Pincode Filter (Optional search)
+                                if sel_dist != "All":
+                                    pincodes = sorted(period_data[(period_data['state'] == sel_state) & (period_data['district'] == sel_dist)]['pincode'].unique().tolist())
+                                    sel_pin = st.selectbox("Filter by Pincode", ["All"] + [str(p) for p in pincodes], key='forensic_pin')
+                                else:
+                                    sel_pin = st.selectbox("Filter by Pincode", ["All"], disabled=True, key='forensic_pin')
+
+                            # Apply Filters
+                            filtered_view = period_data.copy()
+                            if sel_state != "All":
+                                filtered_view = filtered_view[filtered_view['state'] == sel_state]
                             if sel_dist != "All":
-                                pincodes = sorted(period_data[(period_data['state'] == sel_state) & (period_data['district'] == sel_dist)]['pincode'].unique().tolist())
-                                sel_pin = st.selectbox("Filter by Pincode", ["All"] + [str(p) for p in pincodes], key='forensic_pin')
-                            else:
-                                sel_pin = st.selectbox("Filter by Pincode", ["All"], disabled=True, key='forensic_pin')
-
-                        # Apply Filters
-                        filtered_view = period_data.copy()
-                        if sel_state != "All":
-                            filtered_view = filtered_view[filtered_view['state'] == sel_state]
-                        if sel_dist != "All":
-                            filtered_view = filtered_view[filtered_view['district'] == sel_dist]
-                        if sel_pin != "All":
-                             filtered_view = filtered_view[filtered_view['pincode'] == int(sel_pin)]
-
-                        # --- MAP VISUALIZATION (State Level) ---
-                        # Aggregate to State level for the map (uses filtered view to reflect selection)
-                        state_map_data = filtered_view.groupby('state')['risk_score_norm'].mean().reset_index()
+                                filtered_view = filtered_view[filtered_view['district'] == sel_dist]
+                            if sel_pin != "All":
+                                 filtered_view = filtered_view[filtered_view['pincode'] == int(sel_pin)]
+
+                            # --- MAP VISUALIZATION (State Level) ---
+                            # Aggregate to State level for the map (uses filtered view to reflect selection)
+                            state_map_data = filtered_view.groupby('state', observed=True, sort=False)['risk_score_norm'].mean().reset_index()
                         
-                        col1, col2 = st.columns([3, 1])
+                            col1, col2 = st.columns([3, 1])
                         
-                        with col1:
-                            if GEOJSON_HELPER_AVAILABLE:
-                                india_geojson = load_india_geojson()
-                                if india_geojson:
-                                    # Create choropleth
-                                    fig_map = px.choropleth(
-                                        state_map_data,
-                                        geojson=india_geojson,
-                                        locations='state',
-                                        featureidkey=f"properties.{get_state_name_field(india_geojson)}",
-                                        color='risk_score_norm',
-                                        color_continuous_scale='Reds',
-                                        title=f"Forensic Signal Intensity by State - {selected_label}",
-                                        labels={'risk_score_norm': 'Signal Intensity (Avg)'}
-                                    )
-                                    # Zoom to data bounds (filters)
-                                    fig_map.update_geos(fitbounds="locations", visible=False)
-                                    fig_map.update_layout(height=500, margin=dict(l=0, r=0, t=30, b=0))
-                                    st.plotly_chart(fig_map, use_container_width=True)
+                            with col1:
+                                if GEOJSON_HELPER_AVAILABLE:
+                                    india_geojson = get_india_geojson()
+                                    if india_geojson:
+                                        # Create choropleth
+                                        fig_map = px.choropleth(
+                                            state_map_data,
+                                            geojson=india_geojson,
+                                            locations='state',
+                                            featureidkey=f"properties.{get_state_name_field(india_geojson)}",
+                                            color='risk_score_norm',
+                                            color_continuous_scale='Reds',
+                                            title=f"Forensic Signal Intensity by State - {selected_label}",
+                                            labels={'risk_score_norm': 'Signal Intensity (Avg)'}
+                                        )
+                                        # Zoom to data bounds (filters)
+                                        fig_map.update_geos(fitbounds="locations", visible=False)
+                                        fig_map.update_layout(height=500, margin=dict(l=0, r=0, t=30, b=0))
+                                        st.plotly_chart(fig_map, use_container_width=True)
+                                    else:
+                                        create_marker_fallback_map(state_map_data, 'risk_score_norm', 'Signal Intensity')
                                 else:
                                     create_marker_fallback_map(state_map_data, 'risk_score_norm', 'Signal Intensity')
-                            else:
-                                create_marker_fallback_map(state_map_data, 'risk_score_norm', 'Signal Intensity')
                                 
-                        with col2:
-                            st.markdown(f"**{selected_label} Summary**")
-                            # Metrics based on FILTERED view
-                            total_adults = filtered_view['adult_enrollment'].sum()
-                            avg_signal = filtered_view['risk_score_norm'].mean()
-                            max_signal = filtered_view['risk_score_norm'].max()
-                            loc_count = len(filtered_view)
+                            with col2:
+                                st.markdown(f"**{selected_label} Summary**")
+                                # Metrics based on FILTERED view
+                                total_adults = filtered_view['adult_enrollment'].sum()
+                                avg_signal = filtered_view['risk_score_norm'].mean()
+                                max_signal = filtered_view['risk_score_norm'].max()
+                                loc_count = len(filtered_view)
                             
-                            st.metric("Total 18+ Enrollments", f"{int(total_adults):,}", help="Total adult enrollments in selected scope")
-                            st.metric("Avg Signal", f"{avg_signal:.1f}")
-                            st.metric("Max Signal", f"{max_signal:.1f}")
-                            st.metric("Areas Count", f"{loc_count}")
+                                st.metric("Total 18+ Enrollments", f"{int(total_adults):,}", help="Total adult enrollments in selected scope")
+                                st.metric("Avg Signal", f"{avg_signal:.1f}")
+                                st.metric("Max Signal", f"{max_signal:.1f}")
+                                st.metric("Areas Count", f"{loc_count}")
                             
-                            st.markdown("---")
-                            if sel_state == "All":
-                                st.markdown("**Top Risk States**")
-                                top_items = state_map_data.nlargest(5, 'risk_score_norm')
-                                st.table(top_items.set_index('state')[['risk_score_norm']].style.format("{:.1f}"))
-                            elif sel_dist == "All":
-                                st.markdown(f"**Top Districts in {sel_state}**")
-                                dist_agg = filtered_view.groupby('district')['risk_score_norm'].mean().reset_index()
-                                top_items = dist_agg.nlargest(5, 'risk_score_norm')
-                                st.table(top_items.set_index('district')[['risk_score_norm']].style.format("{:.1f}"))
-                            else:
-                                st.markdown(f"**Pincodes in {sel_dist}**")
-                                top_items = filtered_view.nlargest(5, 'risk_score_norm')
-                                st.table(top_items.set_index('pincode')[['risk_score_norm']].style.format("{:.1f}"))
+                                st.markdown("---")
+                                if sel_state == "All":
+                                    st.markdown("**Top Risk States**")
+                                    top_items = top_n_rows(state_map_data, 'risk_score_norm', 5)
+                                    st.table(top_items.set_index('state')[['risk_score_norm']].style.format("{:.1f}"))
+                                elif sel_dist == "All":
+                                    st.markdown(f"**Top Districts in {sel_state}**")
+                                    dist_agg = filtered_view.groupby('district')['risk_score_norm'].mean().reset_index()
+                                    top_items = top_n_rows(dist_agg, 'risk_score_norm', 5)
+                                    st.table(top_items.set_index('district')[['risk_score_norm']].style.format("{:.1f}"))
+                                else:
+                                    st.markdown(f"**Pincodes in {sel_dist}**")
+                                    top_items = top_n_rows(filtered_view, 'risk_score_norm', 5)
+                                    st.table(top_items.set_index('pincode')[['risk_score_norm']].style.format("{:.1f}"))
 
-                        # --- HIERARCHICAL AREA MAP (Treemap) ---
-                        st.subheader(f"🏘️ Area Implementation Analysis")
-                        st.caption("Hierarchical breakdown: State → District → Pincode (Size = Enrollment Volume, Color = Signal Intensity)")
+                            # --- HIERARCHICAL AREA MAP (Treemap) ---
+                            st.subheader(f"🏘️ Area Implementation Analysis")
+                            st.caption("Hierarchical breakdown: State → District → Pincode (Size = Enrollment Volume, Color = Signal Intensity)")
                         
-                        # Path for Treemap
-                        path_cols = ['state', 'district']
-                        if 'pincode' in filtered_view.columns:
-                            # Convert pincode to string for categorical plotting
-                            filtered_view['pincode_str'] = filtered_view['pincode'].astype(str)
-                            path_cols.append('pincode_str')
+                            # Path for Treemap
+                            path_cols = ['state', 'district']
+                            if 'pincode' in filtered_view.columns:
+                                # Convert pincode to string for categorical plotting
+                                filtered_view['pincode_str'] = filtered_view['pincode'].astype(str)
+                                path_cols.append('pincode_str')
                         
-                        # For Treemap, we need positive values for size. Use total_enrollment or 1 if 0.
-                        filtered_view['display_size'] = filtered_view['total_enrollment'].clip(lower=1)
+                            # For Treemap, we need positive values for size. Use total_enrollment or 1 if 0.
+                            filtered_view['display_size'] = filtered_view['total_enrollment'].clip(lower=1)
                         
-                        fig_tree = px.treemap(
-                            filtered_view,
-                            path=path_cols,
-                            values='display_size',
-                            color='risk_score_norm',
-                            color_continuous_scale='Reds',
-                            hover_data=['adult_enrollment', 'algo1_score', 'algo5_score'],
-                            title=f"Signal Intensity Distribution: {sel_state if sel_state != 'All' else 'All States'}"
-                        )
-                        fig_tree.update_layout(height=500)
-                        st.plotly_chart(fig_tree, use_container_width=True)
+                            fig_tree = px.treemap(
+                                filtered_view,
+                                path=path_cols,
+                                values='display_size',
+                                color='risk_score_norm',
+                                color_continuous_scale='Reds',
+                                hover_data=['adult_enrollment', 'algo1_score', 'algo5_score'],
+                                title=f"Signal Intensity Distribution: {sel_state if sel_state != 'All' else 'All States'}"
+                            )
+                            fig_tree.update_layout(height=500)
+                            st.plotly_chart(fig_tree, use_container_width=True)
 
-                        # --- DETAILED LOCATION ANALYSIS ---
-                        st.subheader(f"📍 Detailed Forensic Data ({selected_label})")
+                            # --- DETAILED LOCATION ANALYSIS ---
+                            st.subheader(f"📍 Detailed Forensic Data ({selected_label})")
                         
-                        display_cols = ['state', 'district', 'adult_enrollment', 'risk_score_norm', 
-                                       'algo1_score', 'algo2_score', 'algo5_score']
-                        if 'pincode' in filtered_view.columns:
-                            display_cols.insert(2, 'pincode')
+                            display_cols = ['state', 'district', 'adult_enrollment', 'risk_score_norm', 
+                                           'algo1_score', 'algo2_score', 'algo5_score']
+                            if 'pincode' in filtered_view.columns:
+                                display_cols.insert(2, 'pincode')
                             
-                        detailed_view = filtered_view[display_cols].sort_values('risk_score_norm', ascending=False)
+                            detailed_view = filtered_view[display_cols].sort_values('risk_score_norm', ascending=False)
                         
-                        # Rename columns for display (Safe Language)
-                        detailed_view_display = detailed_view.rename(columns={
-                            'risk_score_norm': 'Signal Intensity',
-                            'adult_enrollment': 'Enrollment Vol',
-                            'algo1_score': 'Temporal Dev',
-                            'algo2_score': 'Spatial Anom',
-                            'algo5_score': 'Demographic Ratio'
-                        })
+                            # Rename columns for display (Safe Language)
+                            detailed_view_display = detailed_view.rename(columns={
+                                'risk_score_norm': 'Signal Intensity',
+                                'adult_enrollment': 'Enrollment Vol',
+                                'algo1_score': 'Temporal Dev',
+                                'algo2_score': 'Spatial Anom',
+                                'algo5_score': 'Demographic Ratio'
+                            })
                         
-                        st.dataframe(
-                            detailed_view_display.head(1000).style.background_gradient(subset=['Signal Intensity'], cmap='Reds'),
-                            use_container_width=True,
-                            hide_index=True
-                        )
+                            st.dataframe(
+                                detailed_view_display.head(1000).style.background_gradient(subset=['Signal Intensity'], cmap='Reds'),
+                                use_container_width=True,
+                                hide_index=True
+                            )
                         
-                        csv_period = detailed_view_display.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            f"Download Report ({selected_label})",
-                            csv_period,
-                            f"forensic_report_{selected_label.replace(' ', '_')}.csv",
-                            "text/csv",
-                            key=f'dl_{selected_idx}'
-                        )
-                    else:
-                        st.warning("Not enough data to generate timeline.")
+                            csv_period = detailed_view_display.to_csv(index=False).encode('utf-8')
+                            st.download_button(
+                                f"Download Report ({selected_label})",
+                                csv_period,
+                                f"forensic_report_{selected_label.replace(' ', '_')}.csv",
+                                "text/csv",
+                                key=f'dl_{selected_idx}'
+                            )
+                        else:
+                            st.warning("Not enough data to generate timeline.")
 
-                    st.markdown("---")
+                        st.markdown("---")
                     
-                    # --- ALGORITHM BREAKDOWN (Aggregated) ---
-                    st.subheader("Algorithm Contribution (All Time)")
-                    with st.expander("View Algorithm Performance Stats"):
-                        avg_scores = {
-                            'Temporal Deviation': results_df['algo1_score'].mean(),
-                            'Spatial Anomaly': results_df['algo2_score'].mean(),
-                            'Forecast Violation': results_df['algo3_score'].mean(),
-                            'Cross-Signal Integrity': results_df['algo4_score'].mean(),
-                            'Demographic Ratio': results_df['algo5_score'].mean()
-                        }
+                        # --- ALGORITHM BREAKDOWN (Aggregated) ---
+                        st.subheader("Algorithm Contribution (All Time)")
+                        with st.expander("View Algorithm Performance Stats"):
+                            avg_scores = {
+                                'Temporal Deviation': results_df['algo1_score'].mean(),
+                                'Spatial Anomaly': results_df['algo2_score'].mean(),
+                                'Forecast Violation': results_df['algo3_score'].mean(),
+                                'Cross-Signal Integrity': results_df['algo4_score'].mean(),
+                                'Demographic Ratio': results_df['algo5_score'].mean()
+                            }
                         
-                        fig = px.bar(
-                            x=list(avg_scores.values()),
-                            y=list(avg_scores.keys()),
-                            orientation='h',
-                            labels={'x': 'Avg Contribution', 'y': 'Algorithm'},
-                            title="Average Signal Contribution by Algorithm"
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
+                            fig = px.bar(
+                                x=list(avg_scores.values()),
+                                y=list(avg_scores.keys()),
+                                orientation='h',
+                                labels={'x': 'Avg Contribution', 'y': 'Algorithm'},
+                                title="Average Signal Contribution by Algorithm"
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
 
+                    else:
+                        st.info("No data available for analysis.")
                 else:
-                    st.info("No data available for analysis.")
-            else:
-                st.warning("Granular data (enrolment, biometric, demographic) not available for forensic analysis.")
+                    st.warning("Granular data (enrolment, biometric, demographic) not available for forensic analysis.")
 
 def create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice):
     """Fallback marker-based map when GeoJSON is not available"""
@@ -3636,7 +4226,17 @@ def create_marker_fallback_map(state_map_data, map_metric_col, map_metric_choice
     st.plotly_chart(fig_map, use_container_width=True)
 
 
+def render_chatbot():
+    """Import the Gemini chatbot on first use so its SDK import doesn't delay the dashboard"""
+    try:
+        from chatbot import display_chatbot
+    except ImportError:
+        # Chatbot dependencies not installed
+        return
+    display_chatbot()
+
+
 if __name__ == "__main__":
     main()
 
-display_chatbot()
\ No newline at end of file
+render_chatbot()
\ No newline at end of file
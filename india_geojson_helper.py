@@ -108,3 +108,95 @@ def create_state_name_mapping(geojson_data, state_name_field):
             mapping[variation] = geojson_name
     
     return mapping
+
+
+def _simplify_ring(ring, precision):
+    """
+    Snap ring coordinates to a grid and drop consecutive duplicates.
+    Shared borders snap to identical vertices, so neighbouring states stay gap-free.
+    """
+    simplified = []
+    for point in ring:
+        snapped = [round(point[0], precision), round(point[1], precision)]
+        if not simplified or snapped != simplified[-1]:
+            simplified.append(snapped)
+    
+    # A closed ring needs at least 4 points (triangle + closing point)
+    if len(simplified) < 4:
+        return None
+    if simplified[0] != simplified[-1]:
+        simplified.append(simplified[0])
+    return simplified
+
+
+def _simplify_polygon(polygon, precision):
+    """Simplify a polygon's rings; returns None if the exterior ring collapses"""
+    rings = [_simplify_ring(ring, precision) for ring in polygon]
+    if not rings or rings[0] is None:
+        return None
+    return [ring for ring in rings if ring is not None]
+
+
+def simplify_geojson(geojson_data, precision=2):
+    """
+    Reduce GeoJSON size by snapping coordinates to `precision` decimal places
+    (2 ~ 1 km) and dropping collapsed rings and polygons
+    """
+    features = []
+    for feature in geojson_data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        geom_type = geometry.get('type')
+        
+        if geom_type == 'Polygon':
+            polygons = [_simplify_polygon(geometry['coordinates'], precision)]
+        elif geom_type == 'MultiPolygon':
+            polygons = [_simplify_polygon(polygon, precision) for polygon in geometry['coordinates']]
+        else:
+            features.append(feature)
+            continue
+        
+        polygons = [polygon for polygon in polygons if polygon]
+        if not polygons:
+            continue
+        
+        features.append({
+            'type': 'Feature',
+            'properties': feature.get('properties', {}),
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}
+        })
+    
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def load_simplified_india_geojson(file_path='india_states.geojson',
+                                  simplified_path='india_states_simplified.json',
+                                  precision=2):
+    """
+    Load simplified Indian states GeoJSON, generating it from the full file once
+    and caching it on disk. Falls back to the full GeoJSON if simplification fails.
+    Returns GeoJSON dict if successful, None otherwise
+    """
+    source_path = Path(file_path)
+    cache_path = Path(simplified_path)
+    
+    # Reuse the cached file unless the source GeoJSON is newer
+    if cache_path.exists() and (not source_path.exists() or
+                                cache_path.stat().st_mtime >= source_path.stat().st_mtime):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading simplified GeoJSON: {e}")
+    
+    geojson_data = load_india_geojson(file_path)
+    if geojson_data is None:
+        return None
+    
+    try:
+        simplified = simplify_geojson(geojson_data, precision)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(simplified, f, separators=(',', ':'))
+        return simplified
+    except Exception as e:
+        print(f"Error simplifying GeoJSON: {e}")
+        return geojson_data